@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Measures how much processing documents delays an asyncio event loop, when the work is done inline in a coroutine, and when it's
+offloaded with `klon.aio`. A ticker task sleeps for 1 ms at a time, and records how late it wakes up.
+
+    python -m benchmarks.bench_aio
+"""
+
+# standards
+import asyncio
+import statistics
+import time
+
+# klon
+from benchmarks.corpus import article_html
+from klon import aio, extract_text, make_all_urls_absolute, parse_html_etree
+
+TICK = 0.001
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def process_inline(url: str, html: bytes) -> str:
+    etree = parse_html_etree(html)
+    make_all_urls_absolute(url, etree)
+    return extract_text(etree)
+
+
+async def process_offloaded(url: str, html: bytes) -> str:
+    etree = await aio.parse_html_etree(html)
+    await aio.make_all_urls_absolute(url, etree)
+    return await aio.extract_text(etree)
+
+
+async def measure(process, documents: list[tuple[str, bytes]]) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK)
+    start = time.perf_counter()
+    await asyncio.gather(*(process(url, html) for url, html in documents))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await ticker_task
+    return seconds, lags
+
+
+def main() -> None:
+    documents = [(f"https://example.com/article/{i}", article_html(1000, seed=i).encode()) for i in range(100)]
+    print("%-10s  %8s  %10s  %12s  %12s" % ("", "seconds", "docs/s", "p99 lag (ms)", "max lag (ms)"))
+    for label, process in (("inline", process_inline), ("klon.aio", process_offloaded)):
+        seconds, lags = asyncio.run(measure(process, documents))
+        p99 = statistics.quantiles(lags, n=100, method="inclusive")[-1] if len(lags) > 1 else max(lags)
+        print("%-10s  %8.2f  %10.1f  %12.2f  %12.2f" % (label, seconds, len(documents) / seconds, p99 * 1000, max(lags) * 1000))
+
+
+if __name__ == "__main__":
+    main()
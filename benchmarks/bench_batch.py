@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Measures how `klon.batch.process_documents` scales with the number of worker processes.
+
+    python -m benchmarks.bench_batch
+"""
+
+# standards
+import os
+import time
+
+# klon
+from benchmarks.corpus import article_html
+from klon.batch import process_documents
+
+STEPS = ["make_all_urls_absolute", "extract_text", "extract_js_str"]
+
+
+def main() -> None:
+    documents = [(f"https://example.com/article/{i}", article_html(200, seed=i).encode()) for i in range(400)]
+    num_workers = 1
+    baseline = None
+    while num_workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        for _result in process_documents(documents, STEPS, max_workers=num_workers, chunk_size=8):
+            pass
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(
+            "%3d workers  %7.2f s  %8.1f docs/s  speedup x%.2f"
+            % (num_workers, seconds, len(documents) / seconds, baseline / seconds)
+        )
+        num_workers *= 2
+
+
+if __name__ == "__main__":
+    main()
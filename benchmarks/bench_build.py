@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+Compares building the same skeleton over and over with `build_etree`, with building it from a compiled template.
+
+    python -m benchmarks.bench_build
+"""
+
+# standards
+from timeit import Timer
+
+# klon
+from klon import Placeholder, build_etree, compile_etree
+
+
+def spec(title, url, price):
+    return (
+        "div.product",
+        ["h2.title", ["a", {"href": url}, title]],
+        ["p.price", "Price: ", ["span.amount", price], " EUR"],
+        ["ul.tags", ["li", "new"], ["li", "sale"]],
+    )
+
+
+def main() -> None:
+    template = compile_etree(*spec(Placeholder("title"), Placeholder("url"), Placeholder("price")))
+    cases = (
+        ("build_etree", lambda: build_etree(*spec("Product", "/product/1", "12.50"))),
+        ("template.build", lambda: template.build(title="Product", url="/product/1", price="12.50")),
+    )
+    timings = {}
+    for label, func in cases:
+        timer = Timer(func)
+        number, _ = timer.autorange()
+        timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+        print("%-16s %8.2f µs/tree" % (label, timings[label] * 1e6))
+    print("speedup x%.2f" % (timings["build_etree"] / timings["template.build"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Compares re-processing a corpus from scratch with going through a `klon.cache.ResultCache`, both when the cache is cold (every
+document misses, and its results are stored) and when it's warm (every document hits).
+
+    python -m benchmarks.bench_cache
+"""
+
+# standards
+from pathlib import Path
+import tempfile
+import time
+
+# klon
+from benchmarks.corpus import article_html
+from klon.batch import _compile_steps, _process_document
+from klon.cache import ResultCache
+
+STEPS = ["make_all_urls_absolute", "extract_text", "extract_js_str"]
+
+
+def main() -> None:
+    documents = [(f"https://example.com/article/{i}", article_html(200, seed=i).encode()) for i in range(400)]
+    compiled_steps = _compile_steps(STEPS)
+    start = time.perf_counter()
+    for url, html in documents:
+        _process_document(url, html, compiled_steps, False)
+    baseline = time.perf_counter() - start
+    print("%-12s  %7.3f s  %8.1f docs/s" % ("no cache", baseline, len(documents) / baseline))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "cache.sqlite"
+        with ResultCache(path) as cache:
+            for label in ("cold cache", "warm cache"):
+                start = time.perf_counter()
+                for url, html in documents:
+                    cache.process_document(url, html, STEPS)
+                seconds = time.perf_counter() - start
+                print(
+                    "%-12s  %7.3f s  %8.1f docs/s  speedup x%.2f" % (label, seconds, len(documents) / seconds, baseline / seconds)
+                )
+            print(
+                "%d entries, %.1f KB on disk for %.1f KB of input"
+                % (len(cache), path.stat().st_size / 1024, sum(len(html) for _url, html in documents) / 1024)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""
+Compares a `Cleaner` with the usual way of stripping boilerplate, i.e. one XPath scan per rule, then `detach` on every match.
+
+    python -m benchmarks.bench_clean
+"""
+
+# standards
+from timeit import Timer
+
+# klon
+from benchmarks.corpus import cluttered_html
+from klon import Cleaner, detach, parse_html_etree, tostring
+from klon.text import BLOCK_TAGS
+
+CLEANER = Cleaner(
+    tags={"script", "style", "nav", "footer"},
+    class_patterns=[r"\bad-"],
+    id_patterns=["cookie"],
+    empty_tags=BLOCK_TAGS,
+)
+
+LEGACY_XPATHS = (
+    "//script | //style | //nav | //footer",
+    "//*[contains(@class, 'ad-')]",
+    "//*[contains(@id, 'cookie')]",
+    "//*[@hidden or @aria-hidden='true' or contains(translate(@style, ' ', ''), 'display:none')]",
+)
+
+# Removing empty containers can leave their parents empty too, so this has to be repeated until nothing changes
+LEGACY_EMPTY_XPATH = "//body//*[self::div or self::p][not(*) and not(normalize-space())]"
+
+
+def legacy_clean(etree):
+    for xpath in LEGACY_XPATHS:
+        for node in etree.xpath(xpath):
+            if node.getparent() is not None:
+                detach(node)
+    while True:
+        empty = etree.xpath(LEGACY_EMPTY_XPATH)
+        if not empty:
+            break
+        for node in empty:
+            detach(node)
+
+
+def main() -> None:
+    for num_blocks in (100, 2000, 20000):
+        html = cluttered_html(num_blocks)
+        legacy_etree, current_etree = parse_html_etree(html), parse_html_etree(html)
+        legacy_clean(legacy_etree)
+        CLEANER.clean(current_etree)
+        assert tostring(legacy_etree) == tostring(current_etree)
+        timings = {}
+        for label, func in (("legacy", legacy_clean), ("current", CLEANER.clean)):
+            # Each run works on a fresh tree, since cleaning modifies it in place
+            timer = Timer(
+                "func(etree)",
+                setup="etree = parse_html_etree(html)",
+                globals={"func": func, "parse_html_etree": parse_html_etree, "html": html},
+            )
+            timings[label] = min(timer.repeat(repeat=5, number=1))
+        print(
+            "%6d blocks  legacy %8.2f ms  current %8.2f ms  speedup x%.2f"
+            % (num_blocks, timings["legacy"] * 1000, timings["current"] * 1000, timings["legacy"] / timings["current"])
+        )
+
+
+if __name__ == "__main__":
+    main()
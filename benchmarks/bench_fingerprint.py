@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Compares `fingerprint` with the usual separate passes: hash the output of `extract_text`, then re-tokenise that text into
+shingles, and compute the SimHash one bit at a time.
+
+    python -m benchmarks.bench_fingerprint
+"""
+
+# standards
+from functools import partial
+import hashlib
+import heapq
+from timeit import Timer
+
+# klon
+from benchmarks.corpus import article_html
+from klon import extract_text, fingerprint, parse_html_etree
+from klon.fingerprint import _word_hash
+
+
+def shingle_hash(word_hashes):
+    mask = (1 << 64) - 1
+    value = 0
+    for word_hash in word_hashes:
+        value = (value * 0x100000001B3 + word_hash) & mask
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & mask
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & mask
+    return value ^ (value >> 31)
+
+
+def legacy_fingerprint(etree):
+    text = extract_text(etree)
+    text_hash = hashlib.sha256(text.encode("UTF-8")).hexdigest()
+    word_hashes = [_word_hash(word) for word in text.split()]
+    shingles = [shingle_hash(word_hashes[i : i + 3]) for i in range(len(word_hashes) - 2)]
+    simhash = 0
+    for bit in range(64):
+        if 2 * sum(shingle >> bit & 1 for shingle in shingles) > len(shingles):
+            simhash |= 1 << bit
+    return text_hash, simhash, heapq.nsmallest(128, set(shingles))
+
+
+def main() -> None:
+    for num_paragraphs in (10, 200, 5000):
+        etree = parse_html_etree(article_html(num_paragraphs))
+        current = fingerprint(etree)
+        assert legacy_fingerprint(etree) == (current.text_hash, current.simhash, list(current.minhash))
+        timings = {}
+        for label, func in (("legacy", legacy_fingerprint), ("current", fingerprint)):
+            timer = Timer(partial(func, etree))
+            number, _ = timer.autorange()
+            timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+        print(
+            "%5d paragraphs  legacy %8.2f ms  current %8.2f ms  speedup x%.2f"
+            % (num_paragraphs, timings["legacy"] * 1000, timings["current"] * 1000, timings["legacy"] / timings["current"])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Compares `extract_html_text`, which collects the text from the parser's events, with parsing the document into a tree and then
+calling `extract_text` on it. Also measures how much each one grows the peak memory of a fresh process.
+
+    python -m benchmarks.bench_html_text
+"""
+
+# standards
+from functools import partial
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+from timeit import Timer
+
+# klon
+from benchmarks.corpus import article_html, cluttered_html
+from klon import extract_html_text, extract_text, parse_html_etree
+
+
+def via_tree(html: bytes) -> str:
+    return extract_text(parse_html_etree(html))
+
+
+def fused(html: bytes) -> str:
+    return extract_html_text(html)
+
+
+FUNCTIONS = {"tree": via_tree, "fused": fused}
+
+
+def make_documents() -> dict[str, bytes]:
+    return {
+        "article_html(5000)": article_html(5000).encode(),
+        "cluttered_html(5000)": cluttered_html(5000).encode(),
+    }
+
+
+def peak_memory_growth(label: str, html: bytes) -> int:
+    # The document is passed through a file, so that the child process doesn't raise its peak memory usage by generating it
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "document.html"
+        path.write_bytes(html)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_html_text", label, str(path)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return int(output)
+
+
+def measure_memory(label: str, path: str) -> None:
+    # This runs in a fresh process
+    html = Path(path).read_bytes()
+    before = peak_rss()
+    FUNCTIONS[label](html)
+    print(peak_rss() - before)
+
+
+def peak_rss() -> int:
+    # In kB. Linux only. Unlike `getrusage`'s `ru_maxrss`, this isn't inherited from the parent process.
+    with open("/proc/self/status") as file:
+        return next(int(line.split()[1]) for line in file if line.startswith("VmHWM:"))
+
+
+def main() -> None:
+    for name, html in make_documents().items():
+        assert fused(html) == via_tree(html)
+        timings = {}
+        memory = {}
+        for label, func in FUNCTIONS.items():
+            timer = Timer(partial(func, html))
+            number, _ = timer.autorange()
+            timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+            memory[label] = peak_memory_growth(label, html)
+        print(
+            "%-22s %8.1f kB  tree %8.2f ms %7d kB peak  fused %8.2f ms %7d kB peak  speedup x%.2f"
+            % (
+                name,
+                len(html) / 1024,
+                timings["tree"] * 1000,
+                memory["tree"],
+                timings["fused"] * 1000,
+                memory["fused"],
+                timings["tree"] / timings["fused"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure_memory(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Compares `extract_metadata` to the way scrapers usually collect the same metadata: JSON-LD blocks are split back out of the string
+given by `extract_js_str` and all decoded up front, and each kind of tag is found by its own XPath scan. `extract_metadata` is
+timed both without reading any JSON-LD block, and when reading them all.
+
+    python -m benchmarks.bench_metadata
+"""
+
+# standards
+from functools import partial
+import json
+import re
+from timeit import Timer
+from typing import Any, no_type_check
+from urllib.parse import urljoin
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from benchmarks.corpus import product_page_html
+from klon import extract_js_str, extract_metadata, extract_text, parse_html_etree
+
+URL = "https://example.com/"
+
+RE_JSON_LD = re.compile(r'\s*\{\s*"@(?:context|type|graph)"')
+
+
+@no_type_check  # until lxml-stubs improves
+def multi_pass(etree: ET._Element) -> tuple[Any, ...]:
+    json_ld = [json.loads(block) for block in extract_js_str(etree).split("\n\n") if RE_JSON_LD.match(block)]
+    meta: dict[str, list[str]] = {}
+    for node in etree.xpath("//meta[@property and @content]"):
+        meta.setdefault(node.get("property").lower(), []).append(node.get("content"))
+    for node in etree.xpath("//meta[@name and @content]"):
+        meta.setdefault(node.get("name").lower(), []).append(node.get("content"))
+    links: dict[str, list[str]] = {}
+    for node in etree.xpath("//link[@rel and @href]"):
+        for rel in node.get("rel").lower().split():
+            links.setdefault(rel, []).append(urljoin(URL, node.get("href")))
+    microdata: dict[str, list[str]] = {}
+    for node in etree.xpath("//*[@itemprop]"):
+        if node.tag == "img":
+            value = urljoin(URL, node.get("src"))
+        elif node.tag == "a":
+            value = urljoin(URL, node.get("href"))
+        else:
+            value = extract_text(node)
+        microdata.setdefault(node.get("itemprop"), []).append(value)
+    return json_ld, meta, links, microdata
+
+
+def single_pass(etree: ET._Element) -> tuple[Any, ...]:
+    return extract_metadata(etree, URL)
+
+
+def single_pass_decoded(etree: ET._Element) -> tuple[Any, ...]:
+    metadata = extract_metadata(etree, URL)
+    return [block.data for block in metadata.json_ld], metadata.meta, metadata.links, metadata.microdata
+
+
+def main() -> None:
+    for num_items in (10, 100, 1000):
+        etree = parse_html_etree(product_page_html(num_items, seed=num_items))
+        assert single_pass_decoded(etree) == multi_pass(etree)
+        timings = {}
+        for label, func in (("multi-pass", multi_pass), ("single-pass", single_pass), ("decoded", single_pass_decoded)):
+            timer = Timer(partial(func, etree))
+            number, _ = timer.autorange()
+            timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+        print(
+            "%5d items  multi-pass %8.3f ms  extract_metadata %8.3f ms (x%.2f)  + decoding all JSON-LD %8.3f ms (x%.2f)"
+            % (
+                num_items,
+                timings["multi-pass"] * 1000,
+                timings["single-pass"] * 1000,
+                timings["multi-pass"] / timings["single-pass"],
+                timings["decoded"] * 1000,
+                timings["multi-pass"] / timings["decoded"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
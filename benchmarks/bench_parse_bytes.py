@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""
+Compares parsing an undecoded HTML document by first decoding it in Python, with handing the bytes straight to
+`parse_html_etree`.
+
+Peak memory is measured with `tracemalloc`, which only sees allocations made by Python -- i.e. exactly the decoded copies of the
+document that the bytes path avoids. libxml2's own buffers are the same in both cases.
+
+    python -m benchmarks.bench_parse_bytes
+"""
+
+# standards
+from functools import partial
+from timeit import Timer
+import tracemalloc
+
+# klon
+from benchmarks.corpus import article_html
+from klon import parse_html_etree
+
+
+def parse_decoded(html_bytes: bytes) -> None:
+    parse_html_etree(html_bytes.decode("UTF-8"))
+
+
+def parse_bytes(html_bytes: bytes) -> None:
+    parse_html_etree(html_bytes, content_type="text/html; charset=UTF-8")
+
+
+def main() -> None:
+    for num_paragraphs in (100, 2000, 10000):
+        html_bytes = article_html(num_paragraphs).encode()
+        results = {}
+        for label, func in (("decoded", parse_decoded), ("bytes", parse_bytes)):
+            timer = Timer(partial(func, html_bytes))
+            number, _ = timer.autorange()
+            seconds = min(timer.repeat(repeat=5, number=number)) / number
+            tracemalloc.start()
+            func(html_bytes)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[label] = (seconds, peak)
+        print(
+            "%8.1f kB  decoded %8.2f ms %8.1f kB peak  bytes %8.2f ms %8.1f kB peak  speedup x%.2f"
+            % (
+                len(html_bytes) / 1024,
+                results["decoded"][0] * 1000,
+                results["decoded"][1] / 1024,
+                results["bytes"][0] * 1000,
+                results["bytes"][1] / 1024,
+                results["decoded"][0] / results["bytes"][0],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Measures the cost of building a new parser for every document, compared with reusing klon's cached per-thread parsers, when
+parsing many small documents.
+
+    python -m benchmarks.bench_parser_cache
+"""
+
+# standards
+import re
+from timeit import Timer
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from klon import parse_html_etree, parse_xml_etree
+
+SMALL_HTML = '<div class="item"><a href="/product/1">Product</a> <span class="price">12.50</span></div>'
+
+SMALL_XML = b'<product sku="1"><name>Product</name><price>12.50</price></product>'
+
+
+def parse_html_etree_new_parser(html_str: str) -> ET._Element:
+    # What `parse_html_etree` did before parsers were cached
+    html_str = re.sub(r"^<\?xml[^>]+\?>", "", html_str).strip()
+    return ET.HTML(html_str, ET.HTMLParser(remove_comments=False))
+
+
+def main() -> None:
+    cases = (
+        ("html, new parser", lambda: parse_html_etree_new_parser(SMALL_HTML)),
+        ("html, cached parser", lambda: parse_html_etree(SMALL_HTML)),
+        ("xml, new parser", lambda: ET.XML(SMALL_XML, ET.XMLParser(remove_comments=False))),
+        ("xml, cached parser", lambda: parse_xml_etree(SMALL_XML)),
+    )
+    for label, func in cases:
+        timer = Timer(func)
+        number, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=5, number=number)) / number
+        print("%-20s %8.2f µs/doc  %10.0f docs/s" % (label, seconds * 1e6, 1 / seconds))
+
+
+if __name__ == "__main__":
+    main()
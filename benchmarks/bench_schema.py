@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Compares extracting records with a `Schema` to the hand-written equivalent that most scrapers use, where each field is looked up
+with its own `.xpath()` call (which compiles the expression every time) and then passed to `extract_text` or `.get()`.
+
+    python -m benchmarks.bench_schema
+"""
+
+# standards
+from collections.abc import Callable
+from functools import partial
+from timeit import Timer
+from typing import Any, no_type_check
+from urllib.parse import urljoin
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from benchmarks.corpus import listing_html
+from klon import Field, Schema, extract_text, parse_html_etree
+
+ITEM = Schema(
+    {
+        "title": "h3",
+        "url": Field("h3 a", "url"),
+        "description": "p.description",
+        "price": Field("span.price", clean=float),
+    }
+)
+
+LISTING = Schema({"title": "h1", "items": Field("div.item", ITEM, many=True)})
+
+
+@no_type_check  # until lxml-stubs improves
+def hand_written(etree: ET._Element, base_url: str) -> dict[str, Any]:
+    items = []
+    for item in etree.xpath("//div[@class='item']"):
+        links = item.xpath(".//h3//a")
+        items.append(
+            {
+                "title": extract_text(item.xpath(".//h3")[0]),
+                "url": urljoin(base_url, links[0].get("href")) if links else None,
+                "description": extract_text(item.xpath(".//p[@class='description']")[0]),
+                "price": float(extract_text(item.xpath(".//span[@class='price']")[0])),
+            }
+        )
+    return {"title": extract_text(etree.xpath("//h1")[0]), "items": items}
+
+
+def extract_all(
+    func: Callable[[ET._Element, str], dict[str, Any]], documents: list[tuple[str, ET._Element]]
+) -> list[dict[str, Any]]:
+    return [func(etree, url) for url, etree in documents]
+
+
+def main() -> None:
+    for num_items in (5, 50, 500):
+        documents = [(f"https://example.com/list/{i}", parse_html_etree(listing_html(num_items, i))) for i in range(20)]
+        for url, etree in documents:
+            assert LISTING.extract(etree, url) == hand_written(etree, url)
+        timings = {}
+        for label, func in (("hand-written", hand_written), ("schema", LISTING.extract)):
+            timer = Timer(partial(extract_all, func, documents))
+            number, _ = timer.autorange()
+            timings[label] = min(timer.repeat(repeat=5, number=number)) / number / len(documents)
+        print(
+            "%4d items/page  hand-written %8.3f ms  schema %8.3f ms  speedup x%.2f"
+            % (num_items, timings["hand-written"] * 1000, timings["schema"] * 1000, timings["hand-written"] / timings["schema"])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""
+Compares `extract_table` to what scrapers usually do to read a table, i.e. loop over its rows and call `extract_text` on every cell,
+then transpose the rows into columns.
+
+    python -m benchmarks.bench_table
+"""
+
+# standards
+from functools import partial
+from timeit import Timer
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from benchmarks.corpus import table_html
+from klon import extract_table, extract_text, parse_html_etree
+
+
+def per_cell(table: ET._Element) -> list[list[str]]:
+    rows = [[extract_text(cell) for cell in row.iterchildren("td")] for row in table.iterfind("tbody/tr")]
+    return [list(column) for column in zip(*rows)]
+
+
+def main() -> None:
+    for num_rows in (10, 1000, 20000):
+        # Without spans, which the per-cell code doesn't handle
+        table = parse_html_etree(table_html(num_rows, seed=num_rows, spans=False)).find(".//table")
+        assert table is not None
+        assert extract_table(table).columns == per_cell(table)
+        timings = {}
+        for label, func in (("per-cell", per_cell), ("extract_table", extract_table)):
+            timer = Timer(partial(func, table))
+            number, _ = timer.autorange()
+            timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+        print(
+            "%6d rows  per-cell extract_text %9.3f ms  extract_table %9.3f ms  speedup x%.2f"
+            % (
+                num_rows,
+                timings["per-cell"] * 1000,
+                timings["extract_table"] * 1000,
+                timings["per-cell"] / timings["extract_table"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Compares the current `extract_text` implementation with the original recursive one, which normalised whitespace separately
+for every text fragment. Also measures extracting only a short snippet with `max_chars`.
+
+    python -m benchmarks.bench_text
+"""
+
+# standards
+from functools import partial
+import re
+from timeit import Timer
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from benchmarks.corpus import article_html
+from klon import extract_text, parse_html_etree
+from klon.text import BLOCK_TAGS, NON_CONTENT_TAGS, PREFORMATTED_TAGS, normalize_spaces
+
+SNIPPET_LENGTH = 200
+
+
+def legacy_extract_text(etree, *, multiline=False):
+    parts = []
+    _legacy_walk(etree, parts)
+    text = "".join(parts)
+    if multiline:
+        return re.sub(r"\s+", lambda m: "\n\n" if "\n\n" in m.group() else "\n" if "\n" in m.group() else " ", text).strip()
+    else:
+        return normalize_spaces(text)
+
+
+def _legacy_walk(node, parts, preformatted=False):
+    if node.tag in NON_CONTENT_TAGS or isinstance(node, ET._Comment):
+        return
+    if node.tag == "br":
+        parts.append("\n")
+    elif node.tag in BLOCK_TAGS:
+        parts.append("\n\n")
+    if node.tag in PREFORMATTED_TAGS:
+        preformatted = True
+    if node.text:
+        parts.append(node.text if preformatted else re.sub(r"\s+", " ", node.text))
+    for child in node:
+        _legacy_walk(child, parts)
+        if child.tag in BLOCK_TAGS:
+            parts.append("\n\n")
+        if child.tail:
+            parts.append(child.tail if preformatted else re.sub(r"\s+", " ", child.tail))
+
+
+def main() -> None:
+    for num_paragraphs in (100, 2000, 10000):
+        html = article_html(num_paragraphs)
+        etree = parse_html_etree(html)
+        for multiline in (False, True):
+            assert extract_text(etree, multiline=multiline) == legacy_extract_text(etree, multiline=multiline)
+            timings = {}
+            for label, func in (("legacy", legacy_extract_text), ("current", extract_text)):
+                timer = Timer(partial(func, etree, multiline=multiline))
+                number, _ = timer.autorange()
+                timings[label] = min(timer.repeat(repeat=5, number=number)) / number
+            print(
+                "%8.1f kB  multiline=%-5s  legacy %8.2f ms  current %8.2f ms  speedup x%.2f"
+                % (
+                    len(html) / 1024,
+                    multiline,
+                    timings["legacy"] * 1000,
+                    timings["current"] * 1000,
+                    timings["legacy"] / timings["current"],
+                )
+            )
+            # Extracting only a snippet from the start of the document
+            timer = Timer(partial(extract_text, etree, multiline=multiline, max_chars=SNIPPET_LENGTH))
+            number, _ = timer.autorange()
+            snippet_seconds = min(timer.repeat(repeat=5, number=number)) / number
+            print(
+                "%8.1f kB  multiline=%-5s  snippet of %d chars %8.3f ms  x%.1f faster than full extraction"
+                % (
+                    len(html) / 1024,
+                    multiline,
+                    SNIPPET_LENGTH,
+                    snippet_seconds * 1000,
+                    timings["current"] / snippet_seconds,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
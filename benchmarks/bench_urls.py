@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Compares the current `make_all_urls_absolute` with the original implementation, which ran one XPath over the whole tree and
+called `urljoin` separately for every attribute.
+
+    python -m benchmarks.bench_urls
+"""
+
+# standards
+import re
+from timeit import Timer
+from urllib.parse import urljoin
+
+# klon
+from benchmarks.corpus import link_heavy_html
+from klon import make_all_urls_absolute, parse_html_etree, tostring
+from klon.html import TAGS_WITH_URL_ATTRIBUTES, XPATH_TAGS_WITH_URL_ATTRIBUTES
+
+BASE_URL = "https://example.com/directory/"
+
+
+def legacy_make_all_urls_absolute(base_url, etree):
+    for node in etree.xpath(XPATH_TAGS_WITH_URL_ATTRIBUTES):
+        for attr in TAGS_WITH_URL_ATTRIBUTES[node.tag]:
+            value = node.get(attr)
+            if value is not None:
+                if attr == "srcset":
+                    new_value = re.sub(r"((?:^|,)\s*)(\S+)", lambda m: m[1] + urljoin(base_url, m[2]), value)  # noqa: B023
+                else:
+                    new_value = urljoin(base_url, value)
+                if new_value != value:
+                    node.set(attr, new_value)
+
+
+def main() -> None:
+    for num_links in (100, 2000, 20000):
+        html = link_heavy_html(num_links)
+        legacy_etree, current_etree = parse_html_etree(html), parse_html_etree(html)
+        legacy_make_all_urls_absolute(BASE_URL, legacy_etree)
+        make_all_urls_absolute(BASE_URL, current_etree)
+        assert tostring(legacy_etree) == tostring(current_etree)
+        timings = {}
+        for label, func in (("legacy", legacy_make_all_urls_absolute), ("current", make_all_urls_absolute)):
+            # Each run works on a fresh tree, since the function modifies it in place
+            timer = Timer(
+                "func(BASE_URL, etree)",
+                setup="etree = parse_html_etree(html)",
+                globals={"func": func, "BASE_URL": BASE_URL, "parse_html_etree": parse_html_etree, "html": html},
+            )
+            timings[label] = min(timer.repeat(repeat=5, number=1))
+        print(
+            "%6d links  legacy %8.2f ms  current %8.2f ms  speedup x%.2f"
+            % (num_links, timings["legacy"] * 1000, timings["current"] * 1000, timings["legacy"] / timings["current"])
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic documents used by the benchmarks. They're generated from a fixed seed, so that timings are comparable across runs.
+"""
+
+# standards
+import json
+import random
+from typing import Any
+
+WORDS = (
+    "the of and to in is you that it he was for on are as with his they at be this have from or one had by word but not what all "
+    "were we when your can said there use an each which she do how their if will up other about out many then them these so some"
+).split()
+
+
+def sentence(rng: random.Random, min_words: int = 4, max_words: int = 20) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))).capitalize() + "."
+
+
+def article_html(num_paragraphs: int, seed: int = 0) -> str:
+    """
+    A news-article-like page: a head with scripts and styles, navigation, and a long body of paragraphs with inline markup, lists
+    and tables, indented the way real-world pages usually are.
+    """
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html>\n<html>\n  <head>\n    <title>%s</title>\n" % sentence(rng),
+        "    <style>\n      body { font-family: sans-serif; }\n      p { margin: 0 }\n    </style>\n",
+        '    <script type="text/javascript">\n      var x = {"a": 1};\n      console.log(x);\n    </script>\n  </head>\n',
+        '  <body>\n    <nav><ul>%s</ul></nav>\n    <div class="article">\n'
+        % "".join(f'<li><a href="/section/{i}">{rng.choice(WORDS)}</a></li>' for i in range(20)),
+    ]
+    for i in range(num_paragraphs):
+        roll = rng.random()
+        if roll < 0.1:
+            parts.append("      <ul>\n%s      </ul>\n" % "".join(f"        <li>{sentence(rng)}</li>\n" for _ in range(5)))
+        elif roll < 0.15:
+            rows = "".join("        <tr>%s</tr>\n" % "".join(f"<td>{rng.choice(WORDS)}</td>" for _ in range(4)) for _ in range(5))
+            parts.append(f"      <table>\n{rows}      </table>\n")
+        elif roll < 0.2:
+            parts.append(f"      <pre>\n{sentence(rng)}\n\n  {sentence(rng)}\n</pre>\n")
+        else:
+            parts.append(
+                f"      <p>\n        {sentence(rng)} <b>{sentence(rng, 1, 3)}</b> {sentence(rng)}<br>\n"
+                f'        <a href="/article/{i}">{sentence(rng, 2, 5)}</a> <!-- comment --> {sentence(rng)}\n      </p>\n'
+            )
+    parts.append("    </div>\n    <footer><p>Copyright</p></footer>\n  </body>\n</html>\n")
+    return "".join(parts)
+
+
+def link_heavy_html(num_links: int, seed: int = 0) -> str:
+    """
+    A directory-like page made mostly of links, many of them relative and repeated, plus some images with `srcset`s.
+    """
+    rng = random.Random(seed)
+    sections = ["/category/%d" % i for i in range(50)]
+    parts = ['<!DOCTYPE html>\n<html>\n  <head>\n    <link rel="stylesheet" href="/static/style.css">\n  </head>\n  <body>\n']
+    for i in range(num_links):
+        if i % 50 == 0:
+            parts.append(f'    <img src="img/{i}.jpg" srcset="img/{i}.jpg 1x, img/{i}@2x.jpg 2x">\n')
+        href = rng.choice(sections) if rng.random() < 0.5 else "item?id=%d" % rng.randint(0, num_links)
+        parts.append(f'    <a href="{href}">{rng.choice(WORDS)}</a>\n')
+    parts.append("  </body>\n</html>\n")
+    return "".join(parts)
+
+
+def cluttered_html(num_blocks: int, seed: int = 0) -> str:
+    """
+    A page with lots of boilerplate around its content: navigation, ads, cookie banners, hidden elements and containers that are
+    left empty once the rest has been removed.
+    """
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html>\n<html>\n  <body>\n    <div id="cookie-banner">Accept cookies <button>OK</button></div>\n']
+    for i in range(num_blocks):
+        roll = rng.random()
+        if roll < 0.1:
+            parts.append(f'    <nav><a href="/section/{i}">{rng.choice(WORDS)}</a></nav>\n')
+        elif roll < 0.2:
+            parts.append(f'    <div class="ad-slot"><a href="/ad/{i}">{sentence(rng)}</a></div>\n')
+        elif roll < 0.3:
+            parts.append(f'    <div style="display: none">{sentence(rng)}</div><span aria-hidden="true">*</span>\n')
+        elif roll < 0.4:
+            parts.append('    <div class="wrapper"><div><script>track();</script></div> </div>\n')
+        else:
+            parts.append(f'    <div class="content"><p>{sentence(rng)} <b>{sentence(rng, 1, 3)}</b> {sentence(rng)}</p></div>\n')
+    parts.append("    <footer><p>Copyright</p></footer>\n  </body>\n</html>\n")
+    return "".join(parts)
+
+
+def small_html(seed: int = 0) -> str:
+    """
+    A snippet of the size a scraper typically deals with when processing listing items one by one.
+    """
+    rng = random.Random(seed)
+    return (
+        f'<div class="item"><h3><a href="/item/{rng.randint(0, 9999)}">{sentence(rng, 2, 5)}</a></h3>'
+        f'<p class="description">{sentence(rng)}</p><span class="price">{rng.randint(1, 999)}.99</span></div>'
+    )
+
+
+def listing_html(num_items: int, seed: int = 0) -> str:
+    """
+    A listing page, made of many items like those given by `small_html`.
+    """
+    items = "".join(small_html(seed * num_items + i) for i in range(num_items))
+    return f"<html><body><h1>Listing {seed}</h1>{items}</body></html>"
+
+
+def table_html(num_rows: int, num_cols: int = 6, seed: int = 0, spans: bool = True) -> str:
+    """
+    A data table, such as a price list or a sports results page, with a header row, a few inline tags in cells, and an occasional
+    cell spanning two columns, unless `spans` is False.
+    """
+    rng = random.Random(seed)
+    header = "".join(f"<th>Column {col}</th>" for col in range(num_cols))
+    rows = []
+    for _ in range(num_rows):
+        cells = []
+        col = 0
+        while col < num_cols:
+            kind = rng.random()
+            if spans and kind < 0.02 and col < num_cols - 1:
+                cells.append(f'<td colspan="2">{sentence(rng, 1, 3)}</td>')
+                col += 2
+                continue
+            if kind < 0.4:
+                cells.append(f"<td>{rng.randint(0, 99999)}.{rng.randint(0, 99):02d}</td>")
+            elif kind < 0.6:
+                cells.append(f'<td><a href="/row/{rng.randint(0, 9999)}">{sentence(rng, 1, 4)}</a></td>')
+            else:
+                cells.append(f"<td>\n  {sentence(rng, 1, 6)}\n</td>")
+            col += 1
+        rows.append("<tr>%s</tr>" % "".join(cells))
+    return f"<html><body><table><thead><tr>{header}</tr></thead><tbody>{''.join(rows)}</tbody></table></body></html>"
+
+
+def product_page_html(num_items: int, seed: int = 0) -> str:
+    """
+    A product listing page as produced by e-commerce platforms, with OpenGraph and other `<meta>` tags, `<link>` tags, several
+    JSON-LD blocks (one large one describing every item), inline scripts, and microdata on each item.
+    """
+    rng = random.Random(seed)
+    items: list[dict[str, Any]] = [
+        {
+            "@type": "Product",
+            "name": sentence(rng, 2, 5),
+            "sku": f"SKU-{i}",
+            "offers": {"price": rng.randint(1, 999), "currency": "EUR"},
+        }
+        for i in range(num_items)
+    ]
+    head = [
+        f"<title>{sentence(rng)}</title>",
+        *(f'<meta property="og:{key}" content="{sentence(rng, 1, 5)}">' for key in ("title", "description", "type", "site_name")),
+        *(f'<meta name="{name}" content="{sentence(rng)}">' for name in ("description", "keywords", "twitter:card", "robots")),
+        '<link rel="canonical" href="/list"><link rel="stylesheet" href="/main.css"><link rel="icon" href="/favicon.ico">',
+        '<script type="application/ld+json">%s</script>' % json.dumps({"@type": "ItemList", "itemListElement": items}),
+        '<script type="application/ld+json">{"@type": "BreadcrumbList", "itemListElement": []}</script>',
+        '<script type="application/ld+json">{"@type": "Organization", "name": "Shop", "url": "https://example.com/"}</script>',
+        "<script>%s</script>" % "".join(f"var v{i} = {{'a': {i}}};\n" for i in range(200)),
+    ]
+    body = "".join(
+        f'<div class="item" itemscope itemtype="https://schema.org/Product"><h3 itemprop="name">{item["name"]}</h3>'
+        f'<img itemprop="image" src="/img/{i}.jpg"><p class="description">{sentence(rng)}</p>'
+        f'<span itemprop="price" content="{item["offers"]["price"]}">{item["offers"]["price"]} EUR</span>'
+        f'<a href="/item/{i}" itemprop="url">More</a></div>'
+        for i, item in enumerate(items)
+    )
+    return "<html><head>%s</head><body>%s</body></html>" % ("".join(head), body)
+
+
+def deeply_nested_html(depth: int, seed: int = 0) -> str:
+    """
+    Pathologically nested markup, as sometimes produced by broken page builders. lxml's HTML parser caps nesting at 256 levels,
+    so the nesting is made of many sibling towers, each about as deep as the parser allows.
+    """
+    rng = random.Random(seed)
+    tower_depth = min(depth, 120)  # each level is made of two elements
+    towers = []
+    for _ in range(max(1, depth // tower_depth)):
+        tower = "<div><span>%s " % sentence(rng, 1, 3)
+        towers.append(tower * tower_depth + "</span></div>" * tower_depth)
+    return "<html><body>%s</body></html>" % "".join(towers)
+
+
+def form_html(num_fields: int, num_options: int = 200, seed: int = 0) -> str:
+    """
+    A large form, with text inputs, checkboxes, and a few long `<select>`s, such as country lists.
+    """
+    rng = random.Random(seed)
+    fields = []
+    for i in range(num_fields):
+        roll = rng.random()
+        if roll < 0.1:
+            options = "".join(f'<option value="{j}">{rng.choice(WORDS)}</option>' for j in range(num_options))
+            fields.append(f'<select name="select-{i}">{options}</select>')
+        elif roll < 0.3:
+            fields.append(f'<input type="checkbox" name="check-{i}" value="on" checked>')
+        else:
+            fields.append(f'<label>{sentence(rng, 1, 3)} <input type="text" name="text-{i}" value="{rng.choice(WORDS)}"></label>')
+    return '<html><body><form method="POST" action="/submit">%s</form></body></html>' % "".join(fields)
+
+
+def product_feed_xml(num_products: int, seed: int = 0) -> bytes:
+    """
+    An XML product feed, such as those exported by e-commerce platforms.
+    """
+    rng = random.Random(seed)
+    products = "".join(
+        f'  <product sku="{i}">\n    <name>{sentence(rng, 2, 6)}</name>\n    <description>{sentence(rng)}</description>\n'
+        f'    <price currency="EUR">{rng.randint(1, 999)}.99</price>\n    <link>https://example.com/p/{i}</link>\n  </product>\n'
+        for i in range(num_products)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<feed>\n{products}</feed>\n'.encode()
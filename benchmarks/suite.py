@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for every public klon entry point, over a range of synthetic documents.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json
+
+Results are written as JSON. When comparing against a previous results file, the exit status is non-zero if any benchmark is
+slower than its baseline by more than the given threshold, so that regressions can be caught before a release.
+"""
+
+# standards
+import argparse
+from collections.abc import Callable
+import copy
+from functools import partial
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from timeit import Timer
+from typing import Any, NamedTuple
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from benchmarks.corpus import (
+    article_html,
+    cluttered_html,
+    deeply_nested_html,
+    form_html,
+    link_heavy_html,
+    listing_html,
+    product_feed_xml,
+    product_page_html,
+    small_html,
+    table_html,
+)
+import klon
+from klon.text import BLOCK_TAGS
+from klon.version import KLON_VERSION
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Called once (or once per run, if `mutates` is set), returns the arguments to pass to `func`
+    setup: Callable[[], tuple[Any, ...]]
+    func: Callable[..., Any]
+    # Functions that modify their input need a fresh copy of it for each run, so each run times a single call
+    mutates: bool = False
+
+
+class Corpus:
+    """
+    The documents are generated lazily, and only once, since some of them take a while to build.
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[str, Any] = {}
+
+    def get(self, key: str, factory: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def small_html(self) -> str:
+        return self.get("small_html", small_html)
+
+    @property
+    def large_html(self) -> str:
+        return self.get("large_html", lambda: article_html(5000))
+
+    @property
+    def nested_html(self) -> str:
+        return self.get("nested_html", lambda: deeply_nested_html(5000))
+
+    @property
+    def links_html(self) -> str:
+        return self.get("links_html", lambda: link_heavy_html(10000))
+
+    @property
+    def cluttered_html(self) -> str:
+        return self.get("cluttered_html", lambda: cluttered_html(5000))
+
+    @property
+    def listing_html(self) -> str:
+        return self.get("listing_html", lambda: listing_html(500))
+
+    @property
+    def table_html(self) -> str:
+        return self.get("table_html", lambda: table_html(5000))
+
+    @property
+    def product_page_html(self) -> str:
+        return self.get("product_page_html", lambda: product_page_html(500))
+
+    @property
+    def form_html(self) -> str:
+        return self.get("form_html", lambda: form_html(300))
+
+    @property
+    def large_xml(self) -> bytes:
+        return self.get("large_xml", lambda: product_feed_xml(20000))
+
+    def etree(self, name: str) -> ET._Element:
+        return self.get(f"{name}_etree", lambda: klon.parse_html_etree(getattr(self, name)))
+
+
+def build_benchmarks(corpus: Corpus) -> list[Benchmark]:
+    def html_bytes(name: str) -> bytes:
+        return corpus.get(f"{name}_bytes", lambda: getattr(corpus, name).encode())
+
+    # Setup functions for benchmarks that are repeated over several documents
+    def document_args(name: str) -> tuple[str]:
+        return (getattr(corpus, name),)
+
+    def etree_args(name: str) -> tuple[ET._Element]:
+        return (corpus.etree(name),)
+
+    def fresh_etree(name: str) -> ET._Element:
+        return copy.deepcopy(corpus.etree(name))
+
+    cleaner = klon.Cleaner(tags={"script", "style", "nav", "footer"}, class_patterns=[r"\bad-"], empty_tags=BLOCK_TAGS)
+
+    listing_schema = klon.Schema(
+        {
+            "title": "h1",
+            "items": klon.Field(
+                "div.item",
+                klon.Schema({"title": "h3", "url": klon.Field("h3 a", "url"), "price": klon.Field("span.price", clean=float)}),
+                many=True,
+            ),
+        }
+    )
+
+    card_spec = (
+        "div.product",
+        ["h2.title", ["a", {"href": "/product/1"}, "Product"]],
+        ["p.price", "Price: ", ["span.amount", "12.50"], " EUR"],
+    )
+    card_template = klon.compile_etree(
+        "div.product",
+        ["h2.title", ["a", {"href": klon.Placeholder("url")}, klon.Placeholder("title")]],
+        ["p.price", "Price: ", ["span.amount", klon.Placeholder("price")], " EUR"],
+    )
+
+    benchmarks = [
+        Benchmark(f"parse_html_etree[{name}]", partial(document_args, name), klon.parse_html_etree)
+        for name in ("small_html", "large_html", "nested_html", "links_html")
+    ]
+    benchmarks += [
+        Benchmark("parse_html_etree[large_html_bytes]", lambda: (html_bytes("large_html"),), klon.parse_html_etree),
+        Benchmark(
+            "iterparse_html[large_html]",
+            lambda: (html_bytes("large_html"),),
+            lambda html: sum(1 for _ in klon.iterparse_html(io.BytesIO(html), "p")),
+        ),
+        Benchmark("parse_xml_etree[large_xml]", lambda: (corpus.large_xml,), klon.parse_xml_etree),
+        Benchmark(
+            "iterparse_xml[large_xml]",
+            lambda: (corpus.large_xml,),
+            lambda xml: sum(1 for _ in klon.iterparse_xml(io.BytesIO(xml), "product")),
+        ),
+    ]
+    for name in ("small_html", "large_html", "nested_html"):
+        benchmarks += [
+            Benchmark(f"extract_text[{name}]", partial(etree_args, name), klon.extract_text),
+            Benchmark(f"extract_multiline_text[{name}]", partial(etree_args, name), klon.extract_multiline_text),
+        ]
+    benchmarks += [
+        Benchmark(
+            "extract_text[large_html, max_chars=200]",
+            lambda: (corpus.etree("large_html"),),
+            lambda etree: klon.extract_text(etree, max_chars=200),
+        ),
+        Benchmark("extract_html_text[large_html_bytes]", lambda: (html_bytes("large_html"),), klon.extract_html_text),
+        Benchmark("extract_html_text[cluttered_html]", lambda: (corpus.cluttered_html,), klon.extract_html_text),
+        Benchmark("fingerprint[large_html]", lambda: (corpus.etree("large_html"),), klon.fingerprint),
+        Benchmark(
+            "select[small_html]",
+            lambda: (corpus.etree("small_html"), "div.item > h3 a::attr(href)"),
+            klon.select,
+        ),
+        Benchmark("normalize_spaces[large_html]", lambda: (corpus.large_html,), klon.normalize_spaces),
+        Benchmark("extract_js_str[large_html]", lambda: (corpus.etree("large_html"),), klon.extract_js_str),
+        Benchmark(
+            "make_all_urls_absolute[links_html]",
+            lambda: ("https://example.com/dir/", fresh_etree("links_html")),
+            klon.make_all_urls_absolute,
+            mutates=True,
+        ),
+        Benchmark(
+            "extract_links[links_html]",
+            lambda: ("https://example.com/dir/", corpus.etree("links_html")),
+            klon.extract_links,
+        ),
+        Benchmark(
+            "parse_form[form_html]",
+            lambda: (corpus.etree("form_html").find(".//form"), "https://example.com/"),
+            klon.parse_form,
+        ),
+        Benchmark(
+            "parse_forms[form_html]",
+            lambda: (corpus.etree("form_html"), "https://example.com/"),
+            klon.parse_forms,
+        ),
+        Benchmark(
+            "Schema.extract[listing_html]",
+            lambda: (corpus.etree("listing_html"), "https://example.com/"),
+            listing_schema.extract,
+        ),
+        Benchmark(
+            "extract_metadata[product_page_html]",
+            lambda: (corpus.etree("product_page_html"), "https://example.com/"),
+            klon.extract_metadata,
+        ),
+        Benchmark("extract_table[table_html]", lambda: (corpus.etree("table_html").find(".//table"),), klon.extract_table),
+        Benchmark("build_etree[card]", lambda: card_spec, klon.build_etree),
+        Benchmark(
+            "compile_etree[card].build",
+            lambda: (),
+            lambda: card_template.build(url="/product/1", title="Product", price="12.50"),
+        ),
+        Benchmark(
+            "detach[large_html, all <b>]",
+            lambda: (fresh_etree("large_html"),),
+            lambda etree: [klon.detach(node) for node in etree.iter("b")],
+            mutates=True,
+        ),
+        Benchmark(
+            "detach_all[large_html, all <b>]",
+            lambda: (fresh_etree("large_html"),),
+            lambda etree: klon.detach_all(etree.iter("b")),
+            mutates=True,
+        ),
+        Benchmark(
+            "Cleaner.clean[cluttered_html]",
+            lambda: (fresh_etree("cluttered_html"),),
+            cleaner.clean,
+            mutates=True,
+        ),
+        Benchmark("tostring[large_html]", lambda: (corpus.etree("large_html"),), klon.tostring),
+        Benchmark(
+            "tostring[large_html, bytes]",
+            lambda: (corpus.etree("large_html"),),
+            lambda etree: klon.tostring(etree, encoding="UTF-8"),
+        ),
+        Benchmark(
+            "iter_tostring[large_html, bytes]",
+            lambda: (corpus.etree("large_html"),),
+            lambda etree: sum(len(chunk) for chunk in klon.iter_tostring(etree, encoding="UTF-8")),
+        ),
+        Benchmark(
+            "write_tostring[large_html, bytes]",
+            lambda: (corpus.etree("large_html"),),
+            lambda etree: klon.write_tostring(etree, io.BytesIO(), encoding="UTF-8"),
+        ),
+    ]
+    return benchmarks
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int) -> dict[str, float]:
+    """
+    Returns the best and median time per call, in seconds, over `repeat` runs.
+    """
+    if benchmark.mutates:
+        timings = []
+        for _ in range(repeat):
+            args = benchmark.setup()
+            start = time.perf_counter()
+            benchmark.func(*args)
+            timings.append(time.perf_counter() - start)
+    else:
+        args = benchmark.setup()
+        timer = Timer(lambda: benchmark.func(*args))
+        number, _ = timer.autorange()
+        timings = [seconds / number for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(timings), "median": statistics.median(timings)}
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> bool:
+    """
+    Prints a comparison table, and returns False iff any benchmark regressed by more than `threshold`.
+    """
+    ok = True
+    for name, timings in results.items():
+        if name not in baseline:
+            print("%-48s %10s %10.3f ms" % (name, "-", timings["best"] * 1000))
+            continue
+        ratio = timings["best"] / baseline[name]["best"]
+        regressed = ratio > 1 + threshold
+        ok = ok and not regressed
+        print(
+            "%-48s %10.3f ms %10.3f ms  x%.2f%s"
+            % (name, baseline[name]["best"] * 1000, timings["best"] * 1000, ratio, "  REGRESSION" if regressed else "")
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="number of timed runs per benchmark (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-c", "--compare", help="compare the results with those in this JSON file")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="when comparing, how much slower a benchmark can be before it counts as a regression (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for benchmark in build_benchmarks(Corpus()):
+        if args.filter and args.filter not in benchmark.name:
+            continue
+        results[benchmark.name] = run_benchmark(benchmark, args.repeat)
+        if not args.compare:
+            print(
+                "%-48s %10.3f ms  (median %.3f ms)"
+                % (benchmark.name, results[benchmark.name]["best"] * 1000, results[benchmark.name]["median"] * 1000)
+            )
+
+    if args.output:
+        report = {
+            "klon_version": KLON_VERSION,
+            "lxml_version": ".".join(map(str, ET.LXML_VERSION)),
+            "libxml_version": ".".join(map(str, ET.LIBXML_VERSION)),
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="UTF-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="UTF-8") as file:
+            baseline = json.load(file)["results"]
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,67 @@
 #!/usr/bin/env python3
 
-from .build import build_etree
-from .forms import parse_form
-from .html import extract_js_str, make_all_urls_absolute, parse_html_etree
+# standards
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .build import EtreeTemplate, Placeholder, build_etree, compile_etree
+from .clean import Cleaner
+from .fingerprint import Fingerprint, fingerprint
+from .html import Link, extract_html_text, extract_js_str, extract_links, iterparse_html, make_all_urls_absolute, parse_html_etree
+from .instrumentation import instrumented
+from .metadata import JsonLd, Metadata, extract_metadata
+from .schema import Field, Schema
+from .selectors import select
+from .tables import Table, extract_table
 from .text import extract_multiline_text, extract_text, normalize_spaces
-from .utils import Element, detach, is_element, tostring
-from .xml import parse_xml_etree
+from .utils import Element, detach, detach_all, is_element, iter_tostring, tostring, write_tostring
+from .xml import iterparse_xml, parse_xml_etree
+
+# When instrumentation is enabled, calls to the public functions are timed and recorded, see klon/instrumentation.py
+build_etree = instrumented(build_etree, document_arg=None)
+compile_etree = instrumented(compile_etree, document_arg=None)
+extract_html_text = instrumented(extract_html_text)
+extract_js_str = instrumented(extract_js_str)
+extract_links = instrumented(extract_links, document_arg=1)
+extract_metadata = instrumented(extract_metadata)
+iterparse_html = instrumented(iterparse_html, document_arg=None)
+make_all_urls_absolute = instrumented(make_all_urls_absolute, document_arg=1)
+parse_html_etree = instrumented(parse_html_etree)
+extract_multiline_text = instrumented(extract_multiline_text)
+extract_text = instrumented(extract_text)
+extract_table = instrumented(extract_table)
+fingerprint = instrumented(fingerprint)
+normalize_spaces = instrumented(normalize_spaces)
+select = instrumented(select)
+detach = instrumented(detach)
+detach_all = instrumented(detach_all, document_arg=None)
+tostring = instrumented(tostring)
+iter_tostring = instrumented(iter_tostring)
+write_tostring = instrumented(write_tostring)
+iterparse_xml = instrumented(iterparse_xml, document_arg=None)
+parse_xml_etree = instrumented(parse_xml_etree)
+
+if TYPE_CHECKING:
+    from .forms import FormRequest, parse_form, parse_forms
+
+# These are only imported when first accessed, so that `import klon` doesn't pay for importing `requests`
+_LAZY_ATTRIBUTES = {
+    "FormRequest": ".forms",
+    "parse_form": ".forms",
+    "parse_forms": ".forms",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    if callable(value) and not isinstance(value, type):
+        value = instrumented(value)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
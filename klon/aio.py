@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+Async versions of klon's most expensive functions, for use from asyncio code. They run the work in a thread pool, so that a large
+document doesn't block the event loop while it's being parsed or processed. lxml releases the GIL while parsing, so parsing can
+also overlap with the event loop's own work.
+
+The number of calls in flight (running or waiting for a thread) is bounded, so that a producer that's faster than the pool waits
+instead of queueing up an unbounded number of documents in memory. Trees passed to these functions must not be modified by other
+code until the call returns.
+"""
+
+# standards
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+from typing import Any, TypeVar
+import weakref
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from . import html, text, utils, xml
+
+T = TypeVar("T")
+
+
+class _Pool:
+    def __init__(self, max_workers: int | None, max_in_flight: int | None) -> None:
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="klon-aio")
+        self.max_in_flight = max_in_flight or 2 * max_workers
+        # asyncio semaphores can only be used from one event loop, so there's one per loop
+        self.semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+    def semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return semaphore
+
+
+_pool: _Pool | None = None
+
+_pool_lock = threading.Lock()
+
+
+def configure(*, max_workers: int | None = None, max_in_flight: int | None = None) -> None:
+    """
+    Replace the thread pool with one of `max_workers` threads (by default, up to 4), allowing at most `max_in_flight` calls to be
+    running or queued at any time (by default, twice the number of threads). Calls already in flight complete in the old pool.
+    """
+    global _pool  # noqa: PLW0603
+    with _pool_lock:
+        old_pool, _pool = _pool, _Pool(max_workers, max_in_flight)
+    if old_pool is not None:
+        old_pool.executor.shutdown(wait=False)
+
+
+def _get_pool() -> _Pool:
+    global _pool  # noqa: PLW0603
+    with _pool_lock:
+        if _pool is None:
+            _pool = _Pool(None, None)
+        return _pool
+
+
+async def run(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Call `func(*args, **kwargs)` in klon's thread pool, waiting first if too many calls are already in flight.
+    """
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    semaphore = pool.semaphore(loop)
+    await semaphore.acquire()
+    try:
+        future = pool.executor.submit(func, *args, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+
+    def release(_future: Future) -> None:
+        # If the caller is cancelled while its call is running, the slot is only freed once the thread is actually done
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            pass  # the event loop has been closed
+
+    future.add_done_callback(release)
+    return await asyncio.wrap_future(future)
+
+
+async def parse_html_etree(
+    html_str: str | bytes,
+    remove_comments: bool = False,
+    *,
+    content_type: str | None = None,
+) -> ET._Element:
+    return await run(html.parse_html_etree, html_str, remove_comments, content_type=content_type)
+
+
+async def parse_xml_etree(xml_str: str | bytes, remove_comments: bool = False) -> ET._Element:
+    return await run(xml.parse_xml_etree, xml_str, remove_comments)
+
+
+async def extract_text(etree: ET._Element, *, multiline: bool = False, max_chars: int | None = None) -> str:
+    return await run(text.extract_text, etree, multiline=multiline, max_chars=max_chars)
+
+
+async def extract_multiline_text(etree: ET._Element, *, max_chars: int | None = None) -> str:
+    return await run(text.extract_multiline_text, etree, max_chars=max_chars)
+
+
+async def extract_html_text(
+    html_str: str | bytes,
+    *,
+    multiline: bool = False,
+    max_chars: int | None = None,
+    content_type: str | None = None,
+) -> str:
+    return await run(html.extract_html_text, html_str, multiline=multiline, max_chars=max_chars, content_type=content_type)
+
+
+async def make_all_urls_absolute(base_url: str, etree: ET._Element) -> None:
+    await run(html.make_all_urls_absolute, base_url, etree)
+
+
+async def extract_links(base_url: str, etree: ET._Element) -> tuple[html.Link, ...]:
+    return await run(html.extract_links, base_url, etree)
+
+
+async def tostring(etree: utils.Element, encoding: type[str] | str = str, **kwargs: Any) -> str | bytes:
+    return await run(utils.tostring, etree, encoding, **kwargs)
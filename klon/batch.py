@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+# standards
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+import os
+from typing import TYPE_CHECKING, Any
+
+# klon
+from .html import extract_js_str, make_all_urls_absolute, parse_html_etree
+from .text import extract_multiline_text, extract_text
+from .utils import tostring
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+Step = str | tuple[str, dict[str, Any]]
+
+CompiledSteps = tuple[tuple[str, dict[str, Any]], ...]
+
+Document = tuple[str, str | bytes]
+
+
+# Transform steps modify the document in place. They're called with the document's URL and its etree.
+TRANSFORM_STEPS: dict[str, Callable[..., None]] = {
+    "make_all_urls_absolute": make_all_urls_absolute,
+}
+
+# Output steps each add one entry to the result dict returned for every document. They're called with the document's etree.
+OUTPUT_STEPS: dict[str, Callable[..., Any]] = {
+    "extract_js_str": extract_js_str,
+    "extract_multiline_text": extract_multiline_text,
+    "extract_text": extract_text,
+    "tostring": tostring,
+}
+
+
+def process_documents(  # noqa: PLR0913
+    documents: Iterable[Document],
+    steps: Sequence[Step],
+    *,
+    ordered: bool = True,
+    max_workers: int | None = None,
+    chunk_size: int = 64,
+    remove_comments: bool = False,
+    cache: "ResultCache | None" = None,
+    errors: str = "raise",
+) -> Iterator[dict[str, Any]]:
+    """
+    Parse every `(url, html)` pair in `documents` and run `steps` over it, in a pool of `max_workers` processes. Yields one dict per
+    document, with the document's URL under the "url" key, and the value produced by each output step under that step's name.
+
+    lxml trees can't be pickled, so documents are parsed and processed entirely within the workers, and only these plain results
+    are sent back. Steps are given by name, optionally paired with a dict of keyword arguments, e.g.
+
+        process_documents(pages, ["make_all_urls_absolute", "extract_text", ("tostring", {"method": "xml"})])
+
+    Documents are sent to the workers in chunks of `chunk_size`, and the input iterable is consumed lazily, with only a few chunks
+    per worker in flight at any time. With `ordered=False`, results are yielded as soon as their chunk is done, rather than in input
+    order.
+
+    If a `klon.cache.ResultCache` is given, results are looked up in it before documents are sent to the workers, and only the
+    documents that miss are processed, after which their results are added to the cache.
+
+    By default, an exception raised while processing any document (e.g. by `parse_html_etree`, for an empty document) ends the
+    whole run. With `errors="return"`, it's returned instead, as the document's result dict `{"url": url, "error": exception}`, and
+    the other documents are processed as usual. Such results aren't cached.
+    """
+    if errors not in ("raise", "return"):
+        raise ValueError(f"Invalid errors mode: {errors!r}")
+    compiled_steps = _compile_steps(steps)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    documents_iter = iter(documents)
+    pending: deque[_SubmittedChunk] = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                while len(pending) < 2 * max_workers:
+                    chunk = list(islice(documents_iter, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(_submit_chunk(executor, chunk, compiled_steps, remove_comments, cache, errors))
+                if not pending:
+                    break
+                if ordered:
+                    yield from pending.popleft().results()
+                else:
+                    done, _not_done = wait([submitted.future for submitted in pending], return_when=FIRST_COMPLETED)
+                    for submitted in [submitted for submitted in pending if submitted.future in done]:
+                        pending.remove(submitted)
+                        yield from submitted.results()
+        finally:
+            # If the caller stops iterating early, don't wait for the remaining chunks to be processed
+            for submitted in pending:
+                submitted.future.cancel()
+
+
+class _SubmittedChunk:
+    """
+    A chunk of documents whose results are being computed by the workers. When a cache is used, `future` only computes the results
+    of the documents that weren't found in the cache, and `results` merges them with the cached ones, and adds them to the cache.
+    This is done in the thread that consumes the results, rather than in a callback of the future, so that errors raised while
+    writing to the cache (e.g. "database is locked") reach the caller.
+    """
+
+    def __init__(
+        self,
+        future: Future,
+        cache: "ResultCache | None" = None,
+        keys: Sequence[bytes] = (),
+        cached_results: list[dict[str, Any] | None] | None = None,
+    ) -> None:
+        self.future = future
+        self.cache = cache
+        self.keys = keys
+        self.cached_results = cached_results
+
+    def results(self) -> list[dict[str, Any]]:
+        computed = self.future.result()
+        if self.cache is None or self.cached_results is None:
+            return computed
+        results = []
+        misses = iter(computed)
+        for key, cached in zip(self.keys, self.cached_results):
+            if cached is None:
+                result = next(misses)
+                if "error" not in result:
+                    self.cache.put_result(key, result)
+                results.append(result)
+            else:
+                results.append(cached)
+        return results
+
+
+def _submit_chunk(
+    executor: ProcessPoolExecutor,
+    chunk: list[Document],
+    steps: CompiledSteps,
+    remove_comments: bool,
+    cache: "ResultCache | None",
+    errors: str,
+) -> _SubmittedChunk:
+    if cache is None:
+        return _SubmittedChunk(executor.submit(_process_chunk, chunk, steps, remove_comments, errors))
+    keys = [cache.document_key(url, html, steps, remove_comments) for url, html in chunk]
+    cached_results = [cache.get(key) for key in keys]
+    misses = [document for document, result in zip(chunk, cached_results) if result is None]
+    if misses:
+        future = executor.submit(_process_chunk, misses, steps, remove_comments, errors)
+    else:
+        future = Future()
+        future.set_result([])
+    return _SubmittedChunk(future, cache, keys, cached_results)
+
+
+def _compile_steps(steps: Sequence[Step]) -> CompiledSteps:
+    compiled = []
+    output_names = set()
+    for step in steps:
+        name, kwargs = (step, {}) if isinstance(step, str) else step
+        if name in OUTPUT_STEPS:
+            if name in output_names:
+                raise ValueError(f"Output step {name!r} appears more than once")
+            output_names.add(name)
+        elif name not in TRANSFORM_STEPS:
+            raise ValueError(f"Unknown step: {name!r}")
+        compiled.append((name, dict(kwargs)))
+    return tuple(compiled)
+
+
+def _process_chunk(
+    chunk: list[Document],
+    steps: CompiledSteps,
+    remove_comments: bool,
+    errors: str,
+) -> list[dict[str, Any]]:
+    # This runs in the worker processes
+    if errors == "raise":
+        return [_process_document(url, html, steps, remove_comments) for url, html in chunk]
+    results = []
+    for url, html in chunk:
+        try:
+            results.append(_process_document(url, html, steps, remove_comments))
+        except Exception as error:
+            results.append({"url": url, "error": error})
+    return results
+
+
+def _process_document(
+    url: str,
+    html: str | bytes,
+    steps: CompiledSteps,
+    remove_comments: bool,
+) -> dict[str, Any]:
+    etree = parse_html_etree(html, remove_comments=remove_comments)
+    result: dict[str, Any] = {"url": url}
+    for name, kwargs in steps:
+        if name in TRANSFORM_STEPS:
+            TRANSFORM_STEPS[name](url, etree, **kwargs)
+        else:
+            result[name] = OUTPUT_STEPS[name](etree, **kwargs)
+    return result
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
 # standards
+import copy
+from dataclasses import dataclass
+from functools import lru_cache
 import re
-from typing import Any, no_type_check
+from typing import Any, NamedTuple, no_type_check
 
 # 3rd parties
 import lxml.etree as ET  # noqa: N812
@@ -30,12 +33,20 @@ def _compile_attrib(*args) -> tuple[dict, tuple[Any, ...]]:
 
 
 def _parse_css_style_tags(tag: str, attrib: dict) -> tuple[str, dict]:
+    tag, key, value = _split_css_style_tag(tag)
+    if key is not None:
+        attrib[key] = value
+    return tag, attrib
+
+
+@lru_cache(maxsize=1024)
+def _split_css_style_tag(tag: str) -> tuple[str, str | None, str | None]:
+    # The same few tag strings tend to be used over and over, so they only get parsed once
     match = re.search(r"^(.+?)(\#|\.)(.+)", tag)
     if match:
         tag, key, value = match.groups()
-        key = {"#": "id", ".": "class"}[key]
-        attrib[key] = value
-    return tag, attrib
+        return tag, {"#": "id", ".": "class"}[key], value
+    return tag, None, None
 
 
 @no_type_check  # until lxml-stubs improves
@@ -54,3 +65,105 @@ def _append_children(element: ET._Element, args: tuple[Any, ...]) -> None:
                 child = build_etree(*child)  # noqa: PLW2901
             element.append(child)
             text_anchor = child
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """
+    Marks a value in an `EtreeTemplate` that is to be filled when the template is built. Placeholders can stand for an attribute
+    value, or for a text string, anywhere `build_etree` accepts one.
+    """
+
+    name: str
+
+
+class _Slot(NamedTuple):
+    path: tuple[int, ...]  # child indices leading from the template's root to the element
+    field: str  # "text", "tail", or an attribute name
+    fragments: tuple[str | Placeholder, ...]
+
+
+class EtreeTemplate:
+    """
+    A `build_etree` spec, compiled once so that it can be built many times over with different values for its `Placeholder`s.
+    Building a template deep-copies a prebuilt tree and fills in the placeholders, without going through the spec again.
+    """
+
+    def __init__(self, tag: str, *args) -> None:
+        if not isinstance(tag, str):
+            raise ValueError(f"Tag must be a str, got {tag!r}")
+        self._slots: list[_Slot] = []
+        self._skeleton = self._compile(tag, args, ())
+        self.placeholder_names = frozenset(
+            fragment.name for slot in self._slots for fragment in slot.fragments if isinstance(fragment, Placeholder)
+        )
+
+    def build(self, **values: str | None) -> ET._Element:
+        """
+        Build a new element tree from the template. A `None` value leaves the attribute unset, or the text empty.
+        """
+        missing = self.placeholder_names.difference(values)
+        if missing:
+            raise ValueError("No value given for placeholders: %s" % ", ".join(sorted(missing)))
+        root = copy.deepcopy(self._skeleton)
+        for path, field, fragments in self._slots:
+            element = root
+            for index in path:
+                element = element[index]
+            value = _fill_fragments(fragments, values)
+            if field == "text":
+                element.text = value
+            elif field == "tail":
+                element.tail = value
+            elif value is None:
+                del element.attrib[field]
+            else:
+                element.set(field, value)
+        return root
+
+    @no_type_check  # until lxml-stubs improves
+    def _compile(self, tag: str, args: tuple[Any, ...], path: tuple[int, ...]) -> ET._Element:
+        attrib, args = _compile_attrib(*args)
+        tag, attrib = _parse_css_style_tags(tag, attrib)
+        for key, value in attrib.items():
+            if isinstance(value, Placeholder):
+                self._slots.append(_Slot(path, key, (value,)))
+                # Placeholder attributes are set on the skeleton, and overwritten when the template is built, so that they keep
+                # their place among the others
+                attrib[key] = ""
+        element = ET.Element(tag, attrib)
+        # Same logic as in `_append_children`, but text fragments are only gathered at this stage, since they may include
+        # placeholders
+        fragments: dict[int | None, list[str | Placeholder]] = {None: []}
+        text_anchor = None
+        for child in args:
+            if child in (None, (), []):
+                pass
+            elif isinstance(child, (str, Placeholder)):
+                fragments[text_anchor].append(child)
+            else:
+                if is_element(child):
+                    child = copy.deepcopy(child)  # noqa: PLW2901
+                else:
+                    child = self._compile(child[0], child[1:], (*path, len(element)))  # noqa: PLW2901
+                element.append(child)
+                text_anchor = len(element) - 1
+                fragments[text_anchor] = [child.tail] if child.tail else []
+        for anchor, anchor_fragments in fragments.items():
+            field, target_path = ("text", path) if anchor is None else ("tail", (*path, anchor))
+            if any(isinstance(fragment, Placeholder) for fragment in anchor_fragments):
+                self._slots.append(_Slot(target_path, field, tuple(anchor_fragments)))
+            elif anchor_fragments:
+                target = element if anchor is None else element[anchor]
+                setattr(target, field, "".join(anchor_fragments))
+        return element
+
+
+def compile_etree(tag: str, *args) -> EtreeTemplate:
+    return EtreeTemplate(tag, *args)
+
+
+def _fill_fragments(fragments: tuple[str | Placeholder, ...], values: dict[str, str | None]) -> str | None:
+    if len(fragments) == 1 and isinstance(fragments[0], Placeholder):
+        return values[fragments[0].name]
+    return "".join((values[fragment.name] or "") if isinstance(fragment, Placeholder) else fragment for fragment in fragments)
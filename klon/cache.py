@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+"""
+An on-disk cache of extraction results, for pipelines that re-process the same documents many times. Results are stored in an
+SQLite database, keyed on a hash of the input document, of the function that produced them and its options, and of klon's
+version, so that upgrading klon invalidates all cached results. Only plain results (text, links, result dicts) are stored, as
+compressed JSON, never parsed trees.
+"""
+
+# standards
+from collections.abc import Callable, Sequence
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import TracebackType
+from typing import Any
+import zlib
+
+# klon
+from .batch import Step, _compile_steps, _process_document
+from .html import Link, extract_html_text, extract_links, parse_html_etree
+from .version import KLON_VERSION
+
+# When the cache grows over its maximum size, the least recently used entries are evicted until it is back under this fraction of
+# its maximum, so that eviction doesn't run again on every subsequent write
+_EVICTION_TARGET = 0.9
+
+# Cache hits record their access time, so that eviction spares recently used entries. These updates are held in memory and
+# written in batches of this size, so that a run that's all hits doesn't pay for one write per lookup.
+_MAX_PENDING_TOUCHES = 1000
+
+# Results are mostly text, which the fastest level already compresses well. Higher levels cost more than the extraction itself.
+_COMPRESSION_LEVEL = 1
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        key BLOB PRIMARY KEY,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+class ResultCache:
+    """
+    A content-addressed cache of extraction results, stored in the SQLite database at `path`, and holding no more than about
+    `max_size` bytes of (compressed) results. Least recently used entries are evicted first.
+
+    The cache can be shared between threads. Several processes can use the same database, though each only evicts based on its
+    own view of the cache's size, which is refreshed whenever it thinks the cache is full.
+    """
+
+    def __init__(self, path: str | os.PathLike, *, max_size: int = 1 << 30) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._size = self._total_size()
+        self._pending_touches: dict[bytes, float] = {}
+
+    def get(self, key: bytes) -> Any | None:
+        """
+        Returns the value stored under `key`, or `None` if there isn't one.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._pending_touches[key] = time.time()
+            if len(self._pending_touches) >= _MAX_PENDING_TOUCHES:
+                self._flush_touches()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: bytes, value: Any) -> None:
+        """
+        Store `value`, which must be serialisable to JSON, under `key`. Tuples are stored as lists.
+        """
+        data = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("UTF-8"), _COMPRESSION_LEVEL)
+        with self._lock:
+            old_row = self._connection.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._size += len(data) - (old_row[0] if old_row else 0)
+            if self._size > self.max_size:
+                self._evict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """
+        The total size, in bytes, of the compressed results held in the cache.
+        """
+        return self._size
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches()
+            self._connection.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def extract_text(
+        self,
+        html_str: str | bytes,
+        *,
+        remove_comments: bool = False,
+        multiline: bool = False,
+        max_chars: int | None = None,
+    ) -> str:
+        """
+        Same as `extract_text(parse_html_etree(html_str, remove_comments))`, but only parses the document on a cache miss.
+        """
+        options = {"remove_comments": remove_comments, "multiline": multiline, "max_chars": max_chars}
+        return self._cached(
+            cache_key("extract_text", html_str, options),
+            # Comments never contribute any text, so `remove_comments` makes no difference here
+            lambda: extract_html_text(html_str, multiline=multiline, max_chars=max_chars),
+        )
+
+    def extract_multiline_text(
+        self,
+        html_str: str | bytes,
+        *,
+        remove_comments: bool = False,
+        max_chars: int | None = None,
+    ) -> str:
+        return self.extract_text(html_str, remove_comments=remove_comments, multiline=True, max_chars=max_chars)
+
+    def extract_links(self, base_url: str, html_str: str | bytes, *, remove_comments: bool = False) -> tuple[Link, ...]:
+        """
+        Same as `extract_links(base_url, parse_html_etree(html_str, remove_comments))`, but only parses the document on a cache
+        miss.
+        """
+        options = {"base_url": base_url, "remove_comments": remove_comments}
+        links = self._cached(
+            cache_key("extract_links", html_str, options),
+            lambda: extract_links(base_url, parse_html_etree(html_str, remove_comments)),
+        )
+        return tuple(Link(*link) for link in links)
+
+    def process_document(
+        self,
+        url: str,
+        html_str: str | bytes,
+        steps: Sequence[Step],
+        *,
+        remove_comments: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Returns the same result dict as `klon.batch.process_documents` does for one document, but only parses and processes the
+        document on a cache miss.
+        """
+        compiled_steps = _compile_steps(steps)
+        return self._cached(
+            self.document_key(url, html_str, compiled_steps, remove_comments),
+            lambda: _process_document(url, html_str, compiled_steps, remove_comments),
+        )
+
+    def document_key(self, url: str, html_str: str | bytes, steps: Sequence[Step], remove_comments: bool) -> bytes:
+        """
+        The key under which `process_document` stores its results.
+        """
+        options = {"url": url, "steps": _compile_steps(steps), "remove_comments": remove_comments}
+        return cache_key("process_document", html_str, options)
+
+    def put_result(self, key: bytes, value: Any) -> None:
+        """
+        Same as `put`, but values that can't be stored as JSON (e.g. `bytes` returned by `tostring`) are silently not cached.
+        """
+        try:
+            self.put(key, value)
+        except TypeError:
+            pass
+
+    def _cached(self, key: bytes, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put_result(key, value)
+        return value
+
+    def _total_size(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _flush_touches(self) -> None:
+        if self._pending_touches:
+            self._connection.executemany(
+                "UPDATE results SET used = MAX(used, ?) WHERE key = ?",
+                [(used, key) for key, used in self._pending_touches.items()],
+            )
+            self._pending_touches.clear()
+
+    def _evict(self) -> None:
+        self._flush_touches()
+        # Other processes may have added or evicted entries since we last looked
+        self._size = self._total_size()
+        excess = self._size - int(self.max_size * _EVICTION_TARGET)
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in self._connection.execute("SELECT key, size FROM results ORDER BY used"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.execute("BEGIN")
+        self._connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+        self._connection.execute("COMMIT")
+        self._size = self._total_size()
+
+
+def cache_key(function_name: str, document: str | bytes, options: dict[str, Any]) -> bytes:
+    """
+    The key under which the result of calling `function_name` with the given options on `document` is stored. It covers the klon
+    version, so that results computed by an older version are never reused.
+    """
+    key_hash = hashlib.blake2b(digest_size=20)
+    header = json.dumps([KLON_VERSION, function_name, options], sort_keys=True, default=repr)
+    key_hash.update(header.encode("UTF-8") + b"\0")
+    # `str` and `bytes` documents can parse differently, since `bytes` go through encoding detection
+    if isinstance(document, str):
+        key_hash.update(b"s" + document.encode("UTF-8", "surrogatepass"))
+    else:
+        key_hash.update(b"b" + document)
+    return key_hash.digest()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+# standards
+from collections.abc import Iterable
+import re
+from typing import no_type_check
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from .text import NON_CONTENT_TAGS
+from .utils import detach_all
+
+_RE_DISPLAY_NONE = re.compile(r"(?:^|;)\s*display\s*:\s*none\s*(?:!important\s*)?(?:;|$)", re.I)
+
+
+class Cleaner:
+    """
+    A set of rules for removing unwanted nodes from HTML documents, compiled once so that it can be applied to any number of
+    documents. All rules are checked in a single traversal of the tree, and removed nodes are detached as with `detach_all`, so
+    that their tails are preserved.
+
+    - `tags`: nodes with any of these tags are removed. Defaults to `NON_CONTENT_TAGS`.
+    - `class_patterns`, `id_patterns`: nodes whose `class` or `id` attribute matches (as in `re.search`) any of these regexes are
+      removed.
+    - `hidden`: if true, nodes that have a `hidden` attribute, `aria-hidden="true"`, or `display: none` in their inline style,
+      are removed.
+    - `empty_tags`: nodes with these tags are removed if, once the other rules have been applied, they contain neither text nor
+      elements, e.g. `BLOCK_TAGS`.
+
+    The root node given to `clean` is never removed itself.
+    """
+
+    def __init__(
+        self,
+        *,
+        tags: Iterable[str] = NON_CONTENT_TAGS,
+        class_patterns: Iterable[str] = (),
+        id_patterns: Iterable[str] = (),
+        hidden: bool = True,
+        empty_tags: Iterable[str] = (),
+    ) -> None:
+        self.tags = frozenset(tags)
+        self.class_re = _compile_patterns(class_patterns)
+        self.id_re = _compile_patterns(id_patterns)
+        self.hidden = hidden
+        self.empty_tags = frozenset(empty_tags)
+
+    @no_type_check  # until lxml-stubs improves
+    def clean(self, etree: ET._Element) -> list[ET._Element]:
+        """
+        Remove, in place, all nodes under `etree` that match the rules, and return them. Nodes under a removed node aren't visited,
+        and aren't included in the returned list.
+        """
+        removed: list[ET._Element] = []
+        # Each stack entry is a node, an iterator over its remaining children, the length of `removed` when the node was entered,
+        # and whether the node has any content left
+        stack = [[etree, iter(etree), 0, _has_text(etree.text)]]
+        while stack:
+            entry = stack[-1]
+            for child in entry[1]:
+                if not isinstance(child.tag, str) or self._is_removed(child):
+                    if isinstance(child.tag, str):
+                        removed.append(child)
+                    if _has_text(child.tail):
+                        entry[3] = True
+                else:
+                    stack.append([child, iter(child), len(removed), _has_text(child.text)])
+                    break
+            else:
+                stack.pop()
+                if stack:
+                    node, _children, removed_start, has_content = entry
+                    if not has_content and node.tag in self.empty_tags:
+                        # No need to detach this node's children separately, they go with it
+                        del removed[removed_start:]
+                        removed.append(node)
+                    else:
+                        stack[-1][3] = True
+                    if _has_text(node.tail):
+                        stack[-1][3] = True
+        return detach_all(removed)
+
+    @no_type_check  # until lxml-stubs improves
+    def _is_removed(self, node: ET._Element) -> bool:
+        if node.tag in self.tags:
+            return True
+        if self.class_re is not None and self.class_re.search(node.get("class", "")):
+            return True
+        if self.id_re is not None and self.id_re.search(node.get("id", "")):
+            return True
+        if self.hidden:
+            if node.get("hidden") is not None or node.get("aria-hidden") == "true":
+                return True
+            style = node.get("style")
+            if style and _RE_DISPLAY_NONE.search(style):
+                return True
+        return False
+
+
+def _compile_patterns(patterns: Iterable[str]) -> re.Pattern | None:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def _has_text(text: str | None) -> bool:
+    return bool(text and not text.isspace())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+# standards
+from array import array
+from collections import Counter
+import hashlib
+import heapq
+import sys
+from typing import NamedTuple
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from .text import _walk
+
+_MASK = (1 << 64) - 1
+
+_FNV_PRIME = 0x100000001B3
+
+# For every byte value, the positions of the bits that are set in it
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class Fingerprint(NamedTuple):
+    """
+    - `text_hash` is the hex digest of the document's text, as returned by `extract_text`, encoded in UTF-8
+    - `simhash` is a 64-bit SimHash of the text's word shingles. Similar texts have SimHashes that differ in few bits.
+    - `minhash` is a bottom-k MinHash sketch of the text's word shingles, i.e. the smallest distinct shingle hashes, sorted
+    """
+
+    text_hash: str
+    simhash: int
+    minhash: array
+
+    def simhash_distance(self, other: "Fingerprint") -> int:
+        """
+        The number of bits that differ between the two SimHashes, from 0 (near-identical) to 64.
+        """
+        return (self.simhash ^ other.simhash).bit_count()
+
+    def minhash_similarity(self, other: "Fingerprint") -> float:
+        """
+        An estimate of the Jaccard similarity of the two texts' sets of shingles, from 0.0 to 1.0.
+        """
+        k = min(len(self.minhash), len(other.minhash))
+        if k == 0:
+            return 1.0 if len(self.minhash) == len(other.minhash) else 0.0
+        ours, theirs = set(self.minhash), set(other.minhash)
+        both = ours & theirs
+        return sum(1 for value in heapq.nsmallest(k, ours | theirs) if value in both) / k
+
+
+def fingerprint(
+    etree: ET._Element,
+    *,
+    shingle_size: int = 3,
+    minhash_size: int = 128,
+    hash_name: str = "sha256",
+) -> Fingerprint:
+    """
+    Compute the fingerprint of the text of `etree`. The text is tokenised as it is being walked, so the document's text is never
+    assembled into one string. Shingles are runs of `shingle_size` consecutive words, hashed to 64 bits in a way that's stable
+    across processes and Python versions.
+    """
+    tokenizer = _Tokenizer(hash_name, shingle_size)
+    if isinstance(etree, ET._ElementUnicodeResult):
+        tokenizer(str(etree))
+    else:
+        _walk(etree, tokenizer, False)
+    shingles = tokenizer.finish()
+    return Fingerprint(
+        text_hash=tokenizer.text_hash.hexdigest(),
+        simhash=_simhash(shingles),
+        minhash=array("Q", heapq.nsmallest(minhash_size, set(shingles))),
+    )
+
+
+class _Tokenizer:
+    """
+    Receives the text fragments found by `_walk`, and splits them into words. A word can be spread over several fragments, as in
+    `<b>bold</b>er`, so the last word of each fragment is held back until we know whether the next fragment continues it.
+    """
+
+    def __init__(self, hash_name: str, shingle_size: int) -> None:
+        self.text_hash = hashlib.new(hash_name)
+        self.shingle_size = shingle_size
+        self.word_hashes = array("Q")
+        self.word_hash_cache: dict[str, int] = {}
+        self.carry = ""
+
+    def __call__(self, fragment: str) -> None:
+        words = fragment.split()
+        if not words:
+            if fragment:
+                self._flush()
+            return
+        if self.carry:
+            if fragment[0].isspace():
+                words.insert(0, self.carry)
+            else:
+                words[0] = self.carry + words[0]
+            self.carry = ""
+        if not fragment[-1].isspace():
+            self.carry = words.pop()
+        self._add_words(words)
+
+    def finish(self) -> array:
+        """
+        Returns the hashes of all the shingles of the text
+        """
+        self._flush()
+        return _shingle_hashes(self.word_hashes, self.shingle_size)
+
+    def _flush(self) -> None:
+        if self.carry:
+            self._add_words([self.carry])
+            self.carry = ""
+
+    def _add_words(self, words: list[str]) -> None:
+        if not words:
+            return
+        text = " ".join(words)
+        self.text_hash.update((" " + text if self.word_hashes else text).encode("UTF-8"))
+        cache = self.word_hash_cache
+        # Words repeat a lot, so each distinct word is only hashed once
+        for word in set(words).difference(cache):
+            cache[word] = _word_hash(word)
+        self.word_hashes.extend(map(cache.__getitem__, words))
+
+
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("UTF-8"), digest_size=8).digest(), "little")
+
+
+def _shingle_hashes(word_hashes: array, shingle_size: int) -> array:
+    """
+    Combine each run of `shingle_size` consecutive word hashes into one shingle hash. Texts shorter than one shingle make a single
+    shingle. This works one word position at a time across all shingles, rather than one shingle at a time, so that each step is a
+    tight comprehension.
+    """
+    if not word_hashes:
+        return array("Q")
+    num_shingles = max(len(word_hashes) - shingle_size + 1, 1)
+    values = word_hashes[:num_shingles].tolist()
+    for offset in range(1, min(shingle_size, len(word_hashes))):
+        values = [(value * _FNV_PRIME + word_hash) & _MASK for value, word_hash in zip(values, word_hashes[offset:])]
+    # splitmix64's finaliser, so that all bits of the shingle hashes depend on all their words
+    values = [((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK for value in values]
+    values = [((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK for value in values]
+    return array("Q", [value ^ (value >> 31) for value in values])
+
+
+def _simhash(shingles: array) -> int:
+    """
+    Each bit of the SimHash is set iff that bit is set in more than half of the shingle hashes. Rather than looping over the 64
+    bits of every hash, the hashes are viewed as a table of bytes, and each column of that table is tallied with a `Counter`, so
+    the Python-level work is bounded by the number of distinct byte values, not by the number of shingles.
+    """
+    if sys.byteorder == "big":
+        shingles = array("Q", shingles)
+        shingles.byteswap()
+    data = shingles.tobytes()
+    item_size = shingles.itemsize
+    counts = [0] * (item_size * 8)
+    for column in range(item_size):
+        for value, count in Counter(data[column::item_size]).items():
+            for bit in _BYTE_BITS[value]:
+                counts[column * 8 + bit] += count
+    return sum(1 << bit for bit, count in enumerate(counts) if 2 * count > len(shingles))
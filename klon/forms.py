@@ -2,29 +2,85 @@
 
 # standards
 from collections.abc import Iterable
-from typing import no_type_check
+from typing import TYPE_CHECKING, NamedTuple, no_type_check
 from urllib.parse import urljoin
 
 # 3rd parties
-from requests import Request
+import lxml.etree as ET  # noqa: N812
+
+if TYPE_CHECKING:
+    # `requests` takes longer to import than all of klon, so it's only imported when a `Request` object actually needs to be built
+    from requests import Request
 
 # klon
 from .utils import Element
 
 
-def parse_form(form: Element, base_url: str | None = None) -> Request:
+class FormRequest(NamedTuple):
+    """
+    Describes the request that a browser would send if a form was submitted. For GET forms `data` goes in the query string, for
+    other methods it's the request body.
+    """
+
+    method: str
+    url: str
+    data: dict[str, str | list[str]]
+
+    def to_request(self) -> "Request":
+        from requests import Request  # noqa: PLC0415
+
+        req = Request(method=self.method, url=self.url)
+        if self.method == "GET":
+            req.params = self.data
+        else:
+            req.data = self.data
+        return req
+
+
+def parse_form(form: Element, base_url: str | None = None) -> "Request":
     if not form.tag == "form":
         raise ValueError(f"Expected <form> node, got <{form.tag}>")
-    req = Request(
+    return _form_request(form, base_url, _parse_form_data(form)).to_request()
+
+
+@no_type_check  # until lxml-stubs improves
+def parse_forms(document: Element, base_url: str | None = None) -> list[FormRequest]:
+    """
+    Parse every `<form>` in `document`, in a single pass over the tree. Unlike `parse_form`, this honours the `form` attribute,
+    which associates an input or select with the form of that id, wherever it is in the document.
+    """
+    forms: list[Element] = []
+    forms_by_id: dict[str, Element] = {}
+    fields: list[tuple[Element | str, Element]] = []
+    open_forms: list[Element] = []
+    for event, node in ET.iterwalk(document, events=("start", "end"), tag=("form", "input", "select")):
+        if node.tag == "form":
+            if event == "start":
+                forms.append(node)
+                if node.get("id"):
+                    forms_by_id.setdefault(node.get("id"), node)
+                open_forms.append(node)
+            else:
+                open_forms.pop()
+        elif event == "start":
+            # Forms can be declared after the fields that refer to them, so ids are only resolved once the walk is done
+            owner = node.get("form") or (open_forms[-1] if open_forms else None)
+            if owner is not None:
+                fields.append((owner, node))
+    pairs: dict[Element, list[tuple[str, str, str]]] = {form: [] for form in forms}
+    for owner, node in fields:
+        form = forms_by_id.get(owner) if isinstance(owner, str) else owner
+        if form is not None:
+            pairs[form].extend(_parse_field(node))
+    return [_form_request(form, base_url, _compile_form_data(pairs[form])) for form in forms]
+
+
+def _form_request(form: Element, base_url: str | None, data: dict[str, str | list[str]]) -> FormRequest:
+    return FormRequest(
         method=form.get("method", "GET"),
         url=_parse_form_action(form, base_url),
+        data=data,
     )
-    data = _parse_form_data(form)
-    if req.method == "GET":
-        req.params = data
-    else:
-        req.data = data
-    return req
 
 
 def _parse_form_action(form: Element, base_url: str | None) -> str:
@@ -40,9 +96,14 @@ def _parse_form_action(form: Element, base_url: str | None) -> str:
 
 
 @no_type_check
-def _parse_form_data(form: Element) -> dict[str, str]:
+def _parse_form_data(form: Element) -> dict[str, str | list[str]]:
+    return _compile_form_data(pair for node in form.iter("input", "select") for pair in _parse_field(node))
+
+
+@no_type_check
+def _compile_form_data(pairs: Iterable[tuple[str, str, str]]) -> dict[str, str | list[str]]:
     data: dict[str, str | list[str]] = {}
-    for itype, name, value in _parse_input_name_value_pairs(form):
+    for itype, name, value in pairs:
         if name in data and itype != "radio":
             if not isinstance(data[name], list):
                 data[name] = [data[name]]
@@ -52,31 +113,40 @@ def _parse_form_data(form: Element) -> dict[str, str]:
     return data
 
 
-def _parse_input_name_value_pairs(form: Element) -> Iterable[tuple[str, str, str]]:
-    for node in form.iter():
-        name = node.get("name")
-        if not name:
+def _parse_field(node: Element) -> Iterable[tuple[str, str, str]]:
+    name = node.get("name")
+    if not name:
+        pass
+    elif node.tag == "input":
+        value = node.get("value")
+        itype = node.get("type", "")
+        if itype in ("checkbox", "radio"):
+            if node.get("checked"):
+                yield itype, name, value or "on"
+        elif itype in ("submit", "button", "image", "reset"):
+            # We ignore these completely; if the user wants to simulate a click, the field has to be set manually on the
+            # returned Request's `data` dict
             pass
-        elif node.tag == "input":
-            value = node.get("value")
-            itype = node.get("type", "")
-            if itype in ("checkbox", "radio"):
-                if node.get("checked"):
-                    yield itype, name, value or "on"
-            elif itype in ("submit", "button", "image", "reset"):
-                # We ignore these completely; if the user wants to simulate a click, the field has to be set manually on the
-                # returned Request's `data` dict
-                pass
-            else:
-                # Text etc inputs without a value get the empty string
-                yield itype, name, value or ""
-        elif node.tag == "select":
-            valued_options: list[Element] = list(node.xpath(".//option[@value]"))  # type: ignore
-            selected_options: list[Element] = list(node.xpath(".//option[@selected]"))  # type: ignore
-            if node.get("multiple"):
-                for option in selected_options:
-                    yield "select", name, option.get("value", "")
-            elif selected_options:
-                yield "select", name, selected_options[-1].get("value", "")
-            elif valued_options:
-                yield "select", name, valued_options[0].get("value")  # type: ignore
+        else:
+            # Text etc inputs without a value get the empty string
+            yield itype, name, value or ""
+    elif node.tag == "select":
+        yield from _parse_select(node, name)
+
+
+def _parse_select(node: Element, name: str) -> Iterable[tuple[str, str, str]]:
+    # A single pass over the options, collecting the first one that has a value, and all selected ones
+    first_valued_option = None
+    selected_options: list[Element] = []
+    for option in node.iter("option"):
+        if first_valued_option is None and option.get("value") is not None:
+            first_valued_option = option
+        if option.get("selected") is not None:
+            selected_options.append(option)
+    if node.get("multiple"):
+        for option in selected_options:
+            yield "select", name, option.get("value", "")
+    elif selected_options:
+        yield "select", name, selected_options[-1].get("value", "")
+    elif first_valued_option is not None:
+        yield "select", name, first_valued_option.get("value")  # type: ignore
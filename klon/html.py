@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 
 # standards
+import codecs
+from collections.abc import Callable, Iterable, Iterator
 import re
-from typing import no_type_check
+import threading
+from typing import IO, Any, AnyStr, NamedTuple, no_type_check
 from urllib.parse import urljoin
 
 # 3rd parties
 import lxml.etree as ET  # noqa: N812
 
+# klon
+from .build import _parse_css_style_tags
+from .selectors import select
+from .text import _TextBudgetReached, _TextTarget, extract_text
+from .utils import _cached_parser, _free_preceding
+
 TAGS_WITH_URL_ATTRIBUTES = {
     "a": ["href"],
     "area": ["href"],
@@ -33,45 +42,337 @@ TAGS_WITH_URL_ATTRIBUTES = {
 
 XPATH_TAGS_WITH_URL_ATTRIBUTES = "//*[%s]" % " or ".join(f"self::{tag}" for tag in sorted(TAGS_WITH_URL_ATTRIBUTES))
 
+# Maps each tag name to the same `str` instance, which `extract_links` uses rather than allocating a new one per link
+_CANONICAL_TAGS = {tag: tag for tag in TAGS_WITH_URL_ATTRIBUTES}
+
+# Matches each URL in a `srcset` attribute, along with the separator that precedes it
+_RE_SRCSET_URL = re.compile(r"((?:^|,)\s*)(\S+)")
+
+
+# It's rare for HTML docs to contain an XML declaration, but when they do, lxml throws an exception, so we remove them
+_RE_XML_DECLARATION = re.compile(r"^<\?xml[^>]+\?>")
+
+_RE_XML_DECLARATION_BYTES = re.compile(rb"^<\?xml[^>]+\?>")
+
+# Also matches documents that are only a byte order mark, and UTF-16 whitespace, whose every other byte is a NUL
+_RE_EMPTY_HTML_BYTES = re.compile(rb"(?:\xef\xbb\xbf|\xff\xfe|\xfe\xff)?(?:<\?xml[^>]+\?>)?[\s\x00]*\Z")
+
+_RE_CONTENT_TYPE_CHARSET = re.compile(r"charset\s*=\s*[\"']?\s*([-\w.:]+)", flags=re.I)
+
+_RE_META_CHARSET = re.compile(rb"<meta\s[^>]*charset\s*=\s*[\"']?\s*([-\w.:]+)", flags=re.I)
+
+# The parser targets used by `extract_html_text`, one per thread
+_thread_local_text_targets = threading.local()
 
-def parse_html_etree(html_str: str, remove_comments: bool = False) -> ET._Element:
+# How much of an undecoded document is looked at to tell whether it's UTF-8, when nothing declares its encoding
+_UTF8_SNIFF_LENGTH = 64 * 1024
+
+_BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, "UTF-8"),
+    (codecs.BOM_UTF16_LE, "UTF-16LE"),
+    (codecs.BOM_UTF16_BE, "UTF-16BE"),
+)
+
+
+def parse_html_etree(
+    html_str: str | bytes,
+    remove_comments: bool = False,
+    *,
+    content_type: str | None = None,
+) -> ET._Element:
+    """
+    Parse the given HTML document. It can be given either as a `str`, or as undecoded `bytes`, in which case the raw buffer is
+    handed over to libxml2 as it is, which saves decoding the whole document in Python first. The encoding is then determined from
+    the byte order mark if there is one, else from the `charset` in the `content_type` HTTP header if one is given, else from a
+    `<meta charset>` declaration near the top of the document. Failing all of these, the document is read as UTF-8 if its first
+    64 kB hold non-ASCII bytes that are valid UTF-8, else it is left to libxml2, which assumes Latin-1.
+    """
+    if isinstance(html_str, bytes):
+        return _parse_html_bytes(html_str, remove_comments, content_type)
+    parser = _cached_parser(ET.HTMLParser, remove_comments=remove_comments)
+    return ET.HTML(_clean_html_str(html_str), parser)
+
+
+def _clean_html_str(html_str: str) -> str:
     if not isinstance(html_str, str):
-        raise TypeError("Expected str, not %s; %s" % (type(html_str).__name__, repr(html_str)[:100]))
+        raise TypeError("Expected str or bytes, not %s; %s" % (type(html_str).__name__, repr(html_str)[:100]))
 
-    # It's rare for HTML docs to contain an XML declaration, but when they do, lxml throws an exception, so remove them
-    html_str = re.sub(r"^<\?xml[^>]+\?>", "", html_str)
+    html_str = _RE_XML_DECLARATION.sub("", html_str)
 
     html_str = html_str.strip()
     if html_str == "":
         raise ValueError("Can't parse HTML etree from an empty string")
+    return html_str
 
-    parser = ET.HTMLParser(remove_comments=remove_comments)
-    return ET.HTML(html_str, parser)
+
+def _parse_html_bytes(html_bytes: bytes, remove_comments: bool, content_type: str | None) -> ET._Element:
+    # libxml2 copes fine with XML declarations in undecoded input, and with surrounding whitespace, so unlike with `str` input the
+    # buffer is passed on without being copied. We only need to check that it isn't empty.
+    if _RE_EMPTY_HTML_BYTES.match(html_bytes):
+        raise ValueError("Can't parse HTML etree from an empty string")
+    parser = _make_html_parser(remove_comments, _sniff_html_encoding(html_bytes, content_type))
+    return ET.HTML(html_bytes, parser)
+
+
+def _sniff_html_encoding(html_bytes: bytes, content_type: str | None) -> str | None:
+    # Same order of precedence as in https://html.spec.whatwg.org/multipage/parsing.html#determining-the-character-encoding
+    for bom, encoding in _BYTE_ORDER_MARKS:
+        if html_bytes.startswith(bom):
+            return encoding
+    header_match = _RE_CONTENT_TYPE_CHARSET.search(content_type) if content_type else None
+    if header_match:
+        return header_match[1]
+    meta_match = _RE_META_CHARSET.search(html_bytes, 0, 1024)
+    if meta_match:
+        return meta_match[1].decode("ASCII")
+    # libxml2 would otherwise assume Latin-1. Multi-byte UTF-8 sequences are very unlikely to occur by chance in text in any other
+    # encoding, so a prefix that has some, and is otherwise valid, is taken as UTF-8. The decoder isn't final, so that a sequence
+    # cut short by the end of the prefix isn't an error.
+    prefix = html_bytes[:_UTF8_SNIFF_LENGTH]
+    if not prefix.isascii():
+        try:
+            codecs.getincrementaldecoder("UTF-8")().decode(prefix)
+        except UnicodeDecodeError:
+            return None
+        return "UTF-8"
+    return None
+
+
+def _make_html_parser(remove_comments: bool, encoding: str | None, **options: Any) -> ET.HTMLParser:
+    if encoding:
+        try:
+            return _cached_parser(ET.HTMLParser, remove_comments=remove_comments, encoding=encoding, **options)
+        except LookupError:
+            pass
+        # libxml2 doesn't know all the aliases that Python does (e.g. "latin_1"), so try again with Python's canonical name
+        try:
+            return _cached_parser(ET.HTMLParser, remove_comments=remove_comments, encoding=codecs.lookup(encoding).name, **options)
+        except LookupError:
+            pass
+    return _cached_parser(ET.HTMLParser, remove_comments=remove_comments, **options)
+
+
+def extract_html_text(
+    html_str: str | bytes,
+    *,
+    multiline: bool = False,
+    max_chars: int | None = None,
+    content_type: str | None = None,
+) -> str:
+    """
+    Returns the same as `extract_text(parse_html_etree(html_str, content_type=content_type), multiline=..., max_chars=...)`, but
+    the text is collected from the parser's events as the document is being parsed, so the tree is never built. Use this when the
+    text is all that's needed from a document. With `max_chars`, parsing stops as soon as enough text has been found.
+    """
+    target = getattr(_thread_local_text_targets, "target", None)
+    if target is None:
+        target = _thread_local_text_targets.target = _TextTarget()
+    target.reset(multiline, max_chars)
+    # The target is per-thread, and so is the parser cache, so each thread's parsers all send their events to its own target
+    if isinstance(html_str, bytes):
+        if _RE_EMPTY_HTML_BYTES.match(html_str):
+            raise ValueError("Can't parse HTML etree from an empty string")
+        parser = _make_html_parser(False, _sniff_html_encoding(html_str, content_type), target=target)
+    else:
+        html_str = _clean_html_str(html_str)
+        parser = _cached_parser(ET.HTMLParser, remove_comments=False, target=target)
+    try:
+        # With a target, the parser returns whatever the target's `close` method returns
+        return ET.HTML(html_str, parser)  # type: ignore[return-value]
+    except _TextBudgetReached as reached:
+        return reached.text
+
+
+@no_type_check  # until lxml-stubs improves
+def iterparse_html(
+    source: IO[AnyStr] | Iterable[AnyStr],
+    selector: str,
+    *,
+    remove_comments: bool = False,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[ET._Element]:
+    """
+    Parse an HTML document incrementally, from a file object or from an iterable of `bytes` or `str` chunks, and yield every
+    element that matches `selector` as soon as its closing tag has been parsed. The selector uses the same CSS-like syntax as
+    `build_etree`, i.e. `tag`, `tag#id` or `tag.class`.
+
+    To keep memory use flat, each yielded element is cleared once the caller moves on to the next one, along with everything that
+    precedes it in the document. Callers must therefore copy out whatever they need before advancing the iterator, and should not
+    use selectors whose matches can be nested inside one another.
+    """
+    tag, attrib = _parse_css_style_tags(selector, {})
+    parser = ET.HTMLPullParser(events=("end",), tag=tag, remove_comments=remove_comments)
+    empty = True
+    for chunk in _iter_html_chunks(source, chunk_size):
+        if empty:
+            if not chunk.strip():
+                continue
+            empty = False
+        parser.feed(chunk)
+        yield from _read_matching_events(parser, attrib)
+    if empty:
+        raise ValueError("Can't parse HTML etree from an empty document")
+    # Elements that are never explicitly closed, e.g. a final `<li>` or `<body>` without its end tag, are only closed at EOF
+    parser.close()
+    yield from _read_matching_events(parser, attrib)
+
+
+@no_type_check  # until lxml-stubs improves
+def _read_matching_events(parser: ET.HTMLPullParser, attrib: dict[str, str]) -> Iterator[ET._Element]:
+    for _event, element in parser.read_events():
+        if _matches_attrib(element, attrib):
+            yield element
+            _free_preceding(element)
+
+
+@no_type_check
+def _iter_html_chunks(source: IO[AnyStr] | Iterable[AnyStr], chunk_size: int) -> Iterator[AnyStr]:
+    if hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = iter(source)
+    # As in `parse_html_etree`, remove any XML declaration at the very start of the document. Chunks are buffered until we know
+    # whether the document starts with one.
+    head = None
+    for chunk in chunks:
+        head = chunk if head is None else head + chunk
+        if isinstance(head, bytes):
+            head = _RE_XML_DECLARATION_BYTES.sub(b"", head)
+            pending = b"<?xml".startswith(head[:5]) and b">" not in head
+        else:
+            head = _RE_XML_DECLARATION.sub("", head)
+            pending = "<?xml".startswith(head[:5]) and ">" not in head
+        if not pending:
+            yield head
+            break
+    else:
+        if head:
+            yield head
+        return
+    yield from chunks
+
+
+def _matches_attrib(element: ET._Element, attrib: dict[str, str]) -> bool:
+    if "id" in attrib:
+        return element.get("id") == attrib["id"]
+    if "class" in attrib:
+        return attrib["class"] in element.get("class", "").split()
+    return True
 
 
 @no_type_check  # until lxml-stubs improves
 def make_all_urls_absolute(base_url: str, etree: ET._Element) -> None:
     """
-    Modify all links in the given HTML etree to be absolute URLs, using the given `base_url` to resolve relative URLs.
+    Modify all links in the given HTML etree to be absolute URLs, using the given `base_url` to resolve relative URLs. If the
+    document has a `<base href>`, relative URLs are resolved against that instead, as a browser would.
     """
-    for node in etree.xpath(XPATH_TAGS_WITH_URL_ATTRIBUTES):  # type: ignore[union-attr]
+    # NB we process the whole document that `etree` belongs to, not just the subtree under it
+    tree = etree.getroottree()
+    base_url, base = _document_base_url(base_url, tree)
+    if base is not None:
+        base.set("href", base_url)
+    join = _url_joiner(base_url)
+
+    def join_srcset_url(match: re.Match) -> str:
+        return match[1] + join(match[2])
+
+    for node in tree.iter(*TAGS_WITH_URL_ATTRIBUTES):
+        if node is base:
+            continue
         for attr in TAGS_WITH_URL_ATTRIBUTES[node.tag]:
             value = node.get(attr)
             if value is not None:
                 if attr == "srcset":
-                    new_value = re.sub(
-                        r"((?:^|,)\s*)(\S+)",
-                        lambda m: m[1] + urljoin(base_url, m[2]),
-                        value,
-                    )
+                    new_value = _RE_SRCSET_URL.sub(join_srcset_url, value)
                 else:
-                    new_value = urljoin(base_url, value)
+                    new_value = join(value)
                 if new_value != value:
                     node.set(attr, new_value)
 
 
+class Link(NamedTuple):
+    tag: str
+    attribute: str
+    url: str
+    text: str
+
+
+@no_type_check  # until lxml-stubs improves
+def extract_links(base_url: str, etree: ET._Element) -> tuple[Link, ...]:
+    """
+    Collect every URL found in the attributes listed in `TAGS_WITH_URL_ATTRIBUTES`, under the given element, in document order.
+    URLs are made absolute in the same way as `make_all_urls_absolute` does, but the tree itself is left untouched. Each URL in a
+    `srcset` gives its own `Link`. `text` is the anchor text for `<a>` links, and the empty string for all others.
+
+    Since the crawlers that use this can deal with very large numbers of links, the same `str` objects are shared between all links
+    with the same tag, attribute or URL.
+    """
+    base_url, base = _document_base_url(base_url, etree.getroottree())
+    join = _url_joiner(base_url)
+    links = []
+    for node in etree.iter(*TAGS_WITH_URL_ATTRIBUTES):
+        tag = _CANONICAL_TAGS[node.tag]
+        for attr in TAGS_WITH_URL_ATTRIBUTES[tag]:
+            value = node.get(attr)
+            if value is None:
+                continue
+            text = extract_text(node) if tag == "a" else ""
+            if node is base:
+                links.append(Link(tag, attr, base_url, text))
+            elif attr == "srcset":
+                links.extend(Link(tag, attr, join(match[2]), text) for match in _RE_SRCSET_URL.finditer(value))
+            else:
+                links.append(Link(tag, attr, join(value), text))
+    return tuple(links)
+
+
+@no_type_check  # until lxml-stubs improves
+def _document_base_url(base_url: str, tree: ET._ElementTree) -> tuple[str, ET._Element | None]:
+    base = tree.find(".//base[@href]")
+    if base is not None:
+        base_url = urljoin(base_url, base.get("href"))
+    return base_url, base
+
+
+def _url_joiner(base_url: str) -> Callable[[str], str]:
+    # Link-heavy pages tend to have the same relative URLs repeated many times over, so only join each of them once
+    joined_urls: dict[str, str] = {}
+
+    def join(url: str) -> str:
+        absolute_url = joined_urls.get(url)
+        if absolute_url is None:
+            absolute_url = joined_urls[url] = urljoin(base_url, url)
+        return absolute_url
+
+    return join
+
+
+class _Document:
+    """
+    What's shared by everything extracted from one document, e.g. by the fields of a `Schema`. The document's base URL, which
+    depends on its `<base>` tag, is only looked up when a URL needs to be made absolute, and then only once.
+    """
+
+    def __init__(self, etree: ET._Element, base_url: str | None) -> None:
+        self.etree = etree
+        self.given_base_url = base_url
+        self._base_url: str | None = None
+        self._join: Callable[[str], str] | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._base_url is None:
+            self._base_url, _base = _document_base_url(self.given_base_url or "", self.etree.getroottree())
+        return self._base_url
+
+    def join(self, url: str) -> str:
+        if self._join is None:
+            self._join = _url_joiner(self.base_url)
+        return self._join(url)
+
+
 @no_type_check
 def extract_js_str(element: ET._Element) -> str:
     return "\n\n".join(
-        re.sub(r"^\s*<!--", "", re.sub(r"-->\s*$", "", script_str)) for script_str in element.xpath(".//script/text()")
+        re.sub(r"^\s*<!--", "", re.sub(r"-->\s*$", "", script_str)) for script_str in select(element, "script::text")
     )
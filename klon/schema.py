@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# standards
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any, NamedTuple, no_type_check
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# klon
+from .html import TAGS_WITH_URL_ATTRIBUTES, _Document, parse_html_etree
+from .selectors import _compile_xpath, selector_to_xpath
+from .text import extract_multiline_text, extract_text
+from .utils import tostring
+
+if TYPE_CHECKING:
+    from .forms import FormRequest
+
+Extractor = Callable[[Any], Any]
+
+
+class Field(NamedTuple):
+    """
+    Describes one field of the records extracted by a `Schema`:
+
+    - `selector` is a CSS-like selector as accepted by `select` (including `::text` and `::attr(name)`), or a compiled `ET.XPath`,
+      evaluated relative to the record's node
+    - `extract` says what to take from each matching node. It's one of "text" or "multiline" (as given by `extract_text` and
+      `extract_multiline_text`), "url" (the node's URL attribute, or the selected attribute value, made absolute as
+      `make_all_urls_absolute` would), "html" (as given by `tostring`, without the tail), "form" (a `FormRequest`, as `parse_forms`
+      would give), a nested `Schema`, for a record built from the node's own subtree, or any callable that takes the node
+    - with `many=True`, the field's value is a list of what's extracted from each matching node. Otherwise it's what's extracted
+      from the first one, or `default` if nothing matched.
+    - if given, `clean` is called on each extracted value, e.g. to convert it to a number
+    """
+
+    selector: str | ET.XPath
+    extract: "str | Schema | Extractor" = "text"
+    many: bool = False
+    default: Any = None
+    clean: Extractor | None = None
+
+
+class Schema:
+    """
+    Extracts records, i.e. dicts of field values, from documents. The selectors of all fields are compiled once, when the schema is
+    created, and fields that use the same selector share a single evaluation of it on each record. When only the first match is
+    needed, the compiled XPath asks libxml2 for that match alone.
+
+    Field specs that are plain strings are taken to be selectors, e.g. `Schema({"title": "h1"})` extracts the text of the first
+    `<h1>`.
+    """
+
+    def __init__(self, fields: dict[str, Field | str]) -> None:
+        self.fields = {name: Field(field) if isinstance(field, str) else field for name, field in fields.items()}
+        queries: dict[Any, int] = {}
+        self._queries: list[ET.XPath] = []
+        self._plan: list[tuple[str, int, Field, Callable[[Any, _Document], Any]]] = []
+        # Single-match fields use the all-matches query if there is one for the same selector, rather than running both
+        for name, field in sorted(self.fields.items(), key=lambda item: not item[1].many):
+            if isinstance(field.selector, ET.XPath):
+                key: Any = field.selector
+            else:
+                key = (field.selector, True)
+                if not field.many and key not in queries:
+                    key = (field.selector, False)
+            if key not in queries:
+                queries[key] = len(self._queries)
+                self._queries.append(_compile_field_query(*key) if isinstance(key, tuple) else key)
+            self._plan.append((name, queries[key], field, _compile_extractor(field.extract)))
+        # Keep the fields in the order in which they were given
+        order = {name: i for i, name in enumerate(self.fields)}
+        self._plan.sort(key=lambda step: order[step[0]])
+
+    def extract(self, etree: ET._Element, base_url: str | None = None) -> dict[str, Any]:
+        """
+        Extract one record from `etree`. `base_url` is used to make URLs absolute, and as the default action of forms.
+        """
+        return self._extract(etree, _Document(etree, base_url))
+
+    def extract_many(
+        self,
+        documents: Iterable[tuple[str, str | bytes]],
+        *,
+        remove_comments: bool = False,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Parse every `(url, html)` pair in `documents`, and yield one record for each, extracted with `url` as its base URL.
+        """
+        for url, html in documents:
+            yield self.extract(parse_html_etree(html, remove_comments), url)
+
+    def _extract(self, node: ET._Element, document: "_Document") -> dict[str, Any]:
+        matches: list[Any] = [query(node) for query in self._queries]
+        record = {}
+        for name, query_index, field, extractor in self._plan:
+            nodes = matches[query_index]
+            if not isinstance(nodes, list):
+                # XPath expressions can also evaluate to a string, number or boolean
+                nodes = [nodes]
+            if field.many:
+                values = [extractor(match, document) for match in nodes]
+                record[name] = values if field.clean is None else [field.clean(value) for value in values]
+            elif not nodes:
+                record[name] = field.default
+            else:
+                value = extractor(nodes[0], document)
+                record[name] = value if field.clean is None else field.clean(value)
+        return record
+
+
+def _compile_field_query(selector: str, many: bool) -> ET.XPath:
+    xpath = selector_to_xpath(selector)
+    return _compile_xpath(xpath if many else f"({xpath})[1]")
+
+
+def _compile_extractor(extract: str | Schema | Extractor) -> Callable[[Any, _Document], Any]:
+    if isinstance(extract, Schema):
+        return extract._extract
+    if isinstance(extract, str):
+        try:
+            return _EXTRACTORS[extract]
+        except KeyError:
+            raise ValueError(f"Unknown extractor: {extract!r}") from None
+    return lambda node, _document: extract(node)
+
+
+@no_type_check  # until lxml-stubs improves
+def _extract_url(node: ET._Element | str, document: _Document) -> str | None:
+    if isinstance(node, str):
+        return document.join(node)
+    for attr in TAGS_WITH_URL_ATTRIBUTES.get(node.tag, ()):
+        value = node.get(attr)
+        if value is not None and attr != "srcset":
+            return document.join(value)
+    return None
+
+
+def _extract_form(node: ET._Element, document: _Document) -> "FormRequest":
+    # As in klon/__init__.py, the forms module is only imported when needed
+    from .forms import _form_request, _parse_form_data  # noqa: PLC0415
+
+    if not node.tag == "form":
+        raise ValueError(f"Expected <form> node, got <{node.tag}>")
+    return _form_request(node, document.base_url or None, _parse_form_data(node))
+
+
+_EXTRACTORS: dict[str, Callable[[Any, _Document], Any]] = {
+    "text": lambda node, _document: extract_text(node),
+    "multiline": lambda node, _document: extract_multiline_text(node),
+    "url": _extract_url,
+    "html": lambda node, _document: tostring(node, with_tail=False) if isinstance(node, ET._Element) else str(node),
+    "form": _extract_form,
+}
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# standards
+from functools import lru_cache
+import re
+from typing import Any
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+
+# The compiled XPath objects are cached, so that each selector is only ever parsed and compiled once. This needs to be bounded,
+# since callers can build selectors dynamically.
+_MAX_CACHED_SELECTORS = 1024
+
+_RE_SELECTOR_TOKEN = re.compile(
+    r"""
+      (?P<child>\s*>\s*)
+    | (?P<comma>\s*,\s*)
+    | (?P<descendant>\s+)
+    | (?P<tag>[\w-]+|\*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<class>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[~^$*]?=)\s*(?:"(?P<dq_value>[^"]*)"|'(?P<sq_value>[^']*)'|(?P<value>[^\]\s"']+))\s*)?
+      \]
+    | (?P<text>::text)
+    | ::attr\(\s*(?P<pseudo_attr>[\w:-]+)\s*\)
+    """,
+    re.X,
+)
+
+_ATTRIBUTE_OPERATORS = {
+    "=": "{attr}={literal}",
+    "^=": "starts-with({attr}, {literal})",
+    "$=": "substring({attr}, string-length({attr}) - {offset})={literal}",
+    "*=": "contains({attr}, {literal})",
+}
+
+
+def select(node: ET._Element, selector: str) -> list[Any]:
+    """
+    Returns all the nodes under `node` that match the given CSS-like selector, in document order. Supported syntax:
+
+    - `tag`, `*`, `#id`, `.class`, combined as in `div#main.article`
+    - `[attr]`, `[attr=value]`, `[attr~=word]`, `[attr^=prefix]`, `[attr$=suffix]`, `[attr*=substring]`
+    - descendant (`div p`) and child (`div > p`) combinators, and groups (`script, style`)
+    - `::text` and `::attr(name)` at the end of a selector, to select text nodes or attribute values rather than elements. On their
+      own, they select the text or attribute of `node` itself.
+
+    Selectors are translated to XPath and compiled once, then cached.
+    """
+    return compile_selector(selector)(node)  # type: ignore[return-value]
+
+
+@lru_cache(maxsize=_MAX_CACHED_SELECTORS)
+def compile_selector(selector: str) -> ET.XPath:
+    return ET.XPath(selector_to_xpath(selector))
+
+
+@lru_cache(maxsize=_MAX_CACHED_SELECTORS)
+def _compile_xpath(xpath: str) -> ET.XPath:
+    # Used internally wherever a raw XPath string is evaluated, so that it's only compiled once
+    return ET.XPath(xpath)
+
+
+def selector_to_xpath(selector: str) -> str:
+    """
+    Translate a CSS-like selector, as accepted by `select`, to an XPath expression relative to the context node.
+    """
+    selector = selector.strip()
+    paths: list[str] = []
+    steps: list[str] = []
+    axis = "descendant::"
+    tag: str | None = None
+    predicates: list[str] = []
+    final = ""
+
+    def end_step(pseudo_element: bool = False) -> None:
+        if tag is None and not predicates:
+            if pseudo_element and not steps:
+                # A bare `::text` or `::attr(name)` at the start of a group selects from the context node itself
+                steps.append("self::node()")
+                return
+            raise ValueError(f"Invalid selector: {selector!r}")
+        steps.append(axis + (tag or "*") + "".join(f"[{predicate}]" for predicate in predicates))
+
+    pos = 0
+    while pos < len(selector):
+        match = _RE_SELECTOR_TOKEN.match(selector, pos)
+        if match is None or (final and match["comma"] is None):
+            raise ValueError(f"Invalid selector: {selector!r}")
+        pos = match.end()
+        if match["child"] is not None or match["descendant"] is not None or match["comma"] is not None:
+            if not final:
+                end_step()
+            tag, predicates = None, []
+            if match["comma"] is not None:
+                paths.append("/".join(steps) + final)
+                steps, final, axis = [], "", "descendant::"
+            else:
+                axis = "child::" if match["child"] is not None else "descendant::"
+        elif match["tag"] is not None:
+            if tag is not None or predicates:
+                raise ValueError(f"Invalid selector: {selector!r}")
+            tag = match["tag"]
+        elif match["text"] is not None or match["pseudo_attr"] is not None:
+            end_step(pseudo_element=True)
+            final = "/text()" if match["text"] is not None else f"/@{match['pseudo_attr']}"
+        else:
+            predicates.append(_predicate(match))
+    if not final:
+        end_step()
+    paths.append("/".join(steps) + final)
+    return " | ".join(paths)
+
+
+def _predicate(match: re.Match) -> str:
+    if match["id"] is not None:
+        return f"@id={_xpath_literal(match['id'])}"
+    if match["class"] is not None:
+        return _contains_word("@class", match["class"])
+    attr = f"@{match['attr']}"
+    if match["op"] is None:
+        return attr
+    value = next(group for group in (match["dq_value"], match["sq_value"], match["value"]) if group is not None)
+    if match["op"] != "=" and (not value or (match["op"] == "~=" and any(char.isspace() for char in value))):
+        # Per https://www.w3.org/TR/selectors-3/#attribute-substrings, these match nothing when the value is empty, and `~=` also
+        # matches nothing when the value contains whitespace
+        return "false()"
+    if match["op"] == "~=":
+        return _contains_word(attr, value)
+    return _ATTRIBUTE_OPERATORS[match["op"]].format(attr=attr, literal=_xpath_literal(value), offset=len(value) - 1)
+
+
+def _contains_word(attr: str, word: str) -> str:
+    # Whether `word` is one of the whitespace-separated words in the attribute's value, as with CSS classes
+    return f"contains(concat(' ', normalize-space({attr}), ' '), {_xpath_literal(' ' + word + ' ')})"
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat(%s)" % ', "\'", '.join(f"'{part}'" for part in value.split("'"))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+# standards
+from collections.abc import Iterator
+from typing import Any, NamedTuple, no_type_check
+
+# klon
+from .text import _RE_SPACES, _walk
+from .utils import Element
+
+# Separates the text of consecutive cells in the buffer holding the text of the whole table. Like `_BREAK` in klon/text.py, it
+# can't occur in element text, and isn't matched by `\s`.
+_CELL_SEPARATOR = "\x00"
+
+# Same limits as in https://html.spec.whatwg.org/multipage/tables.html#attributes-common-to-td-and-th-elements
+_MAX_COLSPAN = 1000
+
+_MAX_ROWSPAN = 65534
+
+
+class Table(NamedTuple):
+    """
+    The contents of an HTML table. `header` holds the name of each column, which is the empty string if the table has no header
+    rows. `columns` holds one list of cell texts per column, or, for numeric columns extracted with `numeric=True`, one NumPy array.
+    """
+
+    header: list[str]
+    columns: list[Any]
+
+
+@no_type_check  # until lxml-stubs improves
+def extract_table(table: Element, *, header: bool | None = None, numeric: bool = False) -> Table:
+    """
+    Extract the text of every cell of `table`, in a single walk over its rows. Cells that span several rows or columns are repeated
+    in each of the positions they cover, and short rows are padded with empty strings, so that all columns have the same length.
+
+    Each cell's text is the same as `extract_text` would give for it, but the text of all cells is collected into one buffer, so
+    that whitespace is normalised once for the whole table, rather than once per cell.
+
+    Header rows are the rows of the `<thead>`, or else the leading rows made only of `<th>` cells. Pass `header=True` to use the
+    first row as the header regardless, or `header=False` to treat all rows as data.
+
+    With `numeric=True`, the columns whose non-empty cells are all numbers are returned as NumPy float arrays, with NaN for empty
+    cells. This requires `numpy` to be installed.
+    """
+    if table.tag != "table":
+        raise ValueError(f"Expected <table> node, got <{table.tag}>")
+    rows, texts, spans, num_header_rows = _read_cells(table)
+    grid = _layout_cells(rows, texts, spans)
+
+    if header is not None:
+        num_header_rows = 1 if header and rows else 0
+    width = max((len(row) for row in grid), default=0)
+    body = [row if len(row) == width else row + [""] * (width - len(row)) for row in grid[num_header_rows:]]
+    columns: list[Any] = [list(column) for column in zip(*body)] if body else [[] for _ in range(width)]
+    if numeric:
+        import numpy as np  # noqa: PLC0415
+
+        columns = [_to_numeric_array(np, column) for column in columns]
+    return Table(header=_header_names(grid[:num_header_rows], width), columns=columns)
+
+
+@no_type_check  # until lxml-stubs improves
+def _read_cells(table: Element) -> tuple[list[int], list[str], dict[int, tuple[int, int]], int]:
+    """
+    Walk the table's cells, and return the number of cells in each row, the text of each cell, the column and row spans of the
+    cells that have any (by cell index), and the number of leading header rows.
+    """
+    spans = {}
+    parts = []
+    append = parts.append
+    rows = []
+    num_header_rows = 0
+    in_leading_header = True
+    index = 0
+    for row, in_thead in _iter_rows(table):
+        all_th = True
+        start = index
+        for cell in row.iterchildren("td", "th"):
+            # Most cells hold just a bit of text, which doesn't need to go through `_walk`
+            if len(cell):
+                _walk(cell, append, False)
+            else:
+                text = cell.text
+                if text:
+                    append(text)
+            append(_CELL_SEPARATOR)
+            if cell.attrib:
+                span = _parse_span(cell.get("colspan"), _MAX_COLSPAN), _parse_span(cell.get("rowspan"), _MAX_ROWSPAN)
+                if span != (1, 1):
+                    spans[index] = span
+            if in_leading_header and all_th and cell.tag != "th":
+                all_th = False
+            index += 1
+        if in_leading_header:
+            if in_thead or (all_th and index > start):
+                num_header_rows += 1
+            else:
+                in_leading_header = False
+        rows.append(index - start)
+    texts = [text.strip() for text in _RE_SPACES.sub(" ", "".join(parts)).split(_CELL_SEPARATOR)]
+    return rows, texts, spans, num_header_rows
+
+
+@no_type_check  # until lxml-stubs improves
+def _iter_rows(table: Element) -> Iterator[tuple[Element, bool]]:
+    # As a browser does, the <thead> is rendered first and the <tfoot> last, wherever they are in the document. Rows of nested
+    # tables are never reached, since only the table's own rows and sections are looked at.
+    heads, bodies, feet = [], [], []
+    for child in table:
+        if child.tag == "thead":
+            heads.extend(child.iterchildren("tr"))
+        elif child.tag == "tfoot":
+            feet.extend(child.iterchildren("tr"))
+        elif child.tag == "tbody":
+            bodies.extend(child.iterchildren("tr"))
+        elif child.tag == "tr":
+            bodies.append(child)
+    for row in heads:
+        yield row, True
+    for row in bodies + feet:
+        yield row, False
+
+
+def _parse_span(value: str | None, maximum: int) -> int:
+    if value is None:
+        return 1
+    try:
+        span = int(value)
+    except ValueError:
+        return 1
+    # `rowspan="0"` means the cell extends to the end of the table
+    return maximum if span == 0 and maximum == _MAX_ROWSPAN else min(max(span, 1), maximum)
+
+
+def _layout_cells(rows: list[int], texts: list[str], spans: dict[int, tuple[int, int]]) -> list[list[str]]:
+    """
+    Place each cell's text on the table's grid, taking into account the cells from previous rows that span into the current one.
+    `rows` holds the number of cells in each row, and `spans` the column and row spans of the cells that have any, by cell index.
+    """
+    if not spans:
+        grid = []
+        start = 0
+        for num_cells in rows:
+            grid.append(texts[start : start + num_cells])
+            start += num_cells
+        return grid
+
+    grid = []
+    # Maps column index to the text of the cell that spans down into it, and the number of rows it still covers
+    spanning: dict[int, list[Any]] = {}
+
+    def take_spanning(col: int) -> str:
+        entry = spanning[col]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del spanning[col]
+        return entry[0]
+
+    start = 0
+    for num_cells in rows:
+        cells: list[str] = []
+        col = 0
+        for index in range(start, start + num_cells):
+            text = texts[index]
+            colspan, rowspan = spans.get(index, (1, 1))
+            while col in spanning:
+                cells.append(take_spanning(col))
+                col += 1
+            for _ in range(colspan):
+                cells.append(text)
+                if rowspan > 1:
+                    spanning[col] = [text, rowspan - 1]
+                col += 1
+        start += num_cells
+        last_spanning_col = max(spanning, default=-1)
+        while col <= last_spanning_col:
+            cells.append(take_spanning(col) if col in spanning else "")
+            col += 1
+        grid.append(cells)
+    return grid
+
+
+def _header_names(header_rows: list[list[str]], width: int) -> list[str]:
+    # With several header rows, each column's name is made of the text of its header cells, top to bottom, skipping repeats due to
+    # cells that span several rows
+    names = []
+    for col in range(width):
+        parts: list[str] = []
+        for row in header_rows:
+            text = row[col] if col < len(row) else ""
+            if text and (not parts or parts[-1] != text):
+                parts.append(text)
+        names.append(" ".join(parts))
+    return names
+
+
+def _to_numeric_array(np: Any, column: list[str]) -> Any:
+    if not any(column):
+        return column
+    try:
+        # Converting an array of strings to floats parses them all in C
+        return np.array([value or "nan" for value in column]).astype(float)
+    except ValueError:
+        return column
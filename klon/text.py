@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 # standards
+from collections.abc import Callable
 import re
 from typing import no_type_check
 
@@ -72,48 +73,201 @@ PREFORMATTED_TAGS = frozenset(
 )
 
 
-def extract_text(etree: ET._Element, *, multiline: bool = False) -> str:
+# Element and tail text can never contain a NUL character (lxml refuses to store them, and its parsers replace them with U+FFFD),
+# so when extracting multiline text we use it to mark line breaks. That way all text fragments can be concatenated as they
+# are, and the whitespace normalisation runs once over the whole buffer rather than once per fragment.
+_BREAK = "\x00"
+
+# How many text fragments `_TextTarget` collects before joining them into one chunk
+_MAX_TEXT_PARTS = 1024
+
+_RE_MULTILINE_SPACES = re.compile(r"[\s\x00]+")
+
+_RE_SPACES = re.compile(r"\s+")
+
+
+def extract_text(etree: ET._Element, *, multiline: bool = False, max_chars: int | None = None) -> str:
+    """
+    If `max_chars` is given, the output is the same as `extract_text(etree)[:max_chars]`, but the walk over the tree stops as soon
+    as enough text has been found.
+    """
     if isinstance(etree, ET._ElementUnicodeResult):
-        return normalize_spaces(etree)
+        return normalize_spaces(etree)[:max_chars]
 
     # using a list rather than making _walk() a yielding generator makes it about 5% faster
     parts: list[str] = []
-    _walk(etree, parts)
-    text = "".join(parts)
+    if max_chars is None:
+        _walk(etree, parts.append, multiline)
+    else:
+        try:
+            _walk(etree, _TextBudget(parts, multiline, max_chars), multiline)
+        except _TextBudgetReached as reached:
+            return reached.text
+    return _normalize_text("".join(parts), multiline)[:max_chars]
 
+
+def _normalize_text(text: str, multiline: bool) -> str:
     if multiline:
-        return re.sub(r"\s+", lambda m: "\n\n" if "\n\n" in m.group() else "\n" if "\n" in m.group() else " ", text).strip()
+        return _RE_MULTILINE_SPACES.sub(_multiline_space, text).strip()
     else:
         return normalize_spaces(text)
 
 
+class _TextBudgetReached(Exception):
+    def __init__(self, text: str) -> None:
+        super().__init__()
+        self.text = text
+
+
+class _TextBudget:
+    """
+    Used in place of `list.append` to collect text fragments, but raises `_TextBudgetReached` as soon as the fragments collected so
+    far are enough to produce `max_chars` characters of normalised text.
+
+    The normalised text of the fragments collected so far is a prefix of the final text, except for any trailing whitespace, which
+    could still get merged with whitespace that comes after it. Stripping that whitespace, as `_normalize_text` does, leaves a
+    reliable prefix.
+    """
+
+    def __init__(self, parts: list[str], multiline: bool, max_chars: int) -> None:
+        self.parts = parts
+        self.multiline = multiline
+        self.max_chars = max_chars
+        self.length = 0
+        self.next_check = 0
+
+    def __call__(self, fragment: str) -> None:
+        self.parts.append(fragment)
+        self.length += len(fragment)
+        if self.length >= self.next_check:
+            text = _normalize_text("".join(self.parts), self.multiline)
+            if len(text) >= self.max_chars:
+                raise _TextBudgetReached(text[: self.max_chars])
+            # Normalising never makes text longer, so we know how many more characters we'll need at the very least. Also make
+            # sure the checks get geometrically further apart, so that rejoining all fragments each time remains linear overall.
+            self.next_check = self.length + max(self.max_chars - len(text), self.length // 2)
+
+
 @no_type_check  # until lxml-stubs improves
-def _walk(node: ET._Element, parts: list[str], preformatted: bool = False) -> None:
-    if node.tag in NON_CONTENT_TAGS or isinstance(node, ET._Comment):
+def _walk(root: ET._Element, append: Callable[[str], None], multiline: bool) -> None:
+    """
+    Pass to `append` all the text fragments under `root`, in document order. This uses an explicit stack rather than recursion, so
+    that deeply nested documents don't hit the recursion limit.
+
+    In single-line mode line breaks are simply spaces. In multiline mode they're encoded using `_BREAK`, and so are newlines inside
+    preformatted tags, while other newlines are left in place, as they'll end up squashed into a plain space.
+    """
+    if root.tag in NON_CONTENT_TAGS or isinstance(root, ET._Comment):
         return
+    line_break = _BREAK if multiline else " "
+    paragraph_break = _BREAK * 2 if multiline else " "
+
+    def enter(node: ET._Element) -> bool:
+        tag = node.tag
+        if tag == "br":
+            append(line_break)
+        elif tag in BLOCK_TAGS:
+            append(paragraph_break)
+        preformatted = tag in PREFORMATTED_TAGS
+        if node.text:
+            append(node.text.replace("\n", _BREAK) if preformatted and multiline else node.text)
+        return preformatted
+
+    def leave(node: ET._Element, preformatted: bool) -> None:
+        if node.tag in BLOCK_TAGS:
+            append(paragraph_break)
+        if node.tail:
+            append(node.tail.replace("\n", _BREAK) if preformatted and multiline else node.tail)
+
+    # Each stack entry is a node, an iterator over its remaining children, and whether its direct text is preformatted
+    stack = [(root, iter(root), enter(root))]
+    while stack:
+        node, children, preformatted = stack[-1]
+        for child in children:
+            if child.tag in NON_CONTENT_TAGS or isinstance(child, ET._Comment):
+                leave(child, preformatted)
+            else:
+                stack.append((child, iter(child), enter(child)))
+                break
+        else:
+            stack.pop()
+            if stack:
+                leave(node, stack[-1][2])
+
+
+class _TextTarget:
+    """
+    An lxml parser target that collects the text of a document straight from the parser's events, following the same rules as
+    `_walk`, so that the tree never needs to be built. Instances are reused from one parse to the next, see `reset`.
+    """
+
+    def __init__(self) -> None:
+        self.reset(False, None)
+
+    def reset(self, multiline: bool, max_chars: int | None) -> None:
+        self.parts: list[str] = []
+        # Fragments are small, so to save memory on large documents they're regularly joined into larger chunks
+        self.chunks: list[str] = []
+        self.append: Callable[[str], None] = (
+            self.parts.append if max_chars is None else _TextBudget(self.parts, multiline, max_chars)
+        )
+        self.multiline = multiline
+        self.max_chars = max_chars
+        self.line_break = _BREAK if multiline else " "
+        self.paragraph_break = _BREAK * 2 if multiline else " "
+        # The tags of the open elements, and how many levels deep we are into a non-content element, if inside one
+        self.stack: list[str] = []
+        self.skip_depth = 0
+        # libxml2 reports content found after the root element, but doesn't add it to the tree, so it is ignored here too
+        self.done = False
+
+    def start(self, tag: str, _attrib: dict[str, str]) -> None:
+        if self.skip_depth or self.done:
+            self.skip_depth += 1
+        elif tag in NON_CONTENT_TAGS:
+            self.skip_depth = 1
+        else:
+            self.stack.append(tag)
+            if tag == "br":
+                self.append(self.line_break)
+            elif tag in BLOCK_TAGS:
+                self.append(self.paragraph_break)
+
+    def end(self, _tag: str) -> None:
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        tag = self.stack.pop()
+        if tag in BLOCK_TAGS:
+            self.append(self.paragraph_break)
+        if not self.stack:
+            self.done = True
 
-    if node.tag == "br":
-        parts.append("\n")
-    elif node.tag in BLOCK_TAGS:
-        parts.append("\n\n")
+    def data(self, text: str) -> None:
+        if self.skip_depth or self.done or not self.stack:
+            return
+        if self.multiline and self.stack[-1] in PREFORMATTED_TAGS:
+            text = text.replace("\n", _BREAK)
+        self.append(text)
+        if len(self.parts) >= _MAX_TEXT_PARTS and self.max_chars is None:
+            self.chunks.append("".join(self.parts))
+            self.parts.clear()
 
-    if node.tag in PREFORMATTED_TAGS:
-        preformatted = True
+    def close(self) -> str:
+        text = _normalize_text("".join([*self.chunks, *self.parts]), self.multiline)[: self.max_chars]
+        # Don't hold on to the document's text until the next parse
+        self.reset(False, None)
+        return text
 
-    if node.text:
-        parts.append(node.text if preformatted else re.sub(r"\s+", " ", node.text))
-    for child in node:
-        _walk(child, parts)
 
-        if child.tag in BLOCK_TAGS:
-            parts.append("\n\n")
-        if child.tail:
-            parts.append(child.tail if preformatted else re.sub(r"\s+", " ", child.tail))
+def _multiline_space(match: re.Match) -> str:
+    space = match.group()
+    return "\n\n" if _BREAK * 2 in space else "\n" if _BREAK in space else " "
 
 
-def extract_multiline_text(etree: ET._Element) -> str:
-    return extract_text(etree, multiline=True)
+def extract_multiline_text(etree: ET._Element, *, max_chars: int | None = None) -> str:
+    return extract_text(etree, multiline=True, max_chars=max_chars)
 
 
 def normalize_spaces(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _RE_SPACES.sub(" ", text).strip()
@@ -1,19 +1,45 @@
 #!/usr/bin/env python3
 
 # standards
-from typing import Any, no_type_check, overload
+import codecs
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+import threading
+from typing import IO, Any, TypeVar, no_type_check, overload
 
 # 3rd parties
 import lxml.etree as ET  # noqa: N812
 
+# klon
+from .selectors import _compile_xpath
+
 Element = ET._Element  # this is exported, and can be used for type annotations
 
+ParserT = TypeVar("ParserT", bound=ET._FeedParser)
+
+# Parsers can be reused from one document to the next, but not shared between threads
+_thread_local_parsers = threading.local()
+
+_MAX_CACHED_PARSERS = 32
+
+# When streaming serialisation, subtrees with fewer nodes than this are serialised in one call to `lxml.etree.tostring`
+_STREAMED_SUBTREE_SIZE = 1000
+
+# The encodings for which `lxml.etree.tostring` doesn't add an XML declaration when using the "xml" method
+_ENCODINGS_WITHOUT_XML_DECLARATION = frozenset(["ASCII", "UTF-8", "UTF8", "US-ASCII"])
+
 
 @no_type_check  # until lxml-stubs improves
 def detach(node: Element, *, reattach_tail: bool = True) -> Element:
     parent = node.getparent()
     if parent is None:
         raise Exception("Node has no parent")
+    _detach_child(parent, node, reattach_tail)
+    return node
+
+
+@no_type_check  # until lxml-stubs improves
+def _detach_child(parent: Element, node: Element, reattach_tail: bool) -> None:
     if reattach_tail and node.tail:
         prev = node.getprevious()
         if prev is not None:
@@ -21,7 +47,106 @@ def detach(node: Element, *, reattach_tail: bool = True) -> Element:
         else:
             parent.text = (parent.text + node.tail) if parent.text else node.tail
     parent.remove(node)
-    return node
+
+
+@no_type_check  # until lxml-stubs improves
+def detach_all(
+    nodes_or_xpath: Iterable[Element] | str | ET.XPath,
+    etree: Element | None = None,
+    *,
+    reattach_tail: bool = True,
+) -> list[Element]:
+    """
+    Detach all the given nodes, or all the nodes under `etree` that match the given XPath. The result is the same as calling
+    `detach` on each of them, but rather than concatenating tails one node at a time, the nodes are grouped by parent, and each
+    parent's children are visited once, with the tails of every run of detached siblings joined in one go.
+    """
+    if isinstance(nodes_or_xpath, (str, ET.XPath)):
+        if etree is None:
+            raise ValueError("An `etree` is needed to evaluate the XPath")
+        xpath = nodes_or_xpath if isinstance(nodes_or_xpath, ET.XPath) else _compile_xpath(nodes_or_xpath)
+        nodes_or_xpath = xpath(etree)
+    nodes = list(nodes_or_xpath)
+    by_parent: dict[Element, list[Element]] = {}
+    for node in nodes:
+        if not isinstance(node, ET._Element):
+            raise ValueError(f"Expected an element, got {node!r}")
+        parent = node.getparent()
+        if parent is None:
+            raise Exception("Node has no parent")
+        by_parent.setdefault(parent, []).append(node)
+    for parent, children in by_parent.items():
+        if len(children) == 1:
+            # Nothing to batch, and `detach` avoids visiting all the siblings
+            _detach_child(parent, children[0], reattach_tail)
+            continue
+        detached = set(children)
+        if reattach_tail:
+            _reattach_tails(parent, detached)
+        for child in detached:
+            parent.remove(child)
+    return nodes
+
+
+@no_type_check  # until lxml-stubs improves
+def _reattach_tails(parent: Element, detached: set[Element]) -> None:
+    # `anchor` is the last child that's staying, whose tail receives the tails of the detached nodes that follow it. Until there is
+    # one, they go to the parent's text.
+    anchor = None
+    tails: list[str] = []
+    for child in parent:
+        if child in detached:
+            if child.tail:
+                tails.append(child.tail)
+        else:
+            if tails:
+                _append_text(parent, anchor, tails)
+                tails = []
+            anchor = child
+    if tails:
+        _append_text(parent, anchor, tails)
+
+
+@no_type_check  # until lxml-stubs improves
+def _append_text(parent: Element, anchor: Element | None, tails: list[str]) -> None:
+    if anchor is None:
+        parent.text = "".join([parent.text or "", *tails])
+    else:
+        anchor.tail = "".join([anchor.tail or "", *tails])
+
+
+@no_type_check  # until lxml-stubs improves
+def _free_preceding(element: Element) -> None:
+    """
+    Used when iterating over a document as it is being parsed: clear the given element, and delete everything that precedes it in
+    the document, so that memory usage doesn't grow with the size of the document.
+    """
+    element.clear(keep_tail=True)
+    node = element
+    while node is not None:
+        parent = node.getparent()
+        if parent is not None:
+            while node.getprevious() is not None:
+                del parent[0]
+        node = parent
+
+
+def _cached_parser(parser_class: type[ParserT], **options: Any) -> ParserT:
+    """
+    Return a parser of the given class, configured with the given options. Building a new parser is relatively costly compared to
+    parsing a small document, so parsers are cached and reused, one set per thread.
+    """
+    key = (parser_class, tuple(sorted(options.items())))
+    cache = getattr(_thread_local_parsers, "cache", None)
+    if cache is None:
+        cache = _thread_local_parsers.cache = {}
+    parser = cache.get(key)
+    if parser is None:
+        if len(cache) >= _MAX_CACHED_PARSERS:
+            # Option values such as the encoding come from the documents themselves, so the cache must be bounded
+            cache.clear()
+        parser = cache[key] = parser_class(**options)
+    return parser
 
 
 def is_element(obj: Any) -> bool:
@@ -40,3 +165,171 @@ def tostring(etree, encoding=str, **kwargs):
         return text
     kwargs.setdefault("method", "html")
     return ET.tostring(etree, encoding=encoding, **kwargs).strip()
+
+
+def iter_tostring(
+    etree: Element | ET._ElementUnicodeResult,
+    encoding: type[str] | str = str,
+    *,
+    method: str = "html",
+    with_tail: bool = True,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[str] | Iterator[bytes]:
+    """
+    Serialise `etree` like `tostring` does, but yield the output in chunks of roughly `chunk_size` characters (or bytes), so that
+    the whole serialised document never needs to be held in memory. Large subtrees are split into their start tag, their children
+    and their end tag, while smaller ones are serialised in one go.
+
+    The output is the same as that of `tostring`, except that in XML documents that use namespaces, namespace declarations may get
+    repeated on nested elements. Only the "html" and "xml" methods, and ASCII-compatible encodings, are supported.
+    """
+    if isinstance(etree, ET._ElementUnicodeResult):
+        yield tostring(etree, encoding)
+        return
+    _check_streamed_method(method)
+    if isinstance(encoding, str) and "x</".encode(encoding) != b"x</":
+        raise ValueError(f"Streaming serialisation needs an ASCII-compatible encoding, got {encoding!r}")
+    strip = _Stripper()
+    empty = "" if encoding is str else b""
+    chunk: list[Any] = []
+    size = 0
+    for serialised in _iter_fragments(etree, encoding, method, with_tail):
+        fragment = strip(serialised)
+        if fragment:
+            chunk.append(fragment)
+            size += len(fragment)
+            if size >= chunk_size:
+                yield empty.join(chunk)
+                chunk = []
+                size = 0
+    if chunk:
+        yield empty.join(chunk)
+
+
+def write_tostring(
+    etree: Element | ET._ElementUnicodeResult,
+    file: IO[Any],
+    encoding: type[str] | str = str,
+    *,
+    method: str = "html",
+    with_tail: bool = True,
+    pretty_print: bool = False,
+) -> None:
+    """
+    Serialise `etree` like `tostring` does, but write the output to `file` as it is produced, using lxml's incremental writer. The
+    file must be opened in text mode if `encoding` is `str`, and in binary mode otherwise.
+    """
+    if isinstance(etree, ET._ElementUnicodeResult):
+        file.write(tostring(etree, encoding))
+        return
+    _check_streamed_method(method)
+    strip = _Stripper()
+
+    def write(fragment: Any) -> None:
+        fragment = strip(fragment)
+        if fragment:
+            file.write(fragment)
+
+    if encoding is str:
+        decoder = codecs.getincrementaldecoder("UTF-8")()
+        writer = _Writer(lambda data: write(decoder.decode(data)))
+    else:
+        writer = _Writer(write)
+    with ET.xmlfile(writer, encoding="UTF-8" if encoding is str else encoding) as xf:
+        if _has_xml_declaration(method, encoding):
+            xf.write_declaration()
+        xf.write(etree, method=method, with_tail=with_tail, pretty_print=pretty_print)
+    if encoding is str:
+        write(decoder.decode(b"", final=True))
+
+
+def _check_streamed_method(method: str) -> None:
+    if method not in ("html", "xml"):
+        raise ValueError(f"Streaming serialisation supports the 'html' and 'xml' methods, got {method!r}")
+
+
+def _has_xml_declaration(method: str, encoding: type[str] | str) -> bool:
+    return method == "xml" and isinstance(encoding, str) and encoding.upper() not in _ENCODINGS_WITHOUT_XML_DECLARATION
+
+
+@no_type_check  # until lxml-stubs improves
+def _iter_fragments(etree: Element, encoding: type[str] | str, method: str, with_tail: bool) -> Iterator[Any]:
+    if _has_xml_declaration(method, encoding):
+        yield f"<?xml version='1.0' encoding='{encoding}'?>\n".encode(encoding)
+    options = {"encoding": encoding, "method": method, "xml_declaration": False}
+    # Each stack entry is an iterator over the remaining children of an open element, and the end tag that closes it. This uses an
+    # explicit stack rather than recursion, so that deeply nested documents don't hit the recursion limit.
+    stack = [(iter([etree]), None)]
+    while stack:
+        children, end = stack[-1]
+        for node in children:
+            node_with_tail = with_tail if len(stack) == 1 else True
+            if len(node) == 0 or not _is_splittable(node):
+                yield ET.tostring(node, with_tail=node_with_tail, **options)
+            else:
+                start, node_end = _split_element(node, node_with_tail, options)
+                yield start
+                stack.append((iter(node), node_end))
+                break
+        else:
+            stack.pop()
+            if end is not None:
+                yield end
+
+
+@no_type_check  # until lxml-stubs improves
+def _is_splittable(node: Element) -> bool:
+    if next(islice(node.iter(), _STREAMED_SUBTREE_SIZE, None), None) is None:
+        return False
+    # Attributes given without a value in HTML source, as in `<div hidden>`, are serialised without a value, but copying them to
+    # another element turns them into empty strings. Since we can't tell the two apart, elements with any empty attribute are
+    # serialised in one go.
+    return "" not in node.attrib.values()
+
+
+@no_type_check  # until lxml-stubs improves
+def _split_element(node: Element, with_tail: bool, options: dict[str, Any]) -> tuple[Any, Any]:
+    """
+    Returns the serialised start tag and text of `node`, and its serialised end tag and tail. These are obtained by serialising a
+    childless copy of the node, with a marker character at the end of its text, so that they come out exactly as `tostring` would
+    write them.
+    """
+    shallow = ET.Element(node.tag, node.attrib, nsmap=node.nsmap)
+    shallow.text = (node.text or "") + "x"
+    shallow.tail = node.tail
+    serialised = ET.tostring(shallow, with_tail=with_tail, **options)
+    # Any "<" in the tail is escaped, so the last "x</" is the marker followed by the end tag
+    split = serialised.rindex("x</" if isinstance(serialised, str) else b"x</")
+    return serialised[:split], serialised[split + 1 :]
+
+
+class _Stripper:
+    """
+    Strips leading and trailing whitespace from a text that's given one fragment at a time. Each call returns the part of the
+    stripped text that's known so far; trailing whitespace is held back until we know whether more text follows it.
+    """
+
+    def __init__(self) -> None:
+        self.started = False
+        self.trailing: Any = None
+
+    def __call__(self, fragment: Any) -> Any:
+        if not self.started:
+            fragment = fragment.lstrip()
+            if not fragment:
+                return fragment
+            self.started = True
+            self.trailing = fragment[:0]
+        body = fragment.rstrip()
+        if not body:
+            self.trailing += fragment
+            return body
+        stripped = self.trailing + body
+        self.trailing = fragment[len(body) :]
+        return stripped
+
+
+class _Writer:
+    # lxml's incremental writer needs a file-like object
+    def __init__(self, write: Callable[[bytes], None]) -> None:
+        self.write = write
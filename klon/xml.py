@@ -1,12 +1,39 @@
 #!/usr/bin/env python3
 
 # standards
-from typing import Union
+from collections.abc import Iterator
+import os
+from typing import IO, Union
 
 # 3rd parties
 import lxml.etree as ET
 
+# klon
+from .utils import _cached_parser, _free_preceding
+
 
 def parse_xml_etree(xml_str: Union[bytes, str], remove_comments: bool = False) -> ET._Element:
-    parser = ET.XMLParser(remove_comments=remove_comments)
+    parser = _cached_parser(ET.XMLParser, remove_comments=remove_comments)
     return ET.XML(xml_str, parser)
+
+
+def iterparse_xml(
+    source: str | os.PathLike | IO[bytes],
+    tag: str,
+    *,
+    remove_comments: bool = False,
+) -> Iterator[ET._Element]:
+    """
+    Parse an XML document incrementally from a path or a binary file object, and yield every element whose tag is `tag` as soon
+    as its closing tag has been parsed.
+
+    Each yielded element is cleared once the caller moves on to the next one, along with all its preceding siblings and those of its
+    ancestors, so memory use stays flat however large the file is. Callers must copy out whatever they need before advancing the
+    iterator.
+
+    When given a path, the file is opened and read by libxml2 itself, so its contents are never copied into Python bytes objects. A
+    file object is read in chunks through its `read` method.
+    """
+    for _event, element in ET.iterparse(source, events=("end",), tag=tag, remove_comments=remove_comments):
+        yield element
+        _free_preceding(element)
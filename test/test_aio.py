@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# standards
+import asyncio
+import threading
+import time
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import aio, extract_links, extract_multiline_text, extract_text, make_all_urls_absolute, parse_html_etree, tostring
+
+HTML = '<html><body><p>Hello <b>world</b></p><p>Second</p><a href="next">Next</a></body></html>'
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    aio.configure()
+    yield
+    aio.configure()
+
+
+def test_aio_matches_sync():
+    async def main():
+        etree = await aio.parse_html_etree(HTML.encode())
+        texts = await asyncio.gather(aio.extract_text(etree), aio.extract_multiline_text(etree))
+        links = await aio.extract_links("https://example.com/", etree)
+        await aio.make_all_urls_absolute("https://example.com/", etree)
+        return texts, links, await aio.tostring(etree)
+
+    expected = parse_html_etree(HTML.encode())
+    expected_texts = [extract_text(expected), extract_multiline_text(expected)]
+    expected_links = extract_links("https://example.com/", expected)
+    make_all_urls_absolute("https://example.com/", expected)
+    assert asyncio.run(main()) == (expected_texts, expected_links, tostring(expected))
+
+
+def test_aio_extract_html_text():
+    assert asyncio.run(aio.extract_html_text(HTML, multiline=True)) == "Hello world\n\nSecond\n\nNext"
+
+
+def test_aio_parse_xml():
+    etree = asyncio.run(aio.parse_xml_etree("<root><item>x</item></root>"))
+    assert tostring(etree) == "<root><item>x</item></root>"
+
+
+def test_aio_runs_in_worker_thread():
+    main_thread = threading.current_thread()
+    assert asyncio.run(aio.run(threading.current_thread)) is not main_thread
+
+
+def test_aio_raises_exceptions():
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await aio.run(lambda: 1 / 0)
+        # the slot was released
+        return await aio.run(sum, [1, 2])
+
+    aio.configure(max_workers=1, max_in_flight=1)
+    assert asyncio.run(main()) == 3
+
+
+def test_aio_bounds_in_flight_calls():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def work(i):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return i
+
+    async def main():
+        return await asyncio.gather(*(aio.run(work, i) for i in range(20)))
+
+    aio.configure(max_workers=4, max_in_flight=2)
+    assert asyncio.run(main()) == list(range(20))
+    assert max_running == 2
+
+
+def test_aio_cancelled_call_holds_slot_until_done():
+    finish = threading.Event()
+
+    async def main():
+        first = asyncio.create_task(aio.run(finish.wait))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        second = asyncio.create_task(aio.run(str, "second"))
+        try:
+            await asyncio.sleep(0.05)
+            # the first call is still running in its thread, so the second one can't start yet
+            assert not second.done()
+        finally:
+            finish.set()
+        return await second
+
+    aio.configure(max_workers=2, max_in_flight=1)
+    assert asyncio.run(main()) == "second"
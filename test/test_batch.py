@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import extract_text, make_all_urls_absolute, parse_html_etree, tostring
+from klon.batch import process_documents
+
+
+def _documents(num_documents):
+    return [
+        (
+            f"https://example.com/page/{i}",
+            f'<html><body><p>Page <!-- comment -->{i}</p><a href="next">Next</a></body></html>'.encode(),
+        )
+        for i in range(num_documents)
+    ]
+
+
+def _expected(url, html, remove_comments=False):
+    etree = parse_html_etree(html, remove_comments=remove_comments)
+    text = extract_text(etree)
+    make_all_urls_absolute(url, etree)
+    return {"url": url, "extract_text": text, "tostring": tostring(etree, method="xml")}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100])
+def test_process_documents_ordered(chunk_size):
+    documents = _documents(50)
+    results = process_documents(
+        iter(documents),
+        ["extract_text", "make_all_urls_absolute", ("tostring", {"method": "xml"})],
+        max_workers=2,
+        chunk_size=chunk_size,
+    )
+    assert list(results) == [_expected(url, html) for url, html in documents]
+
+
+def test_process_documents_unordered():
+    documents = _documents(50)
+    results = process_documents(
+        documents,
+        ["extract_text", "make_all_urls_absolute", ("tostring", {"method": "xml"})],
+        ordered=False,
+        max_workers=3,
+        chunk_size=4,
+    )
+    obtained = sorted(results, key=lambda result: int(result["url"].rsplit("/", 1)[1]))
+    assert obtained == [_expected(url, html) for url, html in documents]
+
+
+def test_process_documents_remove_comments():
+    documents = _documents(3)
+    results = process_documents(documents, [("tostring", {"method": "xml"})], max_workers=1, remove_comments=True)
+    assert [result["tostring"] for result in results] == [
+        tostring(parse_html_etree(html, remove_comments=True), method="xml") for _url, html in documents
+    ]
+
+
+def test_process_documents_no_input():
+    assert list(process_documents([], ["extract_text"], max_workers=1)) == []
+
+
+@pytest.mark.parametrize("steps", [["no_such_step"], ["extract_text", "extract_text"], ["url"]])
+def test_process_documents_invalid_steps(steps):
+    with pytest.raises(ValueError):
+        list(process_documents(_documents(1), steps, max_workers=1))
+
+
+def test_process_documents_errors_are_raised():
+    with pytest.raises(ValueError):
+        list(process_documents([("https://example.com/", "")], ["extract_text"], max_workers=1))
+
+
+def test_process_documents_errors_are_returned():
+    documents = _documents(5)
+    documents[2] = ("https://example.com/empty", "")
+    results = list(process_documents(documents, ["extract_text"], max_workers=2, chunk_size=2, errors="return"))
+    assert [result["url"] for result in results] == [url for url, _html in documents]
+    error = results[2]["error"]
+    assert isinstance(error, ValueError)
+    assert results[2] == {"url": "https://example.com/empty", "error": error}
+    assert [result["extract_text"] for i, result in enumerate(results) if i != 2] == [
+        "Page 0 Next",
+        "Page 1 Next",
+        "Page 3 Next",
+        "Page 4 Next",
+    ]
+
+
+def test_process_documents_invalid_errors_mode():
+    with pytest.raises(ValueError, match="Invalid errors mode"):
+        list(process_documents(_documents(1), ["extract_text"], errors="ignore"))
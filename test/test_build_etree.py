@@ -8,7 +8,7 @@ import re
 import pytest
 
 # klon
-from klon import build_etree, tostring
+from klon import Placeholder, build_etree, compile_etree, tostring
 
 
 def check(element, tag, attrib=None, children=None, text=None, tail=None):
@@ -127,3 +127,68 @@ def test_none_values_are_noop():
     element = build_etree("mynode", ["mychild", "a", None, "b"], None, "c")
     check(element, "mynode", children=[{"tag": "mychild", "text": "ab", "tail": "c"}])
     check_str(element, "<mynode><mychild>ab</mychild>c</mynode>")
+
+
+@pytest.mark.parametrize(
+    "spec, values",
+    [
+        (["mynode"], {}),
+        (["mynode#an-id", {"a": "1"}, "Text"], {}),
+        (["mynode", {"a": Placeholder("a")}], {"a": "1"}),
+        # placeholder attributes keep their place among the others
+        (["mynode.cls", {"id": Placeholder("id")}], {"id": "x"}),
+        (["mynode", {"a": "1", "b": Placeholder("b"), "c": "3"}], {"b": "2"}),
+        (["mynode", Placeholder("text")], {"text": "Text"}),
+        (["mynode", "Te", Placeholder("text"), "t"], {"text": "x"}),
+        (["mynode", ["mychild", Placeholder("child")], Placeholder("tail")], {"child": "Child", "tail": "Tail"}),
+        (
+            ["mynode.cls", Placeholder("x"), ["a", {"href": Placeholder("href")}, Placeholder("x")], "b", Placeholder("y"), ["c"]],
+            {"x": "X", "y": "Y", "href": "/link"},
+        ),
+        (["mynode", ["mychild", None, [], Placeholder("text"), None]], {"text": "Text"}),
+    ],
+)
+def test_compile_etree(spec, values):
+    def substitute(spec):
+        if isinstance(spec, Placeholder):
+            return values[spec.name]
+        if isinstance(spec, dict):
+            return {key: substitute(value) for key, value in spec.items()}
+        if isinstance(spec, list):
+            return [substitute(item) for item in spec]
+        return spec
+
+    template = compile_etree(*spec)
+    expected = tostring(build_etree(*substitute(spec)))
+    assert tostring(template.build(**values)) == expected
+    # The template can be built again, each time into a new tree
+    first, second = template.build(**values), template.build(**values)
+    assert first is not second
+    assert tostring(first) == tostring(second) == expected
+
+
+def test_compile_etree_none_values():
+    template = compile_etree("mynode", {"a": Placeholder("a")}, Placeholder("text"), ["mychild"], "x", Placeholder("tail"))
+    element = template.build(a=None, text=None, tail=None)
+    check(element, "mynode", children=[{"tag": "mychild", "tail": "x"}])
+
+
+def test_compile_etree_prebuilt_child_is_copied():
+    child = build_etree("mychild", "Text")
+    template = compile_etree("mynode", child, Placeholder("tail"))
+    element = template.build(tail="Tail")
+    check(element, "mynode", children=[{"tag": "mychild", "text": "Text", "tail": "Tail"}])
+    assert element[0] is not child
+    assert child.getparent() is None
+
+
+def test_compile_etree_missing_value():
+    template = compile_etree("mynode", {"a": Placeholder("a")}, Placeholder("text"))
+    assert template.placeholder_names == {"a", "text"}
+    with pytest.raises(ValueError):
+        template.build(a="1")
+
+
+def test_non_str_template_tag():
+    with pytest.raises(ValueError):
+        compile_etree(object(), {"a": "1"})
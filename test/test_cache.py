@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# standards
+import random
+import sqlite3
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import extract_links, extract_multiline_text, extract_text, parse_html_etree
+from klon.batch import process_documents
+from klon.cache import ResultCache, cache_key
+
+HTML = b'<html><body><p>Hello <b>world</b></p><p>Second</p><a href="next">Next</a><img srcset="a.png 1x, b.png 2x"></body></html>'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        yield cache
+
+
+def test_cached_results_match(cache, monkeypatch):
+    etree = parse_html_etree(HTML)
+    expected = (extract_text(etree), extract_multiline_text(etree), extract_links("https://example.com/", etree))
+    for _ in range(2):
+        obtained = (cache.extract_text(HTML), cache.extract_multiline_text(HTML), cache.extract_links("https://example.com/", HTML))
+        assert obtained == expected
+        # the second time round, everything comes from the cache
+        monkeypatch.setattr("klon.cache.parse_html_etree", None)
+    assert len(cache) == 3
+
+
+def test_cache_persists(tmp_path):
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        cache.extract_text(HTML)
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        assert len(cache) == 1
+        assert cache.get(cache_key("extract_text", HTML, {"remove_comments": False, "multiline": False, "max_chars": None}))
+
+
+def test_cache_key():
+    key = cache_key("extract_text", HTML, {"multiline": False})
+    assert key == cache_key("extract_text", HTML, {"multiline": False})
+    assert key != cache_key("extract_text", HTML + b" ", {"multiline": False})
+    assert key != cache_key("extract_text", HTML, {"multiline": True})
+    assert key != cache_key("extract_links", HTML, {"multiline": False})
+    assert key != cache_key("extract_text", HTML.decode(), {"multiline": False})
+
+
+def test_cache_key_covers_version(monkeypatch):
+    key = cache_key("extract_text", HTML, {})
+    monkeypatch.setattr("klon.cache.KLON_VERSION", "0.0.0")
+    assert cache_key("extract_text", HTML, {}) != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    rng = random.Random(0)
+    values = ["%x" % rng.getrandbits(800) for _ in range(6)]
+    with ResultCache(tmp_path / "cache.sqlite", max_size=750) as cache:
+        for i in range(5):
+            cache.put(b"key%d" % i, values[i])
+        cache.get(b"key0")
+        cache.put(b"key5", values[5])
+        assert cache.size <= 750
+        assert [cache.get(b"key%d" % i) for i in range(6)] == [values[0], None, *values[2:]]
+
+
+def test_cache_skips_unserialisable_results(cache):
+    result = cache.process_document("https://example.com/", HTML, [("tostring", {"encoding": "UTF-8"})])
+    assert isinstance(result["tostring"], bytes)
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_process_documents_with_cache(cache, ordered):
+    documents = [(f"https://example.com/page/{i}", b"<p>Page %d</p><a href='next'>Next</a>" % i) for i in range(20)]
+    steps = ["make_all_urls_absolute", "extract_text", ("tostring", {"method": "xml"})]
+    expected = list(process_documents(documents, steps, max_workers=2, chunk_size=3))
+    for url, html in documents[::3]:
+        assert cache.process_document(url, html, steps) == expected[int(url.rsplit("/", 1)[1])]
+    assert len(cache) == 7
+    for _ in range(2):
+        results = list(process_documents(documents, steps, max_workers=2, chunk_size=3, ordered=ordered, cache=cache))
+        if not ordered:
+            results.sort(key=lambda result: int(result["url"].rsplit("/", 1)[1]))
+        assert results == expected
+        assert len(cache) == 20
+
+
+def test_process_documents_cache_errors_are_raised(cache, monkeypatch):
+    def put(key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "put", put)
+    documents = [(f"https://example.com/page/{i}", b"<p>Page %d</p>" % i) for i in range(5)]
+    with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+        list(process_documents(documents, ["extract_text"], max_workers=1, chunk_size=2, cache=cache))
+
+
+def test_process_documents_does_not_cache_errors(cache):
+    documents = [("https://example.com/empty", ""), ("https://example.com/full", b"<p>Full</p>")]
+    for _ in range(2):
+        results = list(process_documents(documents, ["extract_text"], max_workers=1, cache=cache, errors="return"))
+        assert isinstance(results[0]["error"], ValueError)
+        assert results[1] == {"url": "https://example.com/full", "extract_text": "Full"}
+        assert len(cache) == 1
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import Cleaner, detach, parse_html_etree, tostring
+from klon.text import BLOCK_TAGS
+
+
+def _clean(cleaner, html):
+    body = parse_html_etree(html).find("body")
+    removed = cleaner.clean(body)
+    return tostring(body), [node.tag for node in removed]
+
+
+@pytest.mark.parametrize(
+    "cleaner, html, expected_html, expected_removed",
+    [
+        (
+            Cleaner(),
+            "<body>a<script>x</script>b<style>y</style>c<p>d<svg></svg>e</p></body>",
+            "<body>abc<p>de</p></body>",
+            ["script", "style", "svg"],
+        ),
+        (
+            Cleaner(tags={"nav", "footer"}),
+            "<body><nav>menu</nav>one<footer>foot</footer> two<script>kept</script></body>",
+            "<body>one two<script>kept</script></body>",
+            ["nav", "footer"],
+        ),
+        (
+            Cleaner(class_patterns=[r"\bcookie", r"^ad$"], id_patterns=["banner"]),
+            '<body><div class="x cookie-consent">c</div><p class="ad">ad</p><p class="add">ok</p>'
+            '<div id="top-banner">b</div></body>',
+            '<body><p class="add">ok</p></body>',
+            ["div", "p", "div"],
+        ),
+        (
+            Cleaner(),
+            '<body><p hidden>1</p><p aria-hidden="true">2</p><p aria-hidden="false">3</p>'
+            '<p style="color: red; display: none">4</p><p style="display:none!important">5</p>'
+            '<p style="display: block">6</p></body>',
+            '<body><p aria-hidden="false">3</p><p style="display: block">6</p></body>',
+            ["p", "p", "p", "p"],
+        ),
+        (
+            Cleaner(hidden=False),
+            "<body><p hidden>1</p></body>",
+            "<body><p hidden>1</p></body>",
+            [],
+        ),
+        (
+            Cleaner(empty_tags=BLOCK_TAGS),
+            "<body><div><p> </p><div><script>x</script></div></div>text<div><img></div><p>tail<br></p><div><p></p>t</div></body>",
+            "<body>text<div><img></div><p>tail<br></p><div>t</div></body>",
+            ["div", "p"],
+        ),
+    ],
+)
+def test_cleaner(cleaner, html, expected_html, expected_removed):
+    assert _clean(cleaner, html) == (expected_html, expected_removed)
+
+
+def test_cleaner_matches_detach():
+    # The result is the same as finding all the nodes to remove, and detaching them one by one
+    cleaner = Cleaner(tags={"nav"}, class_patterns=["ad"], empty_tags={"div"})
+    html = "<body>a<nav>n<p class='ad'>x</p></nav>b<div class='ad'>c</div>d<div><p class='ad'></p></div>e</body>"
+    expected = parse_html_etree(html).find("body")
+    for xpath in ("./nav", ".//*[@class='ad']", ".//div[not(*) and not(normalize-space())]"):
+        for node in expected.xpath(xpath):
+            detach(node)
+    assert _clean(cleaner, html)[0] == tostring(expected) == "<body>abde</body>"
+
+
+def test_cleaner_is_reusable():
+    cleaner = Cleaner(tags={"nav"})
+    for i in range(3):
+        assert _clean(cleaner, f"<body><nav>menu</nav>page {i}</body>") == (f"<body>page {i}</body>", ["nav"])
+
+
+def test_cleaner_never_removes_root():
+    root = parse_html_etree("<div hidden><p hidden>x</p></div>").find(".//div")
+    Cleaner().clean(root)
+    assert tostring(root) == "<div hidden></div>"
@@ -3,10 +3,16 @@
 # ruff: noqa: W293  # Blank line contains whitespace
 
 # standards
+import copy
+import random
 import re
 
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+import pytest
+
 # klon
-from klon import detach, parse_html_etree, tostring
+from klon import detach, detach_all, parse_html_etree, tostring
 
 
 def _dedent(text):
@@ -68,3 +74,54 @@ def test_detach():
           </body>
         </html>
     """)
+
+
+def _random_tree(rng, depth=0):
+    node = ET.Element(rng.choice(["div", "p", "b", "i"]))
+    node.text = rng.choice([None, "", "text "])
+    if depth < 4:
+        for _ in range(rng.randint(0, 4)):
+            child = _random_tree(rng, depth + 1)
+            child.tail = rng.choice([None, "", "tail ", "\n"])
+            node.append(child)
+    return node
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("reattach_tail", [True, False])
+def test_detach_all_matches_repeated_detach(seed, reattach_tail):
+    rng = random.Random(seed)
+    doc = ET.Element("html")
+    doc.append(_random_tree(rng))
+    doc[0].tail = "end"
+    expected_doc = copy.deepcopy(doc)
+    xpath = "//div//b | //i[b] | //div/p"
+    expected_nodes = expected_doc.xpath(xpath)
+    for node in expected_nodes:
+        detach(node, reattach_tail=reattach_tail)
+    obtained_nodes = detach_all(xpath, doc, reattach_tail=reattach_tail)
+    assert ET.tostring(doc) == ET.tostring(expected_doc)
+    assert [ET.tostring(node) for node in obtained_nodes] == [ET.tostring(node) for node in expected_nodes]
+
+
+def test_detach_all():
+    doc = parse_html_etree("<div>start<b>1</b>a<b>2</b>b<i>x</i>c<b>3</b>d<b>4<b>nested</b></b>e</div>")
+    detached = detach_all(doc.iter("b"))
+    assert tostring(doc.find(".//div")) == "<div>startab<i>x</i>cde</div>"
+    assert [tostring(node) for node in detached] == ["<b>1</b>a", "<b>2</b>b", "<b>3</b>d", "<b>4</b>e", "<b>nested</b>"]
+
+
+def test_detach_all_accepts_compiled_xpath():
+    doc = parse_html_etree("<div><p>one</p>two<p>three</p></div>")
+    detach_all(ET.XPath("//p"), doc)
+    assert tostring(doc.find(".//div")) == "<div>two</div>"
+
+
+def test_detach_all_errors():
+    doc = parse_html_etree("<div><p>one</p>two</div>")
+    with pytest.raises(ValueError):
+        detach_all("//p")
+    with pytest.raises(ValueError):
+        detach_all("//p/text()", doc)
+    with pytest.raises(Exception, match="no parent"):
+        detach_all([doc])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# standards
+import hashlib
+import random
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import extract_text, fingerprint, parse_html_etree
+from klon.fingerprint import _word_hash
+
+
+def _shingle_hash(word_hashes):
+    mask = (1 << 64) - 1
+    value = 0
+    for word_hash in word_hashes:
+        value = (value * 0x100000001B3 + word_hash) & mask
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & mask
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & mask
+    return value ^ (value >> 31)
+
+
+def _reference_fingerprint(etree, shingle_size=3, minhash_size=128):
+    text = extract_text(etree)
+    words = text.split()
+    word_hashes = [_word_hash(word) for word in words]
+    if 0 < len(words) < shingle_size:
+        shingles = [_shingle_hash(word_hashes)]
+    else:
+        shingles = [_shingle_hash(word_hashes[i : i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    simhash = 0
+    for bit in range(64):
+        if 2 * sum(shingle >> bit & 1 for shingle in shingles) > len(shingles):
+            simhash |= 1 << bit
+    minhash = sorted(set(shingles))[:minhash_size]
+    return hashlib.sha256(text.encode("UTF-8")).hexdigest(), simhash, minhash
+
+
+def _random_html(rng):
+    # Words are often split across several tags, which the tokenizer has to stitch back together
+    tags = ["p", "div", "span", "b", "br", "pre", "li", "script", "a"]
+    texts = ["", " ", "wo", "rd", " two words ", "\n", "\t tab ", "x\n\ny", "café"]
+    parts = []
+    for _ in range(rng.randint(1, 60)):
+        roll = rng.random()
+        if roll < 0.3:
+            parts.append(f"<{rng.choice(tags)}>")
+        elif roll < 0.5:
+            parts.append(f"</{rng.choice(tags)}>")
+        elif roll < 0.55:
+            parts.append("<!-- comment -->")
+        else:
+            parts.append(rng.choice(texts))
+    return "<html><body>%s</body></html>" % "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_fingerprint_matches_reference(seed):
+    etree = parse_html_etree(_random_html(random.Random(seed)))
+    obtained = fingerprint(etree, minhash_size=8)
+    assert (obtained.text_hash, obtained.simhash, list(obtained.minhash)) == _reference_fingerprint(etree, minhash_size=8)
+
+
+@pytest.mark.parametrize("shingle_size", [1, 2, 5])
+def test_fingerprint_shingle_size(shingle_size):
+    etree = parse_html_etree("<p>One <b>two</b> three</p><p>four fi<i>ve</i></p>")
+    obtained = fingerprint(etree, shingle_size=shingle_size)
+    _text_hash, simhash, minhash = _reference_fingerprint(etree, shingle_size=shingle_size)
+    assert (obtained.simhash, list(obtained.minhash)) == (simhash, minhash)
+
+
+def test_fingerprint_text_hash():
+    etree = parse_html_etree("<p>Some <b>bold</b>er text</p>\n<script>ignored()</script>")
+    assert fingerprint(etree).text_hash == hashlib.sha256(b"Some bolder text").hexdigest()
+    assert fingerprint(etree, hash_name="md5").text_hash == hashlib.md5(b"Some bolder text").hexdigest()
+
+
+def test_fingerprint_empty_document():
+    empty = fingerprint(parse_html_etree("<p> </p>"))
+    assert empty.text_hash == hashlib.sha256(b"").hexdigest()
+    assert (empty.simhash, list(empty.minhash)) == (0, [])
+    assert empty.minhash_similarity(empty) == 1.0
+
+
+def test_near_duplicates():
+    rng = random.Random(0)
+    words = [rng.choice(["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]) for _ in range(2000)]
+    edited = list(words)
+    for i in rng.sample(range(len(edited)), 20):
+        edited[i] = "changed"
+    unrelated = [rng.choice(["one", "two", "three", "four", "five"]) for _ in range(2000)]
+    original, near_duplicate, other = (
+        fingerprint(parse_html_etree("<p>%s</p>" % " ".join(text))) for text in (words, edited, unrelated)
+    )
+    assert original.text_hash != near_duplicate.text_hash
+    assert original.simhash_distance(near_duplicate) < original.simhash_distance(other)
+    assert original.minhash_similarity(near_duplicate) > 0.8
+    assert original.minhash_similarity(other) < 0.1
+    assert original.minhash_similarity(original) == 1.0
+    assert original.simhash_distance(original) == 0
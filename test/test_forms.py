@@ -3,12 +3,14 @@
 # standards
 from pathlib import Path
 import re
+import subprocess
+import sys
 
 # 3rd parties
 import pytest
 
 # klon
-from klon import parse_form, parse_html_etree
+from klon import FormRequest, parse_form, parse_forms, parse_html_etree
 
 
 def _load_fixture(method):
@@ -35,3 +37,82 @@ def test_form_parser(method):
 def test_form_parser_method(method):
     form, _qs_unused = _load_fixture(method)
     assert parse_form(form).method == method or "GET"
+
+
+@pytest.mark.parametrize("method", [None, "GET", "POST"])
+def test_parse_forms_matches_parse_form(method):
+    form, _qs_unused = _load_fixture(method)
+    (form_request,) = parse_forms(form.getroottree().getroot(), base_url="https://example.com/")
+    request = parse_form(form, base_url="https://example.com/")
+    assert form_request.url == request.url
+    assert form_request.method == request.method
+    assert form_request.data == (request.params if form_request.method == "GET" else request.data)
+    assert form_request.to_request().prepare().url == request.prepare().url
+
+
+def test_parse_forms_finds_every_form():
+    doc = parse_html_etree(
+        """
+        <form action="/search"><input name="q" value="cats"></form>
+        <div><form action="/login" method="POST">
+            <input name="user" value="me">
+            <select name="lang"><option value="en">English</option><option value="fr" selected>French</option></select>
+        </form></div>
+        """
+    )
+    assert parse_forms(doc, base_url="https://example.com/") == [
+        FormRequest("GET", "https://example.com/search", {"q": "cats"}),
+        FormRequest("POST", "https://example.com/login", {"user": "me", "lang": "fr"}),
+    ]
+
+
+def test_parse_forms_honours_form_attribute():
+    doc = parse_html_etree(
+        """
+        <input name="before" value="1" form="second">
+        <form id="first" action="/first">
+            <input name="a" value="1">
+            <input name="b" value="2" form="second">
+        </form>
+        <form id="second" action="/second"><input name="c" value="3"></form>
+        <input name="after" value="4" form="first">
+        <input name="orphan" value="5">
+        <input name="dangling" value="6" form="no-such-form">
+        """
+    )
+    assert [form.data for form in parse_forms(doc, base_url="https://example.com/")] == [
+        {"a": "1", "after": "4"},
+        {"before": "1", "b": "2", "c": "3"},
+    ]
+
+
+def test_parse_forms_without_action_or_base_url():
+    doc = parse_html_etree("<form><input name='a'></form>")
+    with pytest.raises(ValueError):
+        parse_forms(doc)
+
+
+def test_import_klon_does_not_import_requests():
+    # `-X importtime` lists every module imported, on stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import klon"],
+        capture_output=True,
+        check=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    assert "klon" in imported
+    assert "klon.forms" not in imported
+    assert "requests" not in imported
+
+
+def test_forms_are_imported_lazily():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, klon; klon.parse_forms; print('requests' in sys.modules)"],
+        capture_output=True,
+        check=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    assert result.stdout.strip() == "False"
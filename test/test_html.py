@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
 
+# standards
+from concurrent.futures import ThreadPoolExecutor
+import io
+
 # 3rd parties
+import lxml.etree as ET  # noqa: N812
 import pytest
 
 # klon
-from klon import Element, build_etree, make_all_urls_absolute, parse_html_etree, tostring
+from klon import (
+    Element,
+    build_etree,
+    extract_html_text,
+    extract_links,
+    extract_text,
+    iterparse_html,
+    make_all_urls_absolute,
+    parse_html_etree,
+    tostring,
+)
+from klon.utils import _cached_parser
 
 
 @pytest.mark.parametrize(
@@ -58,6 +74,46 @@ from klon import Element, build_etree, make_all_urls_absolute, parse_html_etree,
             build_etree("div", ["a", {"href": ""}]),
             build_etree("div", ["a", {"href": "http://example.com/"}]),
         ),
+        (
+            # each URL in a srcset is made absolute
+            "http://example.com/dir/",
+            build_etree("div", ["img", {"srcset": "small.jpg 1x, /large.jpg 2x,http://cdn/huge.jpg 3x"}]),
+            build_etree(
+                "div",
+                ["img", {"srcset": "http://example.com/dir/small.jpg 1x, http://example.com/large.jpg 2x,http://cdn/huge.jpg 3x"}],
+            ),
+        ),
+        (
+            # repeated URLs are all updated
+            "http://example.com/",
+            build_etree("div", ["a", {"href": "page"}], ["a", {"href": "page"}], ["img", {"src": "page"}]),
+            build_etree(
+                "div",
+                ["a", {"href": "http://example.com/page"}],
+                ["a", {"href": "http://example.com/page"}],
+                ["img", {"src": "http://example.com/page"}],
+            ),
+        ),
+        (
+            # the document's <base href> has precedence over the given base URL
+            "http://example.com/",
+            build_etree("html", ["head", ["base", {"href": "http://other.com/dir/"}]], ["body", ["a", {"href": "page"}]]),
+            build_etree(
+                "html",
+                ["head", ["base", {"href": "http://other.com/dir/"}]],
+                ["body", ["a", {"href": "http://other.com/dir/page"}]],
+            ),
+        ),
+        (
+            # a relative <base href> is itself resolved against the given base URL, and made absolute
+            "http://example.com/dir/",
+            build_etree("html", ["head", ["base", {"href": "sub/"}]], ["body", ["a", {"href": "page"}]]),
+            build_etree(
+                "html",
+                ["head", ["base", {"href": "http://example.com/dir/sub/"}]],
+                ["body", ["a", {"href": "http://example.com/dir/sub/page"}]],
+            ),
+        ),
     ],
 )
 def test_make_all_urls_absolute(base_url, etree, expected):
@@ -133,3 +189,202 @@ def test_html_parser(input_str, expected_tree):
         obtained = parse_html_etree(input_str)
         expected = build_etree(*expected_tree)
         compare(obtained, expected)
+
+
+def _iterparse_html_document(num_items):
+    items = "".join(
+        f'<div class="item odd-{i % 2}" id="item-{i}"><p>Item <!-- no -->{i}</p></div><div>Noise</div>' for i in range(num_items)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><html><body><section>{items}</section></body></html>'.encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("p", ["Item 0", "Item 1", "Item 2", "Item 3"]),
+        ("div.odd-1", ["Item 1", "Item 3"]),
+        ("div#item-2", ["Item 2"]),
+        ("span", []),
+    ],
+)
+def test_iterparse_html(chunk_size, selector, expected):
+    source = io.BytesIO(_iterparse_html_document(4))
+    assert [extract_text(element) for element in iterparse_html(source, selector, chunk_size=chunk_size)] == expected
+
+
+def test_iterparse_html_str_chunks():
+    html = _iterparse_html_document(3).decode("UTF-8")
+    chunks = [html[i : i + 5] for i in range(0, len(html), 5)]
+    assert [element.get("id") for element in iterparse_html(chunks, "div.item")] == ["item-0", "item-1", "item-2"]
+
+
+@pytest.mark.parametrize(
+    "chunks, selector, expected",
+    [
+        ([b"<ul><li>a<li>b"], "li", ["a", "b"]),
+        ([b"<ul><li>a", b"<li>b", b"<li>c"], "li", ["a", "b", "c"]),
+        ([b"<html><body><p>One<p>Two"], "p", ["One", "Two"]),
+        ([b"<html><body><p>Text"], "body", ["Text"]),
+    ],
+)
+def test_iterparse_html_unterminated(chunks, selector, expected):
+    assert [extract_text(element) for element in iterparse_html(chunks, selector)] == expected
+
+
+@pytest.mark.parametrize("remove_comments", [False, True])
+def test_iterparse_html_remove_comments(remove_comments):
+    elements = iterparse_html([_iterparse_html_document(1)], "p", remove_comments=remove_comments)
+    num_comments = sum(len(element.xpath(".//comment()")) for element in elements)
+    assert num_comments == (0 if remove_comments else 1)
+
+
+def test_iterparse_html_frees_processed_elements():
+    sizes = []
+    for element in iterparse_html(io.BytesIO(_iterparse_html_document(100)), "div.item", chunk_size=64):
+        sizes.append(len(element.getparent()))
+    # The `<section>` never holds more than the few items that were parsed from the current chunk, rather than all 200 divs
+    assert max(sizes) < 10
+
+
+@pytest.mark.parametrize("chunks", [[], [b""], [b"  ", b"\n"], [b'<?xml version="1.0"?>', b" "]])
+def test_iterparse_html_empty_document(chunks):
+    with pytest.raises(ValueError):
+        list(iterparse_html(chunks, "p"))
+
+
+@pytest.mark.parametrize(
+    "html_bytes, content_type, expected_text",
+    [
+        # no encoding information at all, libxml2 falls back to its default
+        ("<p>Café</p>".encode("ISO-8859-1"), None, "Café"),
+        # ... unless the document is valid UTF-8
+        ("<p>café".encode(), None, "café"),
+        ("<p>Привет</p>".encode(), None, "Привет"),
+        # a multi-byte sequence cut short at the end of the sniffed prefix doesn't make the document invalid UTF-8
+        (("<p>" + "a" * (64 * 1024 - 4) + "é</p>").encode(), None, "a" * (64 * 1024 - 4) + "é"),
+        # byte order marks
+        ("\ufeff<p>Café</p>".encode(), None, "Café"),
+        ("\ufeff<p>Café</p>".encode("UTF-16-LE"), None, "Café"),
+        ("\ufeff<p>Café</p>".encode("UTF-16-BE"), None, "Café"),
+        # the BOM has precedence over the HTTP header
+        ("\ufeff<p>Café</p>".encode(), "text/html; charset=ISO-8859-1", "Café"),
+        # HTTP headers
+        ("<p>Café</p>".encode(), "text/html; charset=utf-8", "Café"),
+        ("<p>Привет</p>".encode("CP1251"), 'text/html; charset="windows-1251"', "Привет"),
+        # an encoding name that libxml2 doesn't know, but Python does
+        ("<p>Привет</p>".encode("KOI8-R"), "text/html; charset=koi8_r", "Привет"),
+        # the HTTP header has precedence over the <meta> tag
+        ('<meta charset="ISO-8859-1"><p>Café</p>'.encode(), "text/html; charset=UTF-8", "Café"),
+        # <meta> tags
+        ('<meta charset="utf-8"><p>Café</p>'.encode(), None, "Café"),
+        ("<meta charset=cp1251><p>Привет</p>".encode("CP1251"), None, "Привет"),
+        (
+            '<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS"><p>日本</p>'.encode("Shift_JIS"),
+            None,
+            "日本",
+        ),
+        # XML declarations don't trouble libxml2 when it's fed bytes
+        ('<?xml version="1.0" encoding="UTF-8"?>\n<p>Café</p>'.encode(), "text/html; charset=UTF-8", "Café"),
+        # unknown encodings are ignored
+        (b"<p>Cafe</p>", "text/html; charset=no-such-encoding", "Cafe"),
+    ],
+)
+def test_parse_html_etree_bytes(html_bytes, content_type, expected_text):
+    etree = parse_html_etree(html_bytes, content_type=content_type)
+    assert extract_text(etree) == expected_text
+
+
+@pytest.mark.parametrize(
+    "html_bytes",
+    [
+        b"",
+        b" \n ",
+        b'<?xml version="1.0" encoding="UTF-8" ?>',
+        b'<?xml version="1.0"?>\n',
+        # byte order marks alone, or followed by whitespace
+        b"\xef\xbb\xbf",
+        b"\xef\xbb\xbf \n",
+        b"\xff\xfe",
+        " \n".encode("UTF-16-LE"),
+        " \n".encode("UTF-16-BE"),
+    ],
+)
+def test_parse_html_etree_empty_bytes(html_bytes):
+    with pytest.raises(ValueError):
+        parse_html_etree(html_bytes)
+    with pytest.raises(ValueError):
+        extract_html_text(html_bytes)
+
+
+def test_parsers_are_cached_per_thread():
+    def get_parsers():
+        return [_cached_parser(ET.HTMLParser, remove_comments=remove_comments) for remove_comments in (False, True, False)]
+
+    parsers = get_parsers()
+    assert parsers[0] is parsers[2]
+    assert parsers[0] is not parsers[1]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread_parsers = executor.submit(get_parsers).result()
+    assert not set(map(id, parsers)) & set(map(id, other_thread_parsers))
+
+
+def test_parse_html_etree_concurrently():
+    documents = [f"<p>Document <!-- comment --> number {i}</p>" for i in range(200)]
+
+    def parse(html):
+        return tostring(parse_html_etree(html, remove_comments=True).find(".//p"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse, documents))
+    assert results == [f"<p>Document  number {i}</p>" for i in range(200)]
+
+
+def test_extract_links():
+    etree = parse_html_etree("""
+        <html>
+          <head><link rel="stylesheet" href="/style.css"></head>
+          <body>
+            <a href="page">A <b>page</b></a>
+            <a name="anchor">Not a link</a>
+            <img src="img.jpg" srcset="img.jpg 1x, /img@2x.jpg 2x">
+            <a href="page">Same page</a>
+            <form action=""></form>
+          </body>
+        </html>
+    """)
+    before = tostring(etree)
+    links = extract_links("http://example.com/dir/", etree)
+    assert links == (
+        ("link", "href", "http://example.com/style.css", ""),
+        ("a", "href", "http://example.com/dir/page", "A page"),
+        ("img", "src", "http://example.com/dir/img.jpg", ""),
+        ("img", "srcset", "http://example.com/dir/img.jpg", ""),
+        ("img", "srcset", "http://example.com/img@2x.jpg", ""),
+        ("a", "href", "http://example.com/dir/page", "Same page"),
+        ("form", "action", "http://example.com/dir/", ""),
+    )
+    assert links[1].url is links[5].url
+    # the tree is left untouched
+    assert tostring(etree) == before
+
+
+def test_extract_links_matches_make_all_urls_absolute():
+    etree = parse_html_etree(
+        '<html><head><base href="sub/"></head><body><a href="x">X</a><iframe src="/frame"></iframe></body></html>'
+    )
+    links = extract_links("http://example.com/dir/", etree)
+    assert [link.url for link in links] == [
+        "http://example.com/dir/sub/",
+        "http://example.com/dir/sub/x",
+        "http://example.com/frame",
+    ]
+    make_all_urls_absolute("http://example.com/dir/", etree)
+    assert [link.url for link in links] == [
+        node.get(link.attribute) for link, node in zip(links, etree.iter("base", "a", "iframe"))
+    ]
+
+
+def test_extract_links_from_subtree():
+    etree = parse_html_etree('<html><head><base href="/sub/"></head><body><a href="x">X</a><p><a href="y">Y</a></p></body></html>')
+    assert extract_links("http://example.com/", etree.find(".//p")) == (("a", "href", "http://example.com/sub/y", "Y"),)
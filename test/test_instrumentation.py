@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# standards
+import io
+
+# 3rd parties
+import pytest
+
+# klon
+import klon
+from klon.instrumentation import (
+    disable_instrumentation,
+    enable_instrumentation,
+    get_stats,
+    is_instrumentation_enabled,
+    reset_stats,
+)
+
+
+@pytest.fixture
+def records():
+    records = []
+    reset_stats()
+    enable_instrumentation(records.append)
+    yield records
+    disable_instrumentation()
+    reset_stats()
+
+
+def test_instrumentation_disabled_by_default():
+    assert not is_instrumentation_enabled()
+    reset_stats()
+    klon.extract_text(klon.parse_html_etree("<p>Hello</p>"))
+    assert get_stats() == {}
+
+
+def test_instrumentation_records_calls(records):
+    html = "<p>Hello <a href='page'>world</a></p>"
+    etree = klon.parse_html_etree(html)
+    klon.make_all_urls_absolute("https://example.com/", etree)
+    klon.extract_text(etree)
+    klon.extract_text(etree)
+
+    assert [record.function for record in records] == [
+        "parse_html_etree",
+        "make_all_urls_absolute",
+        "extract_text",
+        "extract_text",
+    ]
+    parse_record = records[0]
+    assert parse_record.input_size == len(html)
+    assert parse_record.output_nodes == 4  # <html> and <body> are added by lxml
+    assert records[1].input_nodes == 4
+    assert records[2].output_size == len("Hello world")
+    assert all(record.wall_time >= 0 and record.cpu_time >= 0 for record in records)
+
+    stats = get_stats()
+    assert set(stats) == {"parse_html_etree", "make_all_urls_absolute", "extract_text"}
+    assert stats["extract_text"].calls == 2
+    assert stats["extract_text"].input_nodes == 8
+    assert stats["extract_text"].output_size == 2 * len("Hello world")
+    assert stats["extract_text"].wall_time == records[2].wall_time + records[3].wall_time
+
+
+def test_instrumentation_records_iterations(records):
+    xml = b"<feed><item/><item/><item/></feed>"
+    assert len(list(klon.iterparse_xml(io.BytesIO(xml), "item"))) == 3
+    (record,) = records
+    assert record.function == "iterparse_xml"
+    assert record.output_size == 3
+
+
+def test_instrumentation_doesnt_count_internal_calls(records):
+    # `extract_links` calls `extract_text` internally, but only the public call is recorded
+    klon.extract_links("https://example.com/", klon.build_etree("p", ["a", {"href": "x"}, "X"]))
+    assert [record.function for record in records] == ["build_etree", "extract_links"]
+    assert records[1].output_size == 1
+
+
+def test_instrumentation_can_be_disabled(records):
+    klon.normalize_spaces(" a  b ")
+    disable_instrumentation()
+    klon.normalize_spaces(" a  b ")
+    assert len(records) == 1
+    assert get_stats()["normalize_spaces"].calls == 1
+
+
+def test_instrumented_functions_keep_their_metadata():
+    assert klon.extract_text.__name__ == "extract_text"
+    assert klon.extract_text.__wrapped__ is klon.text.extract_text
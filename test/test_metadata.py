@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# standards
+import json
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import JsonLd, Metadata, extract_metadata, parse_html_etree
+
+HTML = """
+<html>
+  <head>
+    <base href="/shop/">
+    <meta charset="utf-8">
+    <meta property="og:title" content="Shoes">
+    <meta property="og:image" content="https://cdn.example.com/1.jpg">
+    <meta property="og:image" content="https://cdn.example.com/2.jpg">
+    <meta name="Description" content="All our shoes">
+    <meta http-equiv="refresh" content="30">
+    <meta name="empty">
+    <link rel="canonical" href="list">
+    <link rel="Alternate Feed" href="/feed.xml">
+    <link rel="stylesheet">
+    <script type="application/ld+json">
+      <!-- {"@type": "WebPage", "name": "Shoes"} -->
+    </script>
+    <script type="application/ld+json">{"@type": "Product", "offers": [</script>
+    <script>var notJsonLd = {};</script>
+  </head>
+  <body>
+    <div itemscope itemtype="https://schema.org/Product">
+      <h1 itemprop="name alternateName"> Red   shoe </h1>
+      <img itemprop="image" src="red.jpg">
+      <a itemprop="url" href="https://example.com/red">Red</a>
+      <meta itemprop="sku" content="R-1">
+      <data itemprop="gtin" value="0123">ignored</data>
+      <time itemprop="releaseDate" datetime="2024-01-01">January</time>
+      <time itemprop="updated">Yesterday</time>
+      <div itemprop="offers" itemscope><span itemprop="price">12.50</span><link itemprop="availability" href="/InStock"></div>
+      <img itemprop="thumbnail">
+    </div>
+  </body>
+</html>
+"""
+
+
+def test_extract_metadata():
+    metadata = extract_metadata(parse_html_etree(HTML), "https://example.com/index.html")
+    assert metadata == Metadata(
+        json_ld=[JsonLd('{"@type": "WebPage", "name": "Shoes"}'), JsonLd('{"@type": "Product", "offers": [')],
+        meta={
+            "og:title": ["Shoes"],
+            "og:image": ["https://cdn.example.com/1.jpg", "https://cdn.example.com/2.jpg"],
+            "description": ["All our shoes"],
+        },
+        links={
+            "canonical": ["https://example.com/shop/list"],
+            "alternate": ["https://example.com/feed.xml"],
+            "feed": ["https://example.com/feed.xml"],
+        },
+        microdata={
+            "name": ["Red shoe"],
+            "alternateName": ["Red shoe"],
+            "image": ["https://example.com/shop/red.jpg"],
+            "url": ["https://example.com/red"],
+            "sku": ["R-1"],
+            "gtin": ["0123"],
+            "releaseDate": ["2024-01-01"],
+            "updated": ["Yesterday"],
+            "price": ["12.50"],
+            "availability": ["https://example.com/InStock"],
+            "thumbnail": [""],
+        },
+    )
+
+
+def test_json_ld_is_decoded_lazily():
+    valid, invalid = extract_metadata(parse_html_etree(HTML)).json_ld
+    assert "data" not in vars(valid)
+    assert valid.data == {"@type": "WebPage", "name": "Shoes"}
+    assert valid.data is valid.data
+    with pytest.raises(json.JSONDecodeError):
+        invalid.data  # noqa: B018
+
+
+@pytest.mark.parametrize(
+    "html, base_url, expected",
+    [
+        ("<link rel=next href=2>", None, {"next": ["2"]}),
+        ("<link rel=next href=2>", "https://example.com/1", {"next": ["https://example.com/2"]}),
+        ("<base href='https://example.com/a/'><link rel=next href=2>", None, {"next": ["https://example.com/a/2"]}),
+    ],
+)
+def test_extract_metadata_base_url(html, base_url, expected):
+    assert extract_metadata(parse_html_etree(html), base_url).links == expected
+
+
+def test_extract_metadata_empty():
+    assert extract_metadata(parse_html_etree("<p>Nothing here</p>")) == Metadata([], {}, {}, {})
+
+
+@pytest.mark.parametrize(
+    "script_type, expected",
+    [
+        ("application/ld+json", [JsonLd("{}")]),
+        ("application/ld+json; charset=utf-8", [JsonLd("{}")]),
+        (" Application/LD+JSON ", [JsonLd("{}")]),
+        ("application/json", []),
+        ("text/javascript", []),
+    ],
+)
+def test_extract_metadata_json_ld_type(script_type, expected):
+    html = f'<html><head><script type="{script_type}">{{}}</script></head></html>'
+    assert extract_metadata(parse_html_etree(html)).json_ld == expected
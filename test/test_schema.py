@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+import pytest
+
+# klon
+from klon import Field, FormRequest, Schema, extract_multiline_text, extract_text, parse_html_etree, select
+
+HTML = """
+<html>
+  <head><base href="/shop/"></head>
+  <body>
+    <h1>  Product   list </h1>
+    <div class="product" id="p1">
+      <h2><a href="item/1">First</a></h2>
+      <p class="price">12.50</p>
+      <img src="1.png" srcset="1-2x.png 2x">
+      <ul><li>red</li><li>blue</li></ul>
+    </div>
+    <div class="product" id="p2">
+      <h2><a href="/item/2">Second</a></h2>
+      <p class="price">3</p>
+      <p class="notes">Line one<br>Line two</p>
+    </div>
+    <form action="search" method="POST"><input name="q" value="shoes"></form>
+  </body>
+</html>
+"""
+
+PRODUCT = Schema(
+    {
+        "id": Field("::attr(id)"),
+        "name": "h2",
+        "url": Field("h2 a", "url"),
+        "price": Field("p.price", clean=float),
+        "image": Field("img::attr(src)", "url"),
+        "colours": Field("li", many=True),
+        "notes": Field("p.notes", "multiline", default=""),
+    }
+)
+
+
+def test_schema():
+    schema = Schema(
+        {
+            "title": "h1",
+            "products": Field("div.product", PRODUCT, many=True),
+            "first_product": Field("div.product", PRODUCT),
+            "search": Field("form", "form"),
+            "missing": Field("table", default="none"),
+            "html": Field("p.price", "html", many=True),
+            "count": Field(ET.XPath("count(//div)"), lambda count: count),
+        }
+    )
+    record = schema.extract(parse_html_etree(HTML), "https://example.com/index.html")
+    first, second = [
+        {
+            "id": f"p{i}",
+            "name": name,
+            "url": f"https://example.com/{path}",
+            "price": price,
+            "image": image,
+            "colours": colours,
+            "notes": notes,
+        }
+        for i, name, path, price, image, colours, notes in [
+            (1, "First", "shop/item/1", 12.5, "https://example.com/shop/1.png", ["red", "blue"], ""),
+            (2, "Second", "item/2", 3.0, None, [], "Line one\nLine two"),
+        ]
+    ]
+    assert record == {
+        "title": "Product list",
+        "products": [first, second],
+        "first_product": first,
+        "search": FormRequest("POST", "https://example.com/shop/search", {"q": "shoes"}),
+        "missing": "none",
+        "html": ['<p class="price">12.50</p>', '<p class="price">3</p>'],
+        "count": 2.0,
+    }
+
+
+def test_schema_matches_primitives():
+    etree = parse_html_etree(HTML)
+    schema = Schema(
+        {
+            "text": Field("div.product", many=True),
+            "multiline": Field("div.product", "multiline", many=True),
+            "first": Field("div.product"),
+            "texts": Field("li::text", many=True),
+        }
+    )
+    assert schema.extract(etree) == {
+        "text": [extract_text(node) for node in select(etree, "div.product")],
+        "multiline": [extract_multiline_text(node) for node in select(etree, "div.product")],
+        "first": extract_text(select(etree, "div.product")[0]),
+        "texts": ["red", "blue"],
+    }
+
+
+def test_schema_shares_queries():
+    schema = Schema(
+        {
+            "a": Field("div.product", many=True),
+            "b": Field("div.product", "html"),
+            "c": Field("div.product", "multiline"),
+            "d": Field("h1"),
+            "e": Field("h1", "html"),
+        }
+    )
+    assert len(schema._queries) == 2
+    assert list(schema.extract(parse_html_etree(HTML))) == ["a", "b", "c", "d", "e"]
+
+
+def test_schema_extract_many():
+    documents = [(f"https://example.com/{i}/", f"<h1>Page {i}</h1><a href='next'>Next</a>") for i in range(5)]
+    schema = Schema({"title": "h1", "next": Field("a", "url")})
+    assert list(schema.extract_many(documents)) == [
+        {"title": f"Page {i}", "next": f"https://example.com/{i}/next"} for i in range(5)
+    ]
+
+
+def test_schema_errors():
+    with pytest.raises(ValueError, match="Unknown extractor"):
+        Schema({"title": Field("h1", "json")})
+    with pytest.raises(ValueError, match="Invalid selector"):
+        Schema({"title": Field("h1 >")})
+    with pytest.raises(ValueError, match="Expected <form>"):
+        Schema({"form": Field("h1", "form")}).extract(parse_html_etree(HTML))
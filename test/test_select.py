@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import parse_html_etree, select
+from klon.selectors import compile_selector, selector_to_xpath
+
+HTML = """
+<html>
+  <body>
+    <div id="main" class="article wide">
+      <h1 class="title">Title</h1>
+      <p class="intro">Intro <a href="/one" rel="next">one</a></p>
+      <div class="inner"><p>Nested <a href="https://example.com/two.png" title="a picture">two</a></p></div>
+    </div>
+    <div class="article-list"><p data-x="it's &quot;quoted&quot;">Other</p></div>
+    <script>var x = 1;</script>
+  </body>
+</html>
+"""
+
+
+def _describe(result):
+    return [node if isinstance(node, str) else (node.text or "").strip() or node.tag for node in result]
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("h1", ["Title"]),
+        ("p", ["Intro", "Nested", "Other"]),
+        ("#main > p", ["Intro"]),
+        ("#main p", ["Intro", "Nested"]),
+        ("div.article p a", ["one", "two"]),
+        (".article", ["div"]),
+        (".article.wide", ["div"]),
+        (".article.narrow", []),
+        ("div#main.article > .inner > p > a", ["two"]),
+        ("a[rel]", ["one"]),
+        ("a[rel=next]", ["one"]),
+        ("a[rel='next']", ["one"]),
+        ('a[href^="https:"]', ["two"]),
+        ("a[href$=.png]", ["two"]),
+        ("a[href*=example]", ["two"]),
+        ("a[title~=picture]", ["two"]),
+        ("a[title~=pic]", []),
+        ("""p[data-x*='"quoted"']""", ["Other"]),
+        ('a[href^=""]', []),
+        ("a[href$='']", []),
+        ('a[href*=""]', []),
+        ('a[title~=""]', []),
+        ('a[title~="a picture"]', []),
+        ('a[title=""]', []),
+        ('a[title="a picture"]', ["two"]),
+        ("* > h1", ["Title"]),
+        ("h1, script", ["Title", "var x = 1;"]),
+        ("script::text", ["var x = 1;"]),
+        ("a::attr(href)", ["/one", "https://example.com/two.png"]),
+        ("p > a::text , h1::text", ["Title", "one", "two"]),
+    ],
+)
+def test_select(selector, expected):
+    etree = parse_html_etree(HTML)
+    assert _describe(select(etree, selector)) == expected
+
+
+def test_select_is_relative_to_node():
+    etree = parse_html_etree(HTML)
+    inner = select(etree, ".inner")[0]
+    assert _describe(select(inner, "a")) == ["two"]
+    assert _describe(select(inner, "div")) == []
+    assert _describe(select(inner, "::attr(class)")) == ["inner"]
+    assert _describe(select(inner, "p::text, ::attr(class)")) == ["inner", "Nested "]
+
+
+@pytest.mark.parametrize("selector", ["", ">", "a >", "> a", "a,", "p::text b", "a[", "a[href=]", "p#", "a b::foo", "a >::text"])
+def test_invalid_selector(selector):
+    with pytest.raises(ValueError):
+        selector_to_xpath(selector)
+
+
+def test_selectors_are_compiled_once():
+    etree = parse_html_etree(HTML)
+    compile_selector.cache_clear()
+    for _ in range(10):
+        select(etree, "div.article > p")
+    info = compile_selector.cache_info()
+    assert (info.misses, info.hits) == (1, 9)
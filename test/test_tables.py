@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# standards
+import random
+
+# 3rd parties
+import pytest
+
+# klon
+from klon import Table, build_etree, extract_table, extract_text, parse_html_etree
+
+
+def _table(html: str) -> Table:
+    return extract_table(parse_html_etree(f"<html><body>{html}</body></html>").find(".//table"))
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        # No header
+        (
+            "<table><tr><td>a</td><td>b</td></tr><tr><td>c</td><td>d</td></tr></table>",
+            Table(["", ""], [["a", "c"], ["b", "d"]]),
+        ),
+        # Header row of <th> cells
+        (
+            "<table><tr><th>x</th><th>y</th></tr><tr><td>1</td><td>2</td></tr></table>",
+            Table(["x", "y"], [["1"], ["2"]]),
+        ),
+        # A row that has a <th> in first position isn't a header row, if it also has <td>s
+        (
+            "<table><tr><th>x</th><td>1</td></tr><tr><th>y</th><td>2</td></tr></table>",
+            Table(["", ""], [["x", "y"], ["1", "2"]]),
+        ),
+        # The <thead> is a header, even with <td> cells, and even when it's not first
+        (
+            "<table><tbody><tr><td>1</td></tr></tbody><thead><tr><td>x</td></tr></thead></table>",
+            Table(["x"], [["1"]]),
+        ),
+        # The <tfoot> comes last
+        (
+            "<table><tfoot><tr><td>total</td></tr></tfoot><tbody><tr><td>1</td></tr><tr><td>2</td></tr></tbody></table>",
+            Table([""], [["1", "2", "total"]]),
+        ),
+        # Multi-row headers are combined
+        (
+            "<table><tr><th rowspan=2>Name</th><th colspan=2>Price</th></tr><tr><th>min</th><th>max</th></tr>"
+            "<tr><td>a</td><td>1</td><td>2</td></tr></table>",
+            Table(["Name", "Price min", "Price max"], [["a"], ["1"], ["2"]]),
+        ),
+        # Row and column spans
+        (
+            "<table><tr><td rowspan=3>a</td><td colspan=2>b</td></tr><tr><td>c</td><td rowspan=2>d</td></tr><tr><td>e</td></tr>"
+            "<tr><td>f</td></tr></table>",
+            Table(["", "", ""], [["a", "a", "a", "f"], ["b", "c", "e", ""], ["b", "d", "d", ""]]),
+        ),
+        # A span that reaches past the end of the row's cells
+        (
+            "<table><tr><td>a</td><td>b</td><td rowspan=2>c</td></tr><tr><td>d</td></tr></table>",
+            Table(["", "", ""], [["a", "d"], ["b", ""], ["c", "c"]]),
+        ),
+        # rowspan=0 extends to the end of the table, invalid spans count as 1
+        (
+            "<table><tr><td rowspan=0>a</td><td colspan=x>b</td></tr><tr><td>c</td></tr><tr><td colspan=-1>d</td></tr></table>",
+            Table(["", ""], [["a", "a", "a"], ["b", "c", "d"]]),
+        ),
+        # Cells are given the same text as `extract_text`, and nested tables are part of the cell they're in
+        (
+            "<table><tr><td>\n  one <b>two</b><br>three<script>x</script> </td>"
+            "<td><table><tr><td>in</td><td>ner</td></tr></table></td></tr></table>",
+            Table(["", ""], [["one two three"], ["in ner"]]),
+        ),
+        # Other children of rows are ignored
+        (
+            "<table><caption>Caption</caption><tr><td>a</td><!-- comment --></tr></table>",
+            Table([""], [["a"]]),
+        ),
+        # Empty tables
+        ("<table></table>", Table([], [])),
+        ("<table><tr><th>x</th></tr></table>", Table(["x"], [[]])),
+    ],
+)
+def test_extract_table(html, expected):
+    assert _table(html) == expected
+
+
+def test_extract_table_header_override():
+    table = build_etree("table", ["tr", ["td", "x"], ["td", "y"]], ["tr", ["td", "1"], ["td", "2"]])
+    assert extract_table(table, header=True) == Table(["x", "y"], [["1"], ["2"]])
+    table = build_etree("table", ["tr", ["th", "x"]], ["tr", ["td", "1"]])
+    assert extract_table(table, header=False) == Table([""], [["x", "1"]])
+
+
+def test_extract_table_matches_extract_text():
+    rng = random.Random(0)
+    fragments = [" ", "\n\t", "a", "b c", "&nbsp;", "<b>d</b>", "<i> e </i>", "<br>", "<p>f</p>", "<span> </span>"]
+    rows = ["".join("<td>%s</td>" % "".join(rng.choices(fragments, k=rng.randint(0, 6))) for _ in range(4)) for _ in range(50)]
+    table = parse_html_etree("<table>%s</table>" % "".join(f"<tr>{row}</tr>" for row in rows)).find(".//table")
+    expected = [[extract_text(row[col]) for row in table.iterfind("tr")] for col in range(4)]
+    assert extract_table(table).columns == expected
+
+
+def test_extract_table_numeric():
+    np = pytest.importorskip("numpy")
+    table = _table(
+        "<table><tr><th>name</th><th>price</th><th>qty</th><th>none</th></tr>"
+        "<tr><td>a</td><td>1.5</td><td>3</td><td></td></tr><tr><td>b</td><td></td><td>x</td><td></td></tr></table>"
+    )
+    name, price, qty, none = table.columns
+    assert name == ["a", "b"]
+    assert isinstance(price, np.ndarray)
+    assert price[0] == 1.5
+    assert np.isnan(price[1])
+    assert qty == ["3", "x"]
+    assert none == ["", ""]
+
+
+def test_extract_table_errors():
+    with pytest.raises(ValueError, match="Expected <table>"):
+        extract_table(build_etree("div"))
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
+# standards
+import random
+import re
+
 # 3rd parties
+import lxml.etree as ET  # noqa: N812
 import pytest
 
 # klon
-from klon import extract_text, parse_html_etree
+from klon import extract_html_text, extract_text, parse_html_etree
+from klon.text import BLOCK_TAGS, NON_CONTENT_TAGS, PREFORMATTED_TAGS
 
 
 @pytest.mark.parametrize(
@@ -112,3 +118,135 @@ def test_extract_text(html, expected_default, expected_multiline):
         (etree,) = roots
     assert repr(extract_text(etree)) == repr(expected_default)
     assert repr(extract_text(etree, multiline=True)) == repr(expected_multiline)
+    if not roots:
+        assert repr(extract_html_text(html)) == repr(expected_default)
+        assert repr(extract_html_text(html, multiline=True)) == repr(expected_multiline)
+
+
+def _reference_extract_text(etree, multiline):
+    # This is the original, recursive implementation of `extract_text`, which the current one must match exactly
+    def walk(node, parts, preformatted=False):
+        if node.tag in NON_CONTENT_TAGS or isinstance(node, ET._Comment):
+            return
+        if node.tag == "br":
+            parts.append("\n")
+        elif node.tag in BLOCK_TAGS:
+            parts.append("\n\n")
+        if node.tag in PREFORMATTED_TAGS:
+            preformatted = True
+        if node.text:
+            parts.append(node.text if preformatted else re.sub(r"\s+", " ", node.text))
+        for child in node:
+            walk(child, parts)
+            if child.tag in BLOCK_TAGS:
+                parts.append("\n\n")
+            if child.tail:
+                parts.append(child.tail if preformatted else re.sub(r"\s+", " ", child.tail))
+
+    parts = []
+    walk(etree, parts)
+    text = "".join(parts)
+    if multiline:
+        return re.sub(r"\s+", lambda m: "\n\n" if "\n\n" in m.group() else "\n" if "\n" in m.group() else " ", text).strip()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _random_html(rng):
+    tags = ["p", "div", "span", "b", "br", "pre", "textarea", "li", "td", "script", "style", "a"]
+    texts = ["", " ", "word", " two words ", "\n", "\n\n", " \n \n ", "line\r\nline", "\t\u00a0tab ", "x\n\ny"]
+    parts = []
+    for _ in range(rng.randint(1, 40)):
+        roll = rng.random()
+        if roll < 0.3:
+            parts.append(f"<{rng.choice(tags)}>")
+        elif roll < 0.5:
+            parts.append(f"</{rng.choice(tags)}>")
+        elif roll < 0.55:
+            parts.append("<!-- comment -->")
+        else:
+            parts.append(rng.choice(texts))
+    return "<html><body>%s</body></html>" % "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("multiline", [False, True])
+def test_extract_text_matches_reference(seed, multiline):
+    etree = parse_html_etree(_random_html(random.Random(seed)))
+    for node in etree.iter():
+        assert extract_text(node, multiline=multiline) == _reference_extract_text(node, multiline)
+
+
+def test_extract_text_deeply_nested():
+    root = node = ET.Element("div")
+    for _ in range(10000):
+        node = ET.SubElement(node, "span")
+        node.text = " deep"
+    node.tail = "\n\n"
+    assert extract_text(root) == " ".join(["deep"] * 10000)
+    assert extract_text(root, multiline=True) == " ".join(["deep"] * 10000)
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("multiline", [False, True])
+def test_extract_text_max_chars(seed, multiline):
+    etree = parse_html_etree(_random_html(random.Random(seed)))
+    full_text = extract_text(etree, multiline=multiline)
+    for max_chars in range(len(full_text) + 2):
+        assert extract_text(etree, multiline=multiline, max_chars=max_chars) == full_text[:max_chars]
+
+
+def test_extract_text_max_chars_stops_early():
+    visited = []
+
+    class SpyElement(ET.ElementBase):
+        def __iter__(self):
+            visited.append(self.tag)
+            return super().__iter__()
+
+    parser = ET.HTMLParser()
+    parser.set_element_class_lookup(ET.ElementDefaultClassLookup(element=SpyElement))
+    etree = ET.HTML("<p>Short intro.</p>" + "<p>More text</p>" * 10, parser)
+    assert extract_text(etree, max_chars=5) == "Short"
+    assert visited == ["html", "body", "p"]
+
+
+def _random_document(rng):
+    # Unlike `_random_html`, this leaves more of the document's structure up to the parser
+    prefix = rng.choice(["", "<!DOCTYPE html>", "<html><head><title>Title</title><style>p {}</style></head>", "text first"])
+    suffix = rng.choice(["", "</html>", "</body>after body</html>", "</html>after html", "<svg><text>svg</text></svg>tail"])
+    return prefix + _random_html(rng)[len("<html><body>") : -len("</body></html>")] + suffix
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("multiline", [False, True])
+def test_extract_html_text_matches_extract_text(seed, multiline):
+    html = _random_document(random.Random(seed))
+    if not html.strip():
+        return
+    etree = parse_html_etree(html)
+    # Documents with no elements at all, e.g. just a doctype, parse to `None`, and have no text
+    expected = "" if etree is None else extract_text(etree, multiline=multiline)
+    assert extract_html_text(html, multiline=multiline) == expected
+    etree = parse_html_etree(html.encode("UTF-8"))
+    if etree is not None:
+        assert extract_html_text(html.encode("UTF-8"), multiline=multiline) == extract_text(etree, multiline=multiline)
+    for max_chars in range(len(expected) + 2):
+        assert extract_html_text(html, multiline=multiline, max_chars=max_chars) == expected[:max_chars]
+
+
+@pytest.mark.parametrize(
+    "html_bytes, content_type",
+    [
+        ("<p>caf\u00e9</p>".encode("UTF-16"), None),
+        ("<meta charset='latin-1'><p>caf\u00e9</p>".encode("latin-1"), None),
+        ("<p>caf\u00e9</p>".encode("cp1252"), "text/html; charset=cp1252"),
+    ],
+)
+def test_extract_html_text_encodings(html_bytes, content_type):
+    assert extract_html_text(html_bytes, content_type=content_type) == "caf\u00e9"
+
+
+@pytest.mark.parametrize("html", ["", "  \n", b"", b"<?xml version='1.0'?>\n"])
+def test_extract_html_text_empty(html):
+    with pytest.raises(ValueError):
+        extract_html_text(html)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# standards
+import io
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+import pytest
+
+# klon
+from klon import iter_tostring, parse_html_etree, parse_xml_etree, tostring, write_tostring
+import klon.utils
+
+HTML = """
+    <!DOCTYPE html>
+    <html>
+      <head><title>caf\xe9</title><script>if (a < b && c) { x = "</p>" }</script></head>
+      <body class="main" data-x='say "hi"'>
+        <div hidden><p>One &amp; <b>two</b><br>three</p><!-- comment --><p>four</p>x</div>
+        <select multiple><option selected>5 &lt; 6</option></select>
+        <pre>
+          seven
+        </pre>
+        tail &#8364;
+      </body>
+    </html>
+    \n\n
+"""
+
+XML = b"""<?xml version="1.0"?>
+<feed>
+  <product sku="1"><name>caf\xc3\xa9 &amp; co</name><price currency="EUR">12.50</price></product>
+  <!-- comment -->
+  <product sku="2"><name>x</name><empty/></product>
+</feed>
+"""
+
+
+@pytest.fixture(params=[1, 3, 1000], ids=lambda size: f"subtree_size={size}")
+def subtree_size(request, monkeypatch):
+    # With small subtree sizes, nearly every element is split into start tag, children and end tag
+    monkeypatch.setattr(klon.utils, "_STREAMED_SUBTREE_SIZE", request.param)
+
+
+def _documents():
+    html = parse_html_etree(HTML)
+    xml = parse_xml_etree(XML)
+    return [
+        (html, "html"),
+        (html, "xml"),
+        (html.find(".//div"), "html"),
+        (xml, "xml"),
+        (xml.find("product"), "xml"),
+    ]
+
+
+@pytest.mark.parametrize("encoding", [str, "UTF-8", "ascii", "ISO-8859-1"])
+@pytest.mark.parametrize("with_tail", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 16, 64 * 1024])
+def test_iter_tostring_same_as_tostring(subtree_size, encoding, with_tail, chunk_size):
+    for etree, method in _documents():
+        expected = tostring(etree, encoding, method=method, with_tail=with_tail)
+        chunks = list(iter_tostring(etree, encoding, method=method, with_tail=with_tail, chunk_size=chunk_size))
+        assert all(chunks)
+        assert ("" if encoding is str else b"").join(chunks) == expected
+
+
+@pytest.mark.parametrize("encoding", [str, "UTF-8", "ascii", "ISO-8859-1", "UTF-16"])
+@pytest.mark.parametrize("pretty_print", [True, False])
+def test_write_tostring_same_as_tostring(encoding, pretty_print):
+    for etree, method in _documents():
+        expected = tostring(etree, encoding, method=method, pretty_print=pretty_print)
+        file = io.StringIO() if encoding is str else io.BytesIO()
+        write_tostring(etree, file, encoding, method=method, pretty_print=pretty_print)
+        assert file.getvalue() == expected
+
+
+def test_iter_tostring_chunks():
+    etree = parse_html_etree("<div>%s</div>" % ("<p>paragraph</p>" * 10000))
+    chunks = list(iter_tostring(etree, chunk_size=1000))
+    assert "".join(chunks) == tostring(etree)
+    assert len(chunks) > 100
+    assert max(map(len, chunks)) < 2000
+
+
+def test_iter_tostring_deeply_nested():
+    etree = parse_html_etree("<div>" * 5000 + "deep" + "</div>" * 5000)
+    assert "".join(iter_tostring(etree)) == tostring(etree)
+
+
+def test_text_nodes():
+    text = parse_html_etree("<p> Some text </p>").xpath("//p/text()")[0]
+    assert list(iter_tostring(text)) == [" Some text "]
+    file = io.BytesIO()
+    write_tostring(text, file, "UTF-8")
+    assert file.getvalue() == b" Some text "
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"method": "text"},
+        {"encoding": "UTF-16"},
+    ],
+)
+def test_iter_tostring_unsupported(kwargs):
+    with pytest.raises(ValueError):
+        list(iter_tostring(ET.Element("p"), **kwargs))
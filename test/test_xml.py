@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# standards
+import io
+
+# 3rd parties
+import lxml.etree as ET  # noqa: N812
+import pytest
+
+# klon
+from klon import iterparse_xml, parse_xml_etree
+
+
+def _feed_xml(num_products):
+    products = "".join(f'<product sku="{i}"><name>Product <!-- no -->{i}</name></product>' for i in range(num_products))
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed><products>{products}</products></feed>'.encode()
+
+
+def test_parse_xml_etree():
+    etree = parse_xml_etree(_feed_xml(2))
+    assert [node.get("sku") for node in etree.iter("product")] == ["0", "1"]
+
+
+@pytest.mark.parametrize("source_type", ["path", "str", "file"])
+def test_iterparse_xml_sources(tmp_path, source_type):
+    path = tmp_path / "feed.xml"
+    path.write_bytes(_feed_xml(3))
+    if source_type == "file":
+        with path.open("rb") as file:
+            skus = [node.get("sku") for node in iterparse_xml(file, "product")]
+    else:
+        source = path if source_type == "path" else str(path)
+        skus = [node.get("sku") for node in iterparse_xml(source, "product")]
+    assert skus == ["0", "1", "2"]
+
+
+@pytest.mark.parametrize("source_type", ["path", "file", "bytes_io"])
+def test_iterparse_xml_empty_source(tmp_path, source_type):
+    path = tmp_path / "feed.xml"
+    path.write_bytes(b"")
+    with path.open("rb") as file:
+        source = {"path": path, "file": file, "bytes_io": io.BytesIO(b"")}[source_type]
+        with pytest.raises(ET.XMLSyntaxError):
+            list(iterparse_xml(source, "product"))
+
+
+@pytest.mark.parametrize("remove_comments", [False, True])
+def test_iterparse_xml_remove_comments(remove_comments):
+    nodes = iterparse_xml(io.BytesIO(_feed_xml(1)), "name", remove_comments=remove_comments)
+    texts = ["".join(node.itertext()) for node in nodes]
+    assert texts == ["Product 0"]
+    nodes = iterparse_xml(io.BytesIO(_feed_xml(1)), "name", remove_comments=remove_comments)
+    num_comments = sum(len(node.xpath(".//comment()")) for node in nodes)
+    assert num_comments == (0 if remove_comments else 1)
+
+
+def test_iterparse_xml_frees_processed_elements():
+    sizes = []
+    for node in iterparse_xml(io.BytesIO(_feed_xml(20000)), "product"):
+        sizes.append(len(node.getparent()))
+    # The parser reads its input in chunks, so there are a few hundred products in the tree at any time, but never all of them
+    assert max(sizes) < 1000
+    # Whatever has been yielded is cleared
+    assert len(node) == 0